@@ -4,5 +4,8 @@ from pathlib import Path
 # FIXME?: Assume's we're always running from top-level/project directory!
 PYPROJECT_PATH = Path.cwd() / "pyproject.toml"
 
+# Local (per-project) state, e.g. run history, is kept here:
+MANAGE_PATH = Path.cwd() / ".manage"
+
 # DO NOT CHANGE: Version string here WILL be kept in-sync with pyproject.toml using poetry-bumpversion plugin!
 __version__ = "0.3.6"
@@ -1,26 +1,29 @@
-"""'Manage' primary entry point."""
+"""'Manage' primary entry point.
+
+Note: Everything "heavy" (pydantic-based models, method classes, validation, dotenv and rich)
+is imported *inside* the functions that need it so that quick commands (e.g. --version) don't pay for them.
+"""
 import argparse
 import sys
+from pathlib import Path
 from typing import TypeVar
 
-from dotenv import load_dotenv
-from rich.console import Console
-
 from manage import PYPROJECT_PATH, __version__
-from manage.methods import gather_available_method_classes
-from manage.models import Configuration, PyProject, Recipes
-from manage.validate import validate_environment, validate_method_classes
-from manage.utilities import message, msg_failure, shorten_path
-
-load_dotenv(verbose=True)
+from manage.utilities import get_console, message, msg_failure, msg_success, shorten_path
 
 TClass = TypeVar("class")
+TConfiguration = TypeVar("TConfiguration")
+TPyProject = TypeVar("TPyProject")
+TRecipes = TypeVar("TRecipes")
 
-CONSOLE = Console()
+# Number of most-recent runs we compare against those before it when calculating --stats trends.
+TREND_WINDOW = 5
 
 
-def process_arguments() -> [Configuration, PyProject]:
+def process_arguments() -> [TConfiguration, TPyProject]:
     """Create and run out CLI argument parser with a "raw" read of our pyproject.toml, return it and configuration."""
+    from manage.models import Configuration, PyProject
+
     # Create our pyproject instance and make sure it's copacetic.
     pyproject = PyProject.factory()
     if not pyproject.validate():
@@ -29,15 +32,28 @@ def process_arguments() -> [Configuration, PyProject]:
     # Get (and do some simple validation on) the command-line arguments:
     args: tuple[argparse.Namespace, list[str, str]] = get_args(pyproject)
 
-    # Earliest, simplest exit:
+    # Earliest, simplest exit (if we didn't already take the fast-path in main):
     if args[0].do_version:
-        CONSOLE.print(__version__)
+        print(__version__)
         sys.exit(0)
 
     if args[0].verbose:
         shortened_path = shorten_path(PYPROJECT_PATH, 76)
         message(f"Read {shortened_path}", end_success=True)
 
+    if args[0].replay and not Path(args[0].replay).is_file():
+        get_console().print(f"[red]Sorry, unable to find the cassette to replay: [italic]{args[0].replay}[/].")
+        sys.exit(1)
+
+    if args[0].shard_weights and not args[0].do_stats:
+        from manage.history import read_weights
+
+        try:
+            read_weights(Path(args[0].shard_weights))
+        except ValueError as err:
+            get_console().print(f"[red]{err}")
+            sys.exit(1)
+
     # Given our command-line arguments, create our more structured configuration instance:
     if not (configuration := Configuration.factory(args)):
         sys.exit(1)
@@ -45,17 +61,17 @@ def process_arguments() -> [Configuration, PyProject]:
     return configuration, pyproject
 
 
-def get_args(pyproject: PyProject) -> argparse.Namespace:
+def get_args(pyproject: TPyProject) -> argparse.Namespace:
     """Parse -all- the command-line arguments provide, both known/expected and unknown/step associated."""
     parser = argparse.ArgumentParser(add_help=False)
 
     s_targets: str = pyproject.get_formatted_list_of_targets()
     parser.add_argument(
-        "target",
+        "targets",
         type=str,
         action="store",
-        nargs="?",
-        help=f"Please specify a specific recipe to run from your recipe file: {s_targets}",
+        nargs="*",
+        help=f"Please specify one or more recipes to run from your recipe file: {s_targets}",
     )
 
     parser.add_argument(
@@ -80,6 +96,50 @@ def get_args(pyproject: PyProject) -> argparse.Namespace:
         default=False,
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        metavar="I/N",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--shard-weights",
+        type=str,
+        metavar="FILE",
+        default=None,
+    )
+
+    # Setup a sub-parser to handle mutually-exclusive recording or replaying of commands.
+    cassette_parser = parser.add_mutually_exclusive_group(required=False)
+
+    cassette_parser.add_argument(
+        "--record",
+        type=str,
+        metavar="CASSETTE",
+        default=None,
+    )
+
+    cassette_parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="CASSETTE",
+        default=None,
+    )
+
     # Setup a sub-parser to handle mutually-exclusive setting of --live or --dry-run.
     dry_run_parser = parser.add_mutually_exclusive_group(required=False)
 
@@ -126,6 +186,19 @@ def get_args(pyproject: PyProject) -> argparse.Namespace:
         default=False,
     )
 
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        dest="do_stats",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--export",
+        choices=["ninja"],
+        default=None,
+    )
+
     # Parse all the command-line args/parameters provided (both those above and unknown ones)
     args_static, args_dynamic = parser.parse_known_args()
 
@@ -135,6 +208,17 @@ def get_args(pyproject: PyProject) -> argparse.Namespace:
     return args_static, args_dynamic
 
 
+def _parse_shard(value: str) -> tuple[int, int]:
+    """Convert/validate a shard argument, e.g. "2/3" -> (2, 3)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' must be in the form i/n, e.g. 1/3")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"'{value}' must have 1 <= i <= n")
+    return index, count
+
+
 def _parse_dynamic_args(dynamic_args) -> list[tuple[str, str], str]:
     """Convert/validate the dynamic args to a better data representation."""
     # First, convert from arbitrary inbound list to pairs, ie:
@@ -146,11 +230,12 @@ def _parse_dynamic_args(dynamic_args) -> list[tuple[str, str], str]:
     # Validate that these are all in the right format (ie. as paired method-arg's):
     for method_arg, value in paired:
         if ":" not in method_arg:
-            CONSOLE.print(
+            console = get_console()
+            console.print(
                 "[red]Sorry, unexpected argument or invalid method argument, "
                 "must be in the form [italic]<method_name>:<method_argument> <value>[/]",
             )
-            CONSOLE.print("[red]For example, [italic]--git_commit:message[/] or [italic]--poetry_version:patch[/]")
+            console.print("[red]For example, [italic]--git_commit:message[/] or [italic]--poetry_version:patch[/]")
             sys.exit(1)
 
     # Finally, convert from
@@ -165,14 +250,16 @@ def _parse_dynamic_args(dynamic_args) -> list[tuple[str, str], str]:
 
 
 def do_help(
-    configuration: Configuration,
-    pyproject: PyProject,
+    configuration: TConfiguration,
+    pyproject: TPyProject,
     method_classes: dict[str, TClass],
-    console=CONSOLE,
+    console=None,
 ) -> None:
     from rich.panel import Panel
     from rich.table import Table
 
+    console = console or get_console()
+
     def green(str_: str) -> str:
         return f"[green]{str_}[/]"
 
@@ -180,7 +267,7 @@ def do_help(
         return f"[blue]{str_}[/]"
 
     console.print()
-    console.print("Usage: manage [OPTIONS] <target> [METHOD_ARGS]")
+    console.print("Usage: manage [OPTIONS] <target> [<target>...] [METHOD_ARGS]")
     console.print()
 
     ################################################################################
@@ -208,8 +295,8 @@ def do_help(
     )
 
     table.add_row(
-        blue("--print [<recipeName>]"),
-        green("Print either all recipes or specified target's recipe and exit."),
+        blue("--print [<recipeName>...]"),
+        green("Print either all recipes or specified targets' recipes and exit."),
     )
 
     table.add_row(
@@ -217,6 +304,19 @@ def do_help(
         green("Validate your environment and all recipe definitions and exit."),
     )
 
+    table.add_row(
+        blue("--stats [<recipeName>...]"),
+        green("Show run-history statistics (and critical path) for all recipes or the targets specified and exit."),
+    )
+
+    table.add_row(
+        blue("--export ninja <recipeName>..."),
+        green(
+            "Export the target(s) to a [italic]build.ninja[/] and exit "
+            "(with [italic]--live[/], run them through ninja instead).",
+        ),
+    )
+
     table.add_row(
         blue("----------"),
         green("----------"),
@@ -248,6 +348,48 @@ def do_help(
         ),
     )
 
+    table.add_row(
+        blue("--jobs/-j [italic]<n>[/]"),
+        green(
+            "Run up to [italic]n[/] independent ([italic]parallel[/] or [italic]matrix[/]) steps concurrently; "
+            "default is [italic][bold]1[/].",
+        ),
+    )
+
+    table.add_row(
+        blue("--resume"),
+        green(
+            "Continue from the first step not completed by the last (failed) run of the recipe; "
+            "default is [italic][bold]False[/].",
+        ),
+    )
+
+    table.add_row(
+        blue("--shard [italic]<i/n>[/]"),
+        green(
+            "Run only the i'th of n (balanced) parts of the target's independent steps, e.g. on one of n CI runners "
+            "(with [italic]--print[/], show which part each step is in).",
+        ),
+    )
+
+    table.add_row(
+        blue("--shard-weights [italic]<file>[/]"),
+        green(
+            "Balance [italic]--shard[/] by the step durations in this file (the same on every runner), "
+            "written by [italic]--stats --shard-weights <file>[/]; default is by number of steps.",
+        ),
+    )
+
+    table.add_row(
+        blue("--record [italic]<cassette>[/]"),
+        green("Record every command run (and HTTP request made) along with its result to the cassette file."),
+    )
+
+    table.add_row(
+        blue("--replay [italic]<cassette>[/]"),
+        green("Replay the results of every command (and HTTP request) from the cassette file instead of running it."),
+    )
+
     table.add_row(
         blue("--debug/-d"),
         green(
@@ -288,54 +430,210 @@ def do_help(
         console.print(panel)
 
 
-def validate_target(configuration: Configuration, pyproject: PyProject) -> bool:
-    """Make sure the user's requested target is valid.
+def do_stats(configuration: TConfiguration, recipes: TRecipes, history=None, console=None) -> None:
+    """Display run-history statistics (percentiles, trends and critical path) for all recipes or the target.
+
+    With --shard-weights, also write the estimated duration of every step to the file (see do_shards).
+    """
+    from rich.table import Table
+
+    from manage import scheduler
+    from manage.history import History, percentile, write_weights
+
+    console = console or get_console()
+    history = History() if history is None else history
+    if not history.exists():
+        console.print("[yellow]Sorry, there's no run history yet, run a recipe first!")
+        return
+
+    estimates = history.estimates()
+    step_times = history.step_times()
+
+    def __fmt(seconds: float | None) -> str:
+        return "-" if seconds is None else f"{seconds:.2f}s"
+
+    def __trend(walls: list[float]) -> str:
+        """Compare the median of our most recent runs against those before it."""
+        recent, previous = walls[-TREND_WINDOW:], walls[-4 * TREND_WINDOW : -TREND_WINDOW]
+        if not previous or not (median_previous := percentile(previous, 50)):
+            return "-"
+        change = (percentile(recent, 50) - median_previous) / median_previous * 100
+        if abs(change) < 10:
+            return f"{change:+.0f}%"
+        return f"[red]↑ {change:+.0f}%[/]" if change > 0 else f"[green]↓ {change:+.0f}%[/]"
+
+    names = configuration.targets or list(recipes.keys())
+    for name in names:
+        groups = scheduler.plan(recipes, name)
+        table = Table(title=f"[bold italic]{name}[/]", title_justify="left", expand=True)
+        for column in ("Step", "Runs", "p50", "p90", "p99", "CPU p50", "Last", "Trend"):
+            table.add_column(column, justify="left" if column == "Step" else "right")
+        for group in groups:
+            for job in group:
+                times = step_times.get((job.recipe, job.index, job.step.method), [])
+                walls = [wall for wall, _, status in times if status == "success"]
+                cpus = [cpu for _, cpu, status in times if status == "success"]
+                label = f"{job.recipe}\\[{job.index}] {job.step.method}" + (" ∥" if len(group) > 1 else "")
+                table.add_row(
+                    label,
+                    str(len(times)),
+                    __fmt(percentile(walls, 50)),
+                    __fmt(percentile(walls, 90)),
+                    __fmt(percentile(walls, 99)),
+                    __fmt(percentile(cpus, 50)),
+                    __fmt(times[-1][0] if times else None),
+                    __trend(walls),
+                )
+        console.print(table)
+
+        total, path = scheduler.critical_path(groups, estimates)
+        console.print(f"Critical path ({__fmt(total)}): " + " → ".join(job.step.method for job in path))
+    history.close()
+
+    if configuration.shard_weights:
+        write_weights(Path(configuration.shard_weights), estimates)
+        console.print(f"Wrote the weights of {len(estimates)} step(s) to [italic]{configuration.shard_weights}[/]")
+
+
+def do_shards(configuration: TConfiguration, recipes: TRecipes, console=None) -> None:
+    """Display the shard each step of our target(s) is assigned to (ie. --print with --shard i/n).
+
+    Shards are balanced by the --shard-weights file (if any), *not* by our own run history, such that every
+    runner assigns the steps in the same way. Note: The estimates shown are those of the weights file.
+    """
+    from rich.table import Table
+
+    from manage import scheduler
+    from manage.history import read_weights
+    from manage.matrix import describe
+
+    console = console or get_console()
+    estimates = read_weights(Path(configuration.shard_weights)) if configuration.shard_weights else {}
+
+    index, count = configuration.shard
+    groups = scheduler.plan(recipes, *[recipes.get_target(target) for target in configuration.targets])
+    assignments = scheduler.assign(groups, count, estimates)
+
+    table = Table(title=f"[bold italic]{configuration.get_run_name()}[/]", title_justify="left", expand=True)
+    for column in ("Step", "Shard", "Estimate"):
+        table.add_column(column, justify="left" if column == "Step" else "right")
+    for group in groups:
+        for job in group:
+            label = job.describe() + (f" \\[{describe(job.cell)}]" if job.cell else "")
+            if (unit := scheduler.unit(job, group)) is None:
+                shard = "all"
+            else:
+                shard = f"{assignments[unit] + 1}/{count}"
+            estimate = f"{estimates[job.key]:.2f}s" if job.key in estimates else "-"
+            style = "bold" if shard in ("all", f"{index}/{count}") else "grey50"
+            table.add_row(label, shard, estimate, style=style)
+    console.print(table)
+
+
+def validate_target(configuration: TConfiguration, pyproject: TPyProject) -> bool:
+    """Make sure the user's requested target(s) are valid.
 
     By this time, we've already taken care of --help, --version, --print and --validate,
-    thus, we *should* have a valid target now to work from.
+    thus, we *should* have at least one valid target now to work from.
     """
     # Get list of valid targets from the user's pyproject.toml recipe definitions
     s_targets = pyproject.get_formatted_list_of_targets()
 
-    if not configuration.target:
+    if not configuration.targets:
         msg = (
             f"[red]Sorry, we're expecting a valid recipe target to execute, "
             f"must be one of [yellow][italic]{s_targets}[/].",
         )
-        CONSOLE.print(msg)
+        get_console().print(msg)
         return False
 
-    if not pyproject.is_valid_target(configuration.target):
-        msg = (
-            f"[red]Sorry, [italic]{configuration.target}[/] is not a valid recipe, "
-            f"must be one of [yellow][italic]{s_targets}[/]."
-        )
-        CONSOLE.print(msg)
-        return False
+    for target in configuration.targets:
+        if not pyproject.is_valid_target(target):
+            msg = (
+                f"[red]Sorry, [italic]{target}[/] is not a valid recipe, "
+                f"must be one of [yellow][italic]{s_targets}[/]."
+            )
+            get_console().print(msg)
+            return False
 
+    # Targets are case-insensitive, from here on, use the recipes' actual names:
+    configuration.targets = [pyproject.get_target(target) for target in configuration.targets]
+    configuration.target = configuration.targets[0]
     return True
 
 
-def _go(configuration: Configuration, recipes: Recipes) -> int:
-    """Walk the tree twice: first to validate methods for the specified target and then to run if ok."""
+def _validate(configuration: TConfiguration, recipes: TRecipes) -> list[str]:
+    """Validate the methods of our target(s) all at once, ie. each recipe they share only once."""
+    fails, validated = [], set()
+    for target in configuration.targets:
+        recipes.validate_recipe(configuration, target, fails, validated)
+    return fails
+
+
+def _export(configuration: TConfiguration, recipes: TRecipes) -> int:
+    """Export our target(s) to a build.ninja and, if we're live, run them through ninja."""
+    from manage import ninja
+
+    fails = _validate(configuration, recipes)
+    if not fails:
+        text, fails = ninja.export(configuration, recipes)
+    if not configuration.dry_run and (msg := ninja.validate()):
+        fails.append(msg)
+    if not configuration.dry_run and (configuration.record or configuration.replay):
+        fails.append("Sorry, ninja runs the commands itself, they can't be recorded nor replayed (omit --live).")
+    if fails:
+        for fail in fails:
+            msg_failure(f"- {fail}")
+        return 1
+
+    ninja.NINJA_PATH.write_text(text)
+    msg_success(f"Exported [italic]{configuration.get_run_name()}[/] to [italic]{ninja.NINJA_PATH}[/]")
+    if configuration.dry_run:
+        return 0
+    return ninja.run(configuration)
+
+
+def _go(configuration: TConfiguration, recipes: TRecipes) -> int:
+    """Walk the tree twice: first to validate methods for the specified target(s) and then to run if ok."""
     # Validation run..
-    if fails := recipes.validate_recipe(configuration, configuration.target):
+    if fails := _validate(configuration, recipes):
         for fail in fails:
             msg_failure(f"- {fail}")
         return 1
 
     # "Real" run..
+    from manage.journal import JournalError
+
     try:
-        recipes.run(configuration)
+        if not recipes.run(configuration):
+            if not configuration.dry_run:
+                get_console().print(
+                    "[yellow]Fix and re-run with [italic]--resume[/] to continue from the failed step "
+                    "(without committing or changing the files the run has already changed).",
+                )
+            return 1
+    except JournalError as err:
+        msg_failure(str(err))
+        return 1
     except (KeyboardInterrupt, EOFError):
-        ...
+        # Every command runs in its own process group (and thus doesn't see the Ctrl-C), make sure nothing survives us:
+        from manage import processes
+
+        processes.kill_all()
+        msg_failure("Interrupted.")
+        return 130
     return 0
 
 
 def main():
+    # Fast-path: --version needs nothing else (not even a pyproject.toml), so don't import or read anything!
+    if "--version" in sys.argv[1:]:
+        print(__version__)
+        sys.exit(0)
+
     # Before anything else, make sure we're working from the root-level of the target project and have a pyproject.toml.
     if not PYPROJECT_PATH.exists():
-        CONSOLE.print(
+        get_console().print(
             "[red]Sorry, you need to run this from the same directory that your pyproject.toml file exists in.",
         )
         sys.exit(1)
@@ -345,6 +643,9 @@ def main():
     ################################################################################
     configuration, pyproject = process_arguments()
 
+    from manage.methods import gather_available_method_classes
+    from manage.models import Recipes
+
     ################################################################################
     # Gather available methods from package's library:
     ################################################################################
@@ -368,9 +669,32 @@ def main():
     # If we're only doing "--print"...do so and WE'RE DONE!
     ################################################################################
     if configuration.do_print:
-        recipes.print(configuration)
+        if configuration.shard:
+            if not validate_target(configuration, pyproject):
+                sys.exit(1)
+            do_shards(configuration, recipes)
+        else:
+            recipes.print(configuration)
+        sys.exit(0)
+
+    ################################################################################
+    # If we're only doing "--stats"...do so and WE'RE DONE!
+    ################################################################################
+    if configuration.do_stats:
+        if configuration.targets and not validate_target(configuration, pyproject):
+            sys.exit(1)
+        do_stats(configuration, recipes)
         sys.exit(0)
 
+    ################################################################################
+    # Everything from here on might need environment variables (e.g. for github), note
+    # that this walks up parent directories looking for a .env, hence, only done now.
+    ################################################################################
+    from dotenv import load_dotenv
+    from manage.validate import validate_environment, validate_method_classes
+
+    load_dotenv(verbose=True)
+
     ################################################################################
     # If we're only doing "--validate"...do so and WE'RE DONE!
     ################################################################################
@@ -393,6 +717,12 @@ def main():
     if not validate_environment(False, configuration, recipes, method_classes):
         sys.exit(1)
 
+    ################################################################################
+    # If we're exporting (and perhaps running through) a build file...do so and WE'RE DONE!
+    ################################################################################
+    if configuration.export:
+        sys.exit(_export(configuration, recipes))
+
     ################################################################################
     # Go!
     ################################################################################
@@ -0,0 +1,149 @@
+"""Live display of the steps running concurrently, ie. one row per step with its elapsed time, last line of output and status.
+
+The display is redrawn at a bounded rate (FRAME_RATE times a second, from a background thread) no matter how
+much output the steps produce, as a step's output only updates the state of its row (and its log). Once a step
+completes, its output is printed as a block above the display (as it always has been). The full output of each
+step is also kept in .manage/logs, e.g. .manage/logs/build.2.log.
+
+When stdout isn't a terminal (e.g. on CI), there's no display, just the blocks of output as each step completes.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO, TextIOBase
+from pathlib import Path
+from typing import Iterator, TypeVar
+
+from manage import MANAGE_PATH
+from manage.journal import job_id
+from manage.matrix import describe
+from manage.utilities import get_console
+
+TJob = TypeVar("TJob")
+
+LOGS_PATH = MANAGE_PATH / "logs"
+
+# Maximum number of times a second we redraw the display:
+FRAME_RATE = 4
+
+ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+LEADERS = re.compile(r"\.{3,}")  # (ie. the padding of our messages, see utilities.message)
+
+
+def log_path(job: TJob, path_logs: Path | None = None) -> Path:
+    """Return the path of the log file for the job specified, e.g. .manage/logs/test.1[python=3.12].log."""
+    return (path_logs or LOGS_PATH) / (re.sub(r"[^\w.=\[\]-]+", ".", job_id(job)) + ".log")
+
+
+class StepOutput(TextIOBase):
+    """Where the (captured) output of a step goes, ie. its log, a buffer (to print once it's done) and its last line."""
+
+    def __init__(self, path: Path):
+        """Open the step's log (replacing that of any previous run)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.log = open(path, "w", encoding="utf-8")
+        self.buffer = StringIO()
+        self.last_line = ""
+        self._partial = ""  # (the line being written)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        """Write to the buffer and (without styling) to our log, noting the last line of output."""
+        self.buffer.write(text)
+        plain = ANSI.sub("", text)
+        self.log.write(plain)
+        *lines, self._partial = (self._partial + plain).split("\n")
+        for line in reversed(lines):
+            if line := LEADERS.sub(" ", line).strip():
+                self.last_line = line
+                break
+        return len(text)
+
+    def flush(self) -> None:
+        self.log.flush()
+
+    def close(self) -> None:
+        super().close()  # (flushes)
+        self.log.close()
+
+    def getvalue(self) -> str:
+        """Return everything written so far (styling included), like a StringIO."""
+        return self.buffer.getvalue()
+
+    def current(self) -> str:
+        """Return the line being written or, if none, the last line written."""
+        return LEADERS.sub(" ", self._partial).strip() or self.last_line
+
+
+class Row:
+    """State of a step on our display."""
+
+    def __init__(self, job: TJob):
+        self.job = job
+        self.status = "waiting"  # (for its turn/resources, see jobserver)
+        self.started: float | None = None
+        self.output: StepOutput | None = None
+
+
+class Dashboard:
+    """Display of the steps of a group running concurrently, use as a context manager around running them."""
+
+    def __init__(self, jobs: list[TJob], path_logs: Path | None = None, console=None):
+        """Note: the display is only shown if our console is a terminal."""
+        self.path_logs = path_logs or LOGS_PATH
+        self.console = console or get_console()
+        self._rows = {job_id(job): Row(job) for job in jobs}
+        self._lock = threading.Lock()
+        self._live = None
+
+    def __enter__(self) -> "Dashboard":
+        if self.console.is_terminal:
+            from rich.live import Live
+
+            self._live = Live(self, console=self.console, refresh_per_second=FRAME_RATE, transient=True)
+            self._live.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._live is not None:
+            self._live.stop()
+
+    @contextmanager
+    def step(self, job: TJob) -> Iterator[StepOutput]:
+        """Show the job specified as running while in context, yielding where its output should go (see capture)."""
+        output = StepOutput(log_path(job, self.path_logs))
+        row = self._rows[job_id(job)]
+        with self._lock:
+            row.status, row.started, row.output = "running", time.monotonic(), output
+        try:
+            yield output
+        finally:
+            output.close()
+            with self._lock:
+                del self._rows[job_id(job)]
+
+    def __rich__(self):
+        """Render our display (called by rich's refresh thread, ie. at most FRAME_RATE times a second)."""
+        from rich.table import Table
+        from rich.text import Text
+
+        table = Table(box=None, expand=True, show_header=False, padding=(0, 1))
+        table.add_column("Step", no_wrap=True)
+        table.add_column("Elapsed", justify="right", no_wrap=True)
+        table.add_column("Output", ratio=1, no_wrap=True, overflow="ellipsis", style="grey70")
+        table.add_column("Status", justify="right", no_wrap=True)
+        now = time.monotonic()
+        with self._lock:
+            rows = list(self._rows.values())
+        for row in rows:
+            running = row.status == "running"
+            table.add_row(
+                row.job.describe() + (f" \\[{describe(row.job.cell)}]" if row.job.cell else ""),
+                f"{now - row.started:.1f}s" if running else "",
+                Text(row.output.current() if running else ""),  # (ie. not rich markup!)
+                f"[yellow]{row.status}" if running else f"[grey50]{row.status}",
+            )
+        return table
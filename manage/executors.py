@@ -0,0 +1,268 @@
+"""Executors, ie. how methods reach the outside world (running commands and making HTTP requests).
+
+Methods don't run commands themselves but through the executor of our configuration:
+
+- Executor: The real thing (the default).
+- RecordingExecutor: Runs everything for real *and* records each command's (or request's) result
+  to a "cassette" file (one json entry per line), e.g. `manage release --live --record release.jsonl`.
+- ReplayExecutor: Serves results back from a cassette without running anything at all, e.g.
+  `manage release --live --replay release.jsonl`, such that recipes can be (regression) tested
+  and profiled without any of the tools they use (poetry, git, pandoc etc.) nor network access.
+
+Everything that reaches the outside world goes through here: commands (including those of the git helpers
+in vcs and our PEP 517 build workers), matrix cell environments (not created on replay) and HTTP requests
+(including uploads through a requests session). Note: Only the differences from our own environment (e.g.
+those of a matrix cell) are recorded of a command's environment (and its working directory relative to
+ours), and never any HTTP headers, request bodies or credentials.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from manage import processes
+
+# Environment variables that vary from machine to machine or run to run (and thus aren't used to match commands on
+# replay), e.g. the temporary index of vcs.get_tree:
+ENV_UNMATCHED = ("PATH", "VIRTUAL_ENV", "GIT_INDEX_FILE")
+
+# Return code of a command that isn't in the cassette being replayed (as per a shell's "command not found"):
+RC_NOT_RECORDED = 127
+
+# Status code of an HTTP request that isn't in the cassette being replayed (not retried, see upload.upload_file):
+HTTP_NOT_RECORDED = 599
+
+
+class RequestError(Exception):
+    """An HTTP request couldn't be made at all (e.g. a connection error), whether made for real or replayed."""
+
+
+class Response(NamedTuple):
+    """The (little) we need from the response to an HTTP request."""
+
+    status_code: int
+    text: str
+    reason: str = ""
+
+    def json(self) -> Any:
+        """Return the body of the response as json."""
+        return json.loads(self.text) if self.text else {}
+
+
+class Executor:
+    """Run commands and make HTTP requests for real."""
+
+    def run(
+        self,
+        args: list[str],
+        cwd: str | Path | None = None,
+        env: dict[str, str] | None = None,
+        timeout: float | None = None,
+        max_memory: int | None = None,
+        cpu_seconds: int | None = None,
+    ) -> processes.Completed:
+        """Run the command specified, see processes.run."""
+        return processes.run(args, timeout, max_memory, cpu_seconds, cwd=cwd, env=env)
+
+    def pipeline(
+        self,
+        stages: list[processes.Stage],
+        cwd: str | Path | None = None,
+        env: dict[str, str] | None = None,
+        timeout: float | None = None,
+        max_memory: int | None = None,
+        cpu_seconds: int | None = None,
+    ) -> processes.Completed:
+        """Run the pipeline specified, see processes.pipeline."""
+        return processes.pipeline(stages, timeout, max_memory, cpu_seconds, cwd=cwd, env=env)
+
+    @contextmanager
+    def session(self, max_connections: int = 1) -> Iterator[Any]:
+        """Yield a requests session (with a connection pool of the size specified) to make (concurrent) requests with."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            yield session
+
+    def post(self, url: str, session: Any | None = None, **kwargs) -> Response:
+        """Make an HTTP POST request (with the same arguments as requests.post), through the session provided if any."""
+        import requests
+
+        try:
+            response = (session or requests).post(url, **kwargs)
+        except requests.RequestException as err:
+            raise RequestError(f"{type(err).__name__}: {err}") from err
+        return Response(response.status_code, response.text, response.reason or "")
+
+
+class RecordingExecutor(Executor):
+    """Run commands and make HTTP requests for real, recording each result to a cassette."""
+
+    def __init__(self, path: Path):
+        """Start a new (empty) cassette."""
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+        self._lock = threading.Lock()  # Steps (and thus commands) may be run concurrently.
+
+    def run(self, args: list[str], cwd: str | Path | None = None, env: dict[str, str] | None = None, **limits):
+        """Run the command specified, recording its result."""
+        started = time.perf_counter()
+        result = super().run(args, cwd, env, **limits)
+        self._record(
+            kind="command",
+            args=list(args),
+            cwd=relative_cwd(cwd),
+            env=env_subset(env),
+            returncode=result.returncode,
+            stdout=result.stdout.decode(errors="surrogateescape"),
+            stderr=result.stderr.decode(errors="surrogateescape"),
+            limit=result.limit,
+            seconds=round(time.perf_counter() - started, 6),
+        )
+        return result
+
+    def pipeline(self, stages: list[processes.Stage], cwd=None, env=None, **limits) -> processes.Completed:
+        """Run the pipeline specified, recording its result (as a command, see arguments)."""
+        started = time.perf_counter()
+        result = super().pipeline(stages, cwd, env, **limits)
+        self._record(
+            kind="command",
+            args=arguments(stages),
+            cwd=relative_cwd(cwd),
+            env=env_subset(env),
+            returncode=result.returncode,
+            stdout=result.stdout.decode(errors="surrogateescape"),
+            stderr=result.stderr.decode(errors="surrogateescape"),
+            limit=result.limit,
+            seconds=round(time.perf_counter() - started, 6),
+        )
+        return result
+
+    def post(self, url: str, session: Any | None = None, **kwargs) -> Response:
+        """Make an HTTP POST request, recording its response or error (but nothing of the request except the url)."""
+        started = time.perf_counter()
+        try:
+            response = super().post(url, session, **kwargs)
+        except RequestError as err:
+            self._record(kind="post", url=url, error=str(err), seconds=round(time.perf_counter() - started, 6))
+            raise
+        self._record(
+            kind="post",
+            url=url,
+            status_code=response.status_code,
+            text=response.text,
+            reason=response.reason,
+            seconds=round(time.perf_counter() - started, 6),
+        )
+        return response
+
+    def _record(self, **entry) -> None:
+        """Append an entry to our cassette (as we go, so we have everything up to a failure or Ctrl-C)."""
+        with self._lock, self.path.open("a") as file_:
+            file_.write(json.dumps(entry) + "\n")
+
+
+class ReplayExecutor(Executor):
+    """Serve the results of commands and HTTP requests from a cassette, without running (or requesting) anything.
+
+    Commands are matched by their arguments (the executable by name only, e.g. an interpreter's path differs
+    from checkout to checkout), working directory and environment (differences), the same command run more
+    than once is served its results in the order they were recorded.
+    """
+
+    def __init__(self, path: Path):
+        """Read the cassette specified."""
+        self.path = path
+        self._entries: dict[tuple, deque[dict]] = defaultdict(deque)
+        for line in path.read_text().splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self._entries[self._key(entry)].append(entry)
+        self._lock = threading.Lock()
+
+    def run(self, args: list[str], cwd: str | Path | None = None, env: dict[str, str] | None = None, **limits):
+        """Return the recorded result of the command specified."""
+        key = self._key(dict(kind="command", args=list(args), cwd=relative_cwd(cwd), env=env_subset(env)))
+        if not (entry := self._next(key)):
+            return processes.Completed(RC_NOT_RECORDED, b"", f"Not in {self.path.name}: {' '.join(args)}".encode())
+        return processes.Completed(
+            entry["returncode"],
+            entry["stdout"].encode(errors="surrogateescape"),
+            entry["stderr"].encode(errors="surrogateescape"),
+            entry.get("limit"),
+        )
+
+    def pipeline(self, stages: list[processes.Stage], cwd=None, env=None, **limits) -> processes.Completed:
+        """Return the recorded result of the pipeline specified (note: nothing's written to its redirections!)."""
+        return self.run(arguments(stages), cwd, env, **limits)
+
+    @contextmanager
+    def session(self, max_connections: int = 1) -> Iterator[Any]:
+        """No session needed, we don't make any requests!"""
+        yield None
+
+    def post(self, url: str, session: Any | None = None, **kwargs) -> Response:
+        """Return the recorded response to (or error from) an HTTP POST request to the url specified."""
+        if not (entry := self._next(self._key(dict(kind="post", url=url)))):
+            return Response(HTTP_NOT_RECORDED, json.dumps({"message": f"Not in {self.path.name}: POST {url}"}))
+        if "error" in entry:
+            raise RequestError(entry["error"])
+        return Response(entry["status_code"], entry["text"], entry.get("reason", ""))
+
+    def _next(self, key: tuple) -> dict | None:
+        """Return (and use up) the next recorded entry for the key specified."""
+        with self._lock:
+            entries = self._entries.get(key)
+            return entries.popleft() if entries else None
+
+    @staticmethod
+    def _key(entry: dict) -> tuple:
+        """Return the key we match entries on."""
+        if entry["kind"] == "post":
+            return ("post", entry["url"])
+        env = {key: value for key, value in (entry.get("env") or {}).items() if key not in ENV_UNMATCHED}
+        args = [Path(arg).name if index == 0 else arg for index, arg in enumerate(entry["args"])]
+        return ("command", tuple(args), entry.get("cwd"), tuple(sorted(env.items())))
+
+
+def arguments(stages: list[processes.Stage]) -> list[str]:
+    """Return the arguments we record a pipeline as, e.g. ["sort", "in.txt", "|", "uniq", ">", "out.txt"]."""
+    args = []
+    for stage in stages:
+        args += (["|"] if args else []) + stage.describe()
+    return args
+
+
+def relative_cwd(cwd: str | Path | None) -> str | None:
+    """Return the working directory we record a command by, ie. relative to ours (None if it *is* ours)."""
+    if not cwd:
+        return None
+    path, ours = Path(cwd).resolve(), Path.cwd().resolve()
+    if path == ours:
+        return None
+    return str(path.relative_to(ours)) if path.is_relative_to(ours) else str(path)
+
+
+def env_subset(env: dict[str, str] | None) -> dict[str, str]:
+    """Return only those environment variables that differ from our own (ie. those specific to the command)."""
+    if env is None:
+        return {}
+    return {key: value for key, value in env.items() if os.environ.get(key) != value}
+
+
+def factory(record: str | None = None, replay: str | None = None) -> Executor:
+    """Return the executor for the cassette (if any) to be recorded or replayed."""
+    if replay:
+        return ReplayExecutor(Path(replay))
+    if record:
+        return RecordingExecutor(Path(record))
+    return Executor()
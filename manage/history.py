@@ -0,0 +1,141 @@
+"""Run-history database, ie. a record of every step executed (and how long it took) in .manage/history.db."""
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from manage import MANAGE_PATH
+
+HISTORY_PATH = MANAGE_PATH / "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    id          INTEGER PRIMARY KEY,
+    run_id      TEXT    NOT NULL,
+    started_at  REAL    NOT NULL,
+    target      TEXT    NOT NULL,
+    recipe      TEXT    NOT NULL,
+    step        INTEGER NOT NULL,
+    method      TEXT    NOT NULL,
+    args_hash   TEXT    NOT NULL,
+    status      TEXT    NOT NULL,
+    wall_time   REAL    NOT NULL,
+    cpu_time    REAL    NOT NULL,
+    exit_code   INTEGER,
+    output_size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS steps_by_method ON steps (method, args_hash, started_at);
+CREATE INDEX IF NOT EXISTS steps_by_recipe ON steps (recipe, step, started_at);
+"""
+
+# How many of the most recent (successful) executions of a step we use to estimate its duration:
+ESTIMATE_WINDOW = 10
+
+
+def args_hash(arguments: dict[str, Any]) -> str:
+    """Return a short, stable hash of a step's arguments."""
+    return hashlib.sha256(json.dumps(arguments, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def write_weights(path: Path, estimates: dict[tuple[str, str], float]) -> None:
+    """Write the estimates to a (json) weights file, e.g. to share with every runner of --shard i/n."""
+    weights = sorted([method, hash_, round(seconds, 3)] for (method, hash_), seconds in estimates.items())
+    path.write_text(json.dumps(weights, indent=1) + "\n")
+
+
+def read_weights(path: Path) -> dict[tuple[str, str], float]:
+    """Return the estimates from a weights file (see write_weights), raises ValueError if it isn't one."""
+    try:
+        return {(method, hash_): float(seconds) for method, hash_, seconds in json.loads(path.read_text())}
+    except (OSError, TypeError, ValueError) as err:
+        raise ValueError(f"Sorry, unable to read shard weights from {path} ({err}).")
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Return the pct'th percentile (nearest-rank) of the values provided."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class History:
+    """Encapsulate our (sqlite-based) run-history database."""
+
+    def __init__(self, path: Path | None = None):
+        """Note: we don't create/connect to the database until we actually need it."""
+        self.path = path or HISTORY_PATH
+        self._connection = None
+        self._lock = threading.Lock()  # Steps may be run (and thus recorded) concurrently.
+        self.enabled = True  # Set to False if we can't write to our database (history should never stop a run!)
+        self.run_id = f"{time.time():.6f}"
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return our (lazily created) connection."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def exists(self) -> bool:
+        """Return True if we actually have any history to work with."""
+        return self._connection is not None or self.path.exists()
+
+    def record(self, **values) -> None:
+        """Record a single step execution."""
+        if not self.enabled:
+            return
+        columns = ", ".join(values)
+        parameters = ", ".join(f":{column}" for column in values)
+        with self._lock:
+            try:
+                self.connection.execute(
+                    f"INSERT INTO steps (run_id, {columns}) VALUES (:run_id, {parameters})",
+                    {"run_id": self.run_id, **values},
+                )
+            except (sqlite3.Error, OSError) as err:
+                from manage.utilities import msg_warning
+
+                msg_warning(f"Unable to record run history in {self.path} ({err}), continuing without it.")
+                self.enabled = False
+
+    def estimates(self) -> dict[tuple[str, str], float]:
+        """Return our best guess of the wall-time for each (method, args_hash), ie. median of recent successes."""
+        if not self.exists():
+            return {}
+        walls: dict[tuple[str, str], list[float]] = {}
+        sql = "SELECT method, args_hash, wall_time FROM steps WHERE status = 'success' ORDER BY started_at DESC"
+        for method, hash_, wall_time in self.connection.execute(sql):
+            if len(times := walls.setdefault((method, hash_), [])) < ESTIMATE_WINDOW:
+                times.append(wall_time)
+        return {key: percentile(times, 50) for key, times in walls.items()}
+
+    def step_times(self, recipe: str | None = None) -> dict[tuple[str, int, str], list[tuple[float, float, str]]]:
+        """Return (wall, cpu, status) for every execution, oldest first, keyed by (recipe, step, method)."""
+        if not self.exists():
+            return {}
+        sql = "SELECT recipe, step, method, wall_time, cpu_time, status FROM steps"
+        parms = {}
+        if recipe:
+            sql += " WHERE recipe = :recipe"
+            parms["recipe"] = recipe
+        return_: dict[tuple[str, int, str], list[tuple[float, float, str]]] = {}
+        for recipe_, step, method, wall_time, cpu_time, status in self.connection.execute(
+            sql + " ORDER BY started_at",
+            parms,
+        ):
+            return_.setdefault((recipe_, step, method), []).append((wall_time, cpu_time, status))
+        return return_
+
+    def close(self) -> None:
+        """Close our connection (if we ever opened one)."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
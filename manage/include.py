@@ -0,0 +1,91 @@
+"""Shared recipe libraries, ie. [tool.manage] include = ["~/recipes/company.toml", ...].
+
+An included file defines recipes exactly as a pyproject.toml does (ie. under [tool.manage.recipes])
+or, more simply, at the top-level (ie. under [recipes]). Recipes from later includes override those
+from earlier ones and the project's own recipes override them all.
+
+As the same library is typically included by many projects, each is cached (once parsed and
+validated) by the hash of its contents, so it's only ever parsed once, no matter who includes it.
+"""
+import hashlib
+import json
+import os
+import tomllib
+from pathlib import Path
+
+from manage import __version__
+
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "manage" / "includes"
+
+
+class IncludeError(Exception):
+    """An included recipe file couldn't be read, parsed or validated."""
+
+
+def get_recipes(raw: dict) -> dict:
+    """Return the (raw) recipes in the raw contents of an included file."""
+    if "tool" in raw:
+        return raw.get("tool", {}).get("manage", {}).get("recipes", {})
+    return raw.get("recipes", {})
+
+
+def validate_recipes(recipes: dict) -> list[str]:
+    """Validate the structure of (raw) recipes, returning any issues found."""
+    from pydantic import ValidationError
+
+    from manage.models.step import Step
+
+    fails = []
+    for name, recipe in recipes.items():
+        if not isinstance(recipe, dict) or not isinstance(steps := recipe.get("steps", []), list):
+            fails.append(f"'[italic]{name}[/]' must be a table with a list of steps.")
+            continue
+        for index, step in enumerate(steps, start=1):
+            try:
+                Step.model_validate(step)
+            except ValidationError as err:
+                fails.append(f"'[italic]{name}[/]', step {index}: {err.errors()[0]['msg']}")
+    return fails
+
+
+def load(path: Path, cache_path: Path | None = None) -> dict:
+    """Return the (raw but validated) recipes from the include file specified, using our cache if we can."""
+    cache_path = cache_path or CACHE_PATH
+    try:
+        contents = path.read_bytes()
+    except OSError as err:
+        raise IncludeError(f"Unable to read included recipes from {path} ({err.strerror}).")
+
+    # Our version is part of the key as what's "valid" may change from one version to the next:
+    path_cached = cache_path / f"{hashlib.sha256(__version__.encode() + contents).hexdigest()}.json"
+    try:
+        return json.loads(path_cached.read_text())
+    except (OSError, ValueError):
+        pass  # Not cached yet (or unreadable), either way, parse it!
+
+    try:
+        recipes = get_recipes(tomllib.loads(contents.decode()))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError) as err:
+        raise IncludeError(f"Unable to parse included recipes from {path} ({err}).")
+    if fails := validate_recipes(recipes):
+        raise IncludeError(f"Invalid included recipes in {path}: " + " ".join(fails))
+
+    try:  # Write atomically, others might be reading it right now:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        path_temp = path_cached.with_suffix(f".{os.getpid()}.tmp")
+        path_temp.write_text(json.dumps(recipes, default=str))
+        path_temp.replace(path_cached)
+    except OSError:
+        pass  # The cache is only an optimisation!
+    return recipes
+
+
+def load_all(includes: list[str] | str, root: Path, cache_path: Path | None = None) -> tuple[dict, list[str]]:
+    """Return the combined recipes from all the includes specified (relative to root) and any errors found."""
+    recipes, errors = {}, []
+    for include in [includes] if isinstance(includes, str) else includes:
+        try:
+            recipes.update(load(root / Path(include).expanduser(), cache_path))
+        except IncludeError as err:
+            errors.append(str(err))
+    return recipes, errors
@@ -0,0 +1,159 @@
+"""Resource-aware scheduling of concurrent steps, ie. a GNU make compatible jobserver (plus memory).
+
+With --jobs n (n > 1), we hold n job "tokens", one implicitly (as every make does) and n-1 in a pipe.
+Each step concurrently run takes the tokens it declares (`cpus`, default 1) before it's started and
+returns them once done. The pipe is advertised to the commands we run (through MAKEFLAGS) such that a
+make (or any other jobserver client, e.g. cargo) run by a step takes its additional jobs from the same
+pool rather than running n jobs of its own, ie. the machine is saturated but not oversubscribed.
+
+Steps can also reserve `memory`, a step isn't started while the memory reserved by those running would
+exceed that available (as of the start of its group). A step needing more tokens or memory than there
+are in total is run on its own.
+"""
+import os
+import threading
+from typing import NamedTuple
+
+from manage import processes
+
+# What's in the pipe (any single byte will do but this is what make uses):
+TOKEN = b"+"
+
+
+class Cancelled(Exception):
+    """The jobserver was cancelled (e.g. on Ctrl-C) while waiting for resources."""
+
+
+class Reservation(NamedTuple):
+    """The resources held by a running step."""
+
+    implicit: bool  # Do we hold the implicit token?
+    tokens: bytes  # Tokens read from the pipe (which we return as-is)
+    memory: int  # Bytes of memory reserved
+
+
+def available_memory() -> int | None:
+    """Return the memory available (in bytes) for new processes, ie. without swapping (or None if unknown)."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Jobserver:
+    """Encapsulate our jobserver, use as a context manager to advertise it to the commands we run."""
+
+    def __init__(self, jobs: int, memory: int | None = None):
+        """Fill the pipe with our tokens (less our implicit one)."""
+        self.jobs = jobs
+        self.memory = memory if memory is not None else available_memory()
+        self.read_fd, self.write_fd = os.pipe()
+        os.write(self.write_fd, TOKEN * (jobs - 1))
+        self._condition = threading.Condition()
+        self._implicit = True  # Is our implicit token free?
+        self._lent = 0  # Number of times our implicit token has been handed on through the pipe (see release)
+        self._waiting = False  # Is a step blocked waiting on the pipe?
+        self._reserved = 0  # Bytes of memory reserved by the steps running
+        self._next = 0  # Next ticket to hand out (steps reserve resources strictly in ticket order)
+        self._turn = 0  # Ticket whose turn it is to reserve resources
+        self._cancelled = False
+        self._makeflags: str | None = None
+
+    def __enter__(self) -> "Jobserver":
+        """Advertise our pipe to the commands we run, ie. through MAKEFLAGS (in both old and new formats)."""
+        self._makeflags = os.environ.get("MAKEFLAGS")
+        fds = f"{self.read_fd},{self.write_fd}"
+        os.environ["MAKEFLAGS"] = f" -j{self.jobs} --jobserver-fds={fds} --jobserver-auth={fds}"
+        processes.inherit(self.read_fd, self.write_fd)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop advertising our pipe (and close it)."""
+        processes.inherit()
+        if self._makeflags is None:
+            os.environ.pop("MAKEFLAGS", None)
+        else:
+            os.environ["MAKEFLAGS"] = self._makeflags
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def refresh(self) -> None:
+        """Update the memory available (only called between groups, ie. when nothing's reserved)."""
+        self.memory = available_memory()
+
+    def ticket(self) -> int:
+        """Return the next ticket, ie. our place in the queue to reserve resources."""
+        with self._condition:
+            self._next += 1
+            return self._next - 1
+
+    def reserve(self, ticket: int, cpus: int | None = None, memory: int | None = None) -> Reservation:
+        """Wait for our turn and then for the tokens and memory requested (each capped to the total available)."""
+        cpus = min(max(1, cpus or 1), self.jobs)
+        with self._condition:
+            self._condition.wait_for(lambda: self._cancelled or self._turn == ticket)
+            memory = min(memory or 0, self.memory) if self.memory is not None else 0
+            self._condition.wait_for(lambda: self._cancelled or self._reserved + memory <= (self.memory or 0))
+            self._check()
+            self._reserved += memory
+            implicit, self._implicit = self._implicit, False
+
+        tokens = b""
+        try:
+            while len(tokens) + implicit < cpus:
+                with self._condition:
+                    self._check()
+                    if self._implicit and not implicit:  # (returned since we looked)
+                        implicit, self._implicit = True, False
+                        continue
+                    self._waiting = True
+                try:
+                    tokens += os.read(self.read_fd, 1)
+                finally:
+                    with self._condition:
+                        self._waiting = False
+                self._check()
+        except BaseException:
+            self.release(Reservation(implicit, tokens, memory))
+            raise
+
+        with self._condition:
+            self._turn += 1
+            self._condition.notify_all()
+        return Reservation(implicit, tokens, memory)
+
+    def release(self, reservation: Reservation) -> None:
+        """Return the resources held by a (finished) step."""
+        with self._condition:
+            self._reserved -= reservation.memory
+            tokens = reservation.tokens
+            if reservation.implicit:
+                if self._waiting:  # Hand it on through the pipe, the next step is blocked reading it!
+                    tokens += TOKEN
+                    self._lent += 1
+                else:
+                    self._implicit = True
+            elif self._lent and tokens and not self._implicit and not self._waiting:  # Take back one handed on
+                tokens, self._implicit = tokens[1:], True
+                self._lent -= 1
+            if tokens:
+                os.write(self.write_fd, tokens)
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """Stop any step waiting for resources (which raise Cancelled)."""
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+        os.write(self.write_fd, TOKEN * self.jobs)  # (to wake up anyone blocked on the pipe)
+
+    def _check(self) -> None:
+        if self._cancelled:
+            raise Cancelled("Cancelled while waiting for resources")
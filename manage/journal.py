@@ -0,0 +1,190 @@
+"""Run journal, ie. a record of the steps completed by the last (live) run of a target, in .manage/journal.json.
+
+If a run fails part-way through, `manage <target> --live --resume` continues from the first step
+that hadn't completed (rather than starting again from the top), as long as:
+
+- The target's plan hasn't changed, ie. the same steps with the same arguments (its "signature").
+- The effects of the steps already run haven't since been changed or undone (e.g. a version reverted),
+  ie. the commit checked-out (and its tags), the distribution files built and the contents of the files
+  that the run changed are as the steps completed left them (their "fingerprint"). Any other file can be
+  changed, e.g. to fix the cause of the failure.
+
+The fingerprint is taken once each group of steps has finished (ie. not while steps are still running). The
+journal is removed once a run of its target completes successfully.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TypeVar
+
+from manage import MANAGE_PATH
+from manage.executors import Executor
+from manage.vcs import get_tree, git
+
+JOURNAL_PATH = MANAGE_PATH / "journal.json"
+
+# How git refers to the "contents" of a file that doesn't exist (e.g. one deleted by a step):
+NO_BLOB = "0" * 40
+
+TJob = TypeVar("TJob")
+
+
+class JournalError(Exception):
+    """The last run can't be resumed (e.g. there isn't one or the project has changed since)."""
+
+
+def job_id(job: TJob) -> str:
+    """Return the identifier of a job within its plan, e.g. "build:2" or "test:1[python=3.12]"."""
+    from manage.matrix import describe
+
+    return f"{job.recipe}:{job.index}" + (f"[{describe(job.cell)}]" if job.cell else "")
+
+
+def signature(groups: list[list[TJob]]) -> str:
+    """Return a hash of the plan, ie. if the steps or their arguments change, so does this."""
+    jobs = [(job_id(job), *job.key) for group in groups for job in group]
+    return hashlib.sha256(json.dumps(jobs).encode()).hexdigest()
+
+
+def snapshot(root: Path | None = None, executor: Executor | None = None) -> dict:
+    """Return the project state that our steps (may) effect.
+
+    ie. the commit checked-out (and any tags on it), the working tree (including uncommitted
+    changes, see vcs.get_tree) and the distribution files built (by name, size and mtime). Git is run
+    through the executor provided (if any).
+    """
+    root = root or Path.cwd()
+    state = {
+        "head": git(root, "rev-parse", "HEAD", executor=executor),
+        "tags": git(root, "tag", "--points-at", "HEAD", executor=executor),
+        "tree": get_tree(root, executor),
+        "dist": None,
+    }
+    if (path_dist := root / "dist").is_dir():
+        state["dist"] = sorted(
+            [path.name, stat.st_size, stat.st_mtime_ns]
+            for path in path_dist.iterdir()
+            if path.is_file() and (stat := path.stat())
+        )
+    return state
+
+
+def fingerprint(root: Path | None = None, executor: Executor | None = None) -> str | None:
+    """Return a hash of the project's state (see snapshot), ie. if anything changes, so does this.
+
+    Note: Only files tracked by git are covered (ie. not untracked nor ignored ones, e.g. build/), there's
+    no fingerprint at all (None) if the project isn't a git repository.
+    """
+    state = snapshot(root, executor)
+    if state["tree"] is None:
+        return None
+    return hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()
+
+
+def changes(
+    root: Path,
+    tree_from: str | None,
+    tree_to: str | None,
+    executor: Executor | None = None,
+) -> dict[str, str]:
+    """Return the files changed between the two (working) trees, with their blob id in the latter (NO_BLOB if gone)."""
+    if not tree_from or not tree_to or tree_from == tree_to:
+        return {}
+    changed = {}
+    for line in git(root, "diff-tree", "-r", "--no-renames", tree_from, tree_to, executor=executor) or []:
+        meta, _, path = line.partition("\t")
+        changed[path] = meta.split()[3]
+    return changed
+
+
+def blobs(root: Path, tree: str | None, paths: list[str], executor: Executor | None = None) -> dict[str, str]:
+    """Return the blob id of each of the files specified in the (working) tree (NO_BLOB if not in it)."""
+    found = {}
+    lines = git(root, "ls-tree", "-r", tree, "--", *paths, executor=executor) if tree else None
+    for line in lines or []:
+        meta, _, path = line.partition("\t")
+        found[path] = meta.split()[2]
+    return {path: found.get(path, NO_BLOB) for path in paths}
+
+
+class Journal:
+    """Encapsulate our (json-based) run journal."""
+
+    def __init__(self, path: Path | None = None, root: Path | None = None, executor: Executor | None = None):
+        """Note: we don't read nor write anything until we're asked to."""
+        self.path = path or JOURNAL_PATH
+        self.root = root
+        self.executor = executor  # (to run git through, see snapshot)
+        self.state: dict = {}
+        self._lock = threading.Lock()  # Steps may be run (and thus completed) concurrently.
+
+    def start(self, target: str, groups: list[list[TJob]]) -> None:
+        """Start a new journal for a run of the target's plan provided."""
+        self.state = {
+            "target": target,
+            "signature": signature(groups),
+            "tree": get_tree(self.root or Path.cwd(), self.executor),  # (ie. as it was before we changed anything)
+            "completed": [],
+            "fingerprint": None,
+        }
+        self._write()
+
+    def resume(self, target: str, groups: list[list[TJob]]) -> set[str]:
+        """Continue the journal of the last run of the target, returning the jobs it completed (by job_id)."""
+        try:
+            state = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            raise JournalError(f"Sorry, there's no run of [italic]{target}[/] to resume.")
+        if state.get("target") != target:
+            raise JournalError(f"Sorry, the last run was of [italic]{state.get('target')}[/], not {target}.")
+        if state.get("signature") != signature(groups):
+            raise JournalError(f"Sorry, the steps of [italic]{target}[/] have changed since its last run.")
+        if state.get("completed") and not self._unchanged(state.get("fingerprint") or {}):
+            raise JournalError(
+                "Sorry, the project has changed since the last step completed (other than files the run didn't "
+                "change), unable to resume.",
+            )
+        self.state = state
+        return set(state["completed"])
+
+    def complete(self, job: TJob) -> None:
+        """Record that the job has completed (successfully), see checkpoint for the project state it left."""
+        with self._lock:
+            self.state["completed"].append(job_id(job))
+            self.state["fingerprint"] = None  # (until we have one for *all* the steps completed)
+            self._write()
+
+    def checkpoint(self) -> None:
+        """Record the project state left by the steps completed so far, ie. once a group of steps has finished."""
+        with self._lock:
+            if not self.state.get("completed") or self.state.get("fingerprint") is not None:
+                return
+            root = self.root or Path.cwd()
+            current = snapshot(root, self.executor)
+            current["changed"] = changes(root, self.state.get("tree"), current.pop("tree"), self.executor)
+            self.state["fingerprint"] = current
+            self._write()
+
+    def _unchanged(self, fingerprint_: dict) -> bool:
+        """Is the project as the steps completed left it (as per the fingerprint, ignoring files they didn't change)?"""
+        if not fingerprint_:
+            return False
+        root = self.root or Path.cwd()
+        current = snapshot(root, self.executor)
+        if any(current[key] != fingerprint_.get(key) for key in ("head", "tags", "dist")):
+            return False
+        changed = fingerprint_.get("changed") or {}
+        return not changed or blobs(root, current["tree"], list(changed), self.executor) == changed
+
+    def finish(self) -> None:
+        """The run completed successfully, we don't need our journal anymore."""
+        self.path.unlink(missing_ok=True)
+
+    def _write(self) -> None:
+        """Write our journal atomically (so we never leave a partial one behind, e.g. on Ctrl-C)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        path_temp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        path_temp.write_text(json.dumps(self.state, indent=2))
+        path_temp.replace(self.path)
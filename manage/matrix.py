@@ -0,0 +1,183 @@
+"""Interpreter matrix support, ie. running steps once per (locally available) Python version.
+
+A recipe or step with `matrix = { python = ["3.11", "3.12"] }` has each of its method steps expanded
+into one job per matrix "cell". Each cell runs in its own virtual environment (created on first use
+in .manage/envs/) for the interpreter requested, found either on our path (e.g. python3.12) or from
+pyenv. Cells whose interpreter can't be found locally are skipped (with a warning).
+"""
+import itertools
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+from manage import MANAGE_PATH
+from manage.executors import Executor, ReplayExecutor
+
+ENVS_PATH = MANAGE_PATH / "envs"
+
+MATRIX_KEYS = ("python",)
+
+RE_PYTHON = re.compile(r"^\d+(\.\d+){0,2}$")
+
+_env_locks: dict[Path, threading.Lock] = {}
+_env_locks_lock = threading.Lock()
+
+# (cell, executable)'s we've already warned about running outside of their cell's environment:
+_warned: set[tuple[str, str]] = set()
+_warned_lock = threading.Lock()
+
+
+class MatrixError(Exception):
+    """A matrix cell can't be run (e.g. its interpreter isn't available locally)."""
+
+
+def check(matrix: dict[str, list[str]]) -> None:
+    """Validate a matrix definition, raising ValueError on any issue (for use in our model validators)."""
+    for key, values in matrix.items():
+        if key not in MATRIX_KEYS:
+            raise ValueError(f"matrix key '{key}' is not supported, must be one of {', '.join(MATRIX_KEYS)}")
+        if not values:
+            raise ValueError(f"matrix key '{key}' must have at least one value")
+        for value in values:
+            if not RE_PYTHON.match(value):
+                raise ValueError(f"matrix python version '{value}' is not valid, e.g. \"3.12\" (note the quotes!)")
+
+
+def expand(matrix: dict[str, list[str]] | None) -> list[tuple[tuple[str, str], ...]]:
+    """Return every cell in the matrix, e.g. [(("python", "3.11"),), (("python", "3.12"),)]."""
+    if not matrix:
+        return []
+    keys = list(matrix)
+    return [tuple(zip(keys, values)) for values in itertools.product(*(matrix[key] for key in keys))]
+
+
+def describe(cell: tuple[tuple[str, str], ...]) -> str:
+    """Return a short description of a matrix cell, e.g. "python=3.12"."""
+    return ", ".join(f"{key}={value}" for key, value in cell)
+
+
+def _version_key(path: Path) -> tuple[int, ...]:
+    """Sort key for pyenv version directories, e.g. 3.12.10 > 3.12.9 (and ignoring any suffixes)."""
+    return tuple(int(part) for part in re.findall(r"\d+", path.parents[1].name)[:3])
+
+
+def find_interpreter(version: str) -> Path | None:
+    """Return the path to a local interpreter for the python version specified (if we can find one)."""
+    # Note: pyenv's shims are on the path for *every* version installed but only work for those that are active!
+    pyenv_root = Path(os.environ.get("PYENV_ROOT") or Path.home() / ".pyenv")
+    paths = [path for path in os.environ.get("PATH", "").split(os.pathsep) if Path(path) != pyenv_root / "shims"]
+    if path := shutil.which(f"python{version}", path=os.pathsep.join(paths)):
+        return Path(path)
+    candidates = [
+        path
+        for path in (pyenv_root / "versions").glob(f"{version}*/bin/python")
+        if path.parents[1].name == version or path.parents[1].name.startswith(f"{version}.")
+    ]
+    return max(candidates, key=_version_key) if candidates else None
+
+
+def environment(
+    cell: tuple[tuple[str, str], ...],
+    root: Path | None = None,
+    executor: Executor | None = None,
+) -> dict[str, str]:
+    """Return the environment (variables) to run a cell's commands in, creating its virtual environment if needed.
+
+    The environment is created through the executor provided (if any), on replay (where nothing's run) we don't
+    create it at all, nor need an interpreter for it.
+    """
+    root = root or ENVS_PATH
+    executor = executor or Executor()
+    version = dict(cell)["python"]
+    path_env = root / f"py{version}"
+    if not isinstance(executor, ReplayExecutor):
+        _create(path_env, version, executor)
+
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONHOME"}
+    env["VIRTUAL_ENV"] = str(path_env.resolve())
+    env["PATH"] = f"{path_env.resolve() / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+    env["MANAGE_MATRIX"] = describe(cell)
+    return env
+
+
+def _create(path_env: Path, version: str, executor: Executor) -> None:
+    """Create the virtual environment specified (if it doesn't already exist)."""
+    if not (interpreter := find_interpreter(version)):
+        raise MatrixError(f"Skipping python={version}, unable to find an interpreter for it locally.")
+
+    with _env_locks_lock:
+        lock = _env_locks.setdefault(path_env, threading.Lock())
+    with lock:  # (several steps of the same cell may be running concurrently)
+        if not (path_env / "bin" / "python").exists():
+            result = executor.run([str(interpreter), "-m", "venv", str(path_env)])
+            if result.returncode != 0:
+                stderr = result.stderr.decode(errors="replace").strip()
+                raise MatrixError(f"Unable to create a python={version} environment: {stderr}")
+
+
+def foreign_interpreter(executable: str, env: dict[str, str]) -> str | None:
+    """Return the python interpreter an executable would run under if it isn't that of the cell's environment (env).
+
+    e.g. a bare `pytest` that isn't installed in a cell's environment is found on the rest of the path, ie. a pytest
+    installed elsewhere, and runs under *its* interpreter (rather than the cell's).
+    """
+    if not (venv := env.get("VIRTUAL_ENV")) or not (path := shutil.which(executable, path=env.get("PATH"))):
+        return None
+    if Path(path).parent == Path(venv) / "bin":
+        return None
+    try:
+        with open(path, "rb") as file_:
+            lines = file_.read(512).split(b"\n")[:2]
+    except OSError:
+        return None
+    if not lines[0].startswith(b"#!"):
+        return None
+    words = lines[0][2:].decode(errors="replace").split()
+    if words and Path(words[0]).name == "sh" and len(lines) > 1 and lines[1].startswith(b"'''exec' "):
+        words = lines[1].decode(errors="replace").split()[1:]  # (pip's shebang for long interpreter paths)
+    if words and Path(words[0]).name == "env":
+        words = [shutil.which(words[1], path=env.get("PATH")) or words[1]] if len(words) > 1 else []
+    if not words or "python" not in Path(words[0]).name or Path(words[0]).parent == Path(venv) / "bin":
+        return None
+    return words[0]
+
+
+def check_executable(executable: str, env: dict[str, str]) -> None:
+    """Warn (once) if an executable run in a matrix cell would run under a python interpreter other than the cell's."""
+    if not (cell := env.get("MANAGE_MATRIX")) or not (interpreter := foreign_interpreter(executable, env)):
+        return
+    with _warned_lock:
+        if (cell, executable) in _warned:
+            return
+        _warned.add((cell, executable))
+    from manage.utilities import msg_warning
+
+    msg_warning(
+        f"'{executable}' isn't installed in the {cell} environment, it'll run under {interpreter} instead "
+        '(install it, e.g. with "python -m pip install ..." in an earlier step, or run it as "python -m ...").',
+    )
+
+
+def print_grid(results: list[tuple[str, tuple[tuple[str, str], ...], str]]) -> None:
+    """Print a pass/fail grid of (step description, cell, status) results, one row per step and column per cell."""
+    from rich.table import Table
+
+    from manage.utilities import get_console
+
+    rows: dict[str, dict[str, str]] = {}
+    columns: dict[str, None] = {}
+    for step, cell, status in results:
+        columns[describe(cell)] = None
+        rows.setdefault(step, {})[describe(cell)] = status
+
+    symbols = {"success": "[green]✔[/]", "skipped": "[yellow]–[/]"}
+    table = Table(title="Matrix", title_justify="left")
+    table.add_column("Step")
+    for column in columns:
+        table.add_column(column, justify="center")
+    for step, statuses in rows.items():
+        cells = [statuses.get(column) for column in columns]
+        table.add_row(step, *(symbols.get(status, "[red]✖[/]") if status else "" for status in cells))
+    get_console().print(table)
@@ -2,23 +2,32 @@
 import importlib
 import shlex
 import shutil
-import subprocess
 import sys
+import time
 from abc import abstractmethod
 from pathlib import Path
 from typing import Any, TypeVar
 
-from rich import print
-
+from manage import executors, matrix, processes
 from manage.models import Configuration, Step
-from manage.utilities import ask_confirm, failure, message, msg_failure, msg_debug, msg_success, success
+from manage.utilities import (
+    ask_confirm,
+    failure,
+    humanize_bytes,
+    message,
+    msg_debug,
+    msg_failure,
+    msg_success,
+    print,
+    success,
+)
 
 
 TClass = TypeVar("Class")
 
 
 def gather_available_method_classes(debug: bool) -> dict[str, TClass]:
-    """Read and return all the python-defined step methods available."""
+    """Read and return all the python-defined step methods available (including those of plugins)."""
 
     def __gather_method_classes():
         """Iterate over all step modules (utility method)."""
@@ -37,10 +46,17 @@ def gather_available_method_classes(debug: bool) -> dict[str, TClass]:
         msg_failure("Unable to find [bold]any[/] valid method classes in manage/methods/*.py?")
         sys.exit(1)
 
+    # Along with any methods provided by other packages (only imported if/when they're used):
+    from manage.plugins import MethodClasses, discover
+
+    method_classes = MethodClasses(classes, discover())
+
     if debug:
         msg_debug(f"- {len(classes)} run-time methods found and registered")
+        if method_classes.plugins:
+            msg_debug(f"- {len(method_classes.plugins)} plugin methods found: {', '.join(method_classes.plugins)}")
 
-    return classes
+    return method_classes
 
 
 class AbstractMethod:
@@ -54,6 +70,14 @@ class AbstractMethod:
         self.name = Path(file).stem  # Name of the respective method
         self.cmd: str = None  # Provided on concrete class instantiation
         self.confirm: str = None  # "
+        self.exit_code: int | None = None  # Exit code of the (first failing or last) command we ran (if any)
+        self.output_size: int = 0  # Total bytes of stdout/stderr from the command(s) we ran
+        self.limit: str | None = None  # Which of the step's limits (if any) killed a command we ran
+        self.env: dict[str, str] | None = None  # Environment to run our commands in (e.g. a matrix cell's), if not ours
+
+        # A step's timeout covers *all* the commands it runs, hence we work from a deadline:
+        timeout = getattr(step, "timeout", None)
+        self.deadline: float | None = time.monotonic() + timeout if timeout else None
 
     def do_confirm(self, confirm: str | None = None) -> bool:
         """Return True if we're good to keep going and run a command, False otherwise."""
@@ -92,6 +116,15 @@ class AbstractMethod:
         status, _ = self.go(self.cmd)  # Run it for real!
         return status
 
+    def command_line(self) -> list[str] | None:
+        """Return the command this step runs (e.g. for --export ninja), None if it can't be expressed as one.
+
+        By default, only those using our "default" run method above, ie. with a single command.
+        """
+        if self.cmd and type(self).run is AbstractMethod.run:
+            return shlex.split(self.cmd)
+        return None
+
     ################################################################################
     # Validation support methods
     ################################################################################
@@ -100,7 +133,9 @@ class AbstractMethod:
         return []
 
     def validate_executable(self, executable: str) -> str | None:
-        """Confirm that the executable name specified actually exists on our path."""
+        """Confirm that the executable name specified actually exists on our path (unless we're only replaying)."""
+        if isinstance(self.configuration.executor, executors.ReplayExecutor):
+            return None
         if not shutil.which(executable):
             return f"[italic]{self.name}[/]: Sorry, couldn't find '[italic]{executable}[/]' on your path."
         return None
@@ -127,20 +162,61 @@ class AbstractMethod:
         """
         if self.step.verbose:
             message(f"Running [italic]{command}[/]")
+        return self.report(command, self.execute(shlex.split(command)), announced=True)
+
+    def execute(self, args: list[str], cwd: Path | None = None) -> processes.Completed:
+        """Run the command specified (within the step's limits and environment), without reporting on it."""
+        if self.env and args:
+            matrix.check_executable(args[0], self.env)
+        return self._note(
+            self.configuration.executor.run(
+                args,
+                cwd=cwd,
+                timeout=max(0, self.deadline - time.monotonic()) if self.deadline else None,
+                max_memory=self.step.max_memory,
+                cpu_seconds=self.step.cpu_seconds,
+                env=self.env,
+            ),
+        )
+
+    def execute_pipeline(self, stages: list[processes.Stage]) -> processes.Completed:
+        """Run the pipeline specified (within the step's limits and environment), without reporting on it."""
+        for stage in stages if self.env else []:
+            matrix.check_executable(stage.args[0], self.env)
+        return self._note(
+            self.configuration.executor.pipeline(
+                stages,
+                timeout=max(0, self.deadline - time.monotonic()) if self.deadline else None,
+                max_memory=self.step.max_memory,
+                cpu_seconds=self.step.cpu_seconds,
+                env=self.env,
+            ),
+        )
+
+    def _note(self, result: processes.Completed) -> processes.Completed:
+        """Note the result of a command we ran (ie. its exit code, output size and any limit hit)."""
+        if not self.exit_code:
+            self.exit_code = result.returncode
+        self.output_size += len(result.stdout) + len(result.stderr)
+        if result.returncode != 0:
+            self.limit = self.limit or result.limit
+        return result
 
-        result = subprocess.run(shlex.split(command), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
+    def report(self, command: str, result: processes.Completed, announced: bool = False) -> tuple[bool, str]:
+        """Report on the result of a command (announced if we've already displayed "Running..."), as per go."""
         if result.returncode != 0:
             ################################################
             # Failed:
             ################################################
-            # Are we allowed to have error?
-            if self.step and not self.step.allow_error:
-                if not self.step.verbose:
+            # Are we allowed to have error? (never if one of our limits was hit)
+            if self.step and (result.limit or not self.step.allow_error):
+                if not announced or not self.step.verbose:
                     message(f"Running [italic]{command}[/]")
-                    failure()
+                failure()
                 stderr = result.stderr.decode()
                 self.__print_std(stderr, "red")
+                if result.limit:
+                    msg_failure(f"≫ Killed, {self.describe_limit(result.limit)}.")
                 return False, stderr
 
         ################################################
@@ -148,10 +224,20 @@ class AbstractMethod:
         ################################################
         stdout = result.stdout.decode().strip()
         if self.step.verbose:
+            if not announced:
+                message(f"Running [italic]{command}[/]")
             success()
             self.__print_std(stdout, "grey70")
         return True, stdout
 
+    def describe_limit(self, limit: str) -> str:
+        """Return a description of the limit specified, e.g. "exceeded timeout of 30s"."""
+        if limit == "timeout":
+            return f"exceeded [italic]timeout[/] of {self.step.timeout:g}s"
+        if limit == "max_memory":
+            return f"exceeded [italic]max_memory[/] of {humanize_bytes(self.step.max_memory)}"
+        return f"exceeded [italic]cpu_seconds[/] of {self.step.cpu_seconds}s"
+
     def __print_std(self, std: str, color: str) -> None:
         if not std:
             return
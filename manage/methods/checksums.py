@@ -0,0 +1,167 @@
+"""Write checksum manifests (e.g. SHA256SUMS) of our distribution files."""
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from manage import MANAGE_PATH
+from manage.methods import AbstractMethod
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import failure, message, msg_success, print, smart_join, success
+
+# Algorithms we support and the name of the manifest we write for each (as per coreutils' sha256sum, b2sum etc.):
+MANIFESTS = {
+    "sha256": "SHA256SUMS",
+    "sha512": "SHA512SUMS",
+    "blake2b": "B2SUMS",
+}
+
+# Digests are cached by (inode, size, mtime_ns) so unchanged (e.g. historical) files aren't re-hashed:
+CACHE_PATH = MANAGE_PATH / "checksums.json"
+
+
+def file_key(stat: os.stat_result) -> list[int]:
+    """Return the cache key for a file, ie. if any of these change, so (most likely) has the file."""
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def hash_file(path: Path, algorithms: list[str]) -> dict[str, str]:
+    """Return the hex digest of the file for each algorithm.
+
+    The file is memory-mapped and handed to hashlib in one go, as hashlib releases the GIL while
+    hashing (large) buffers, this means files really are hashed in parallel across threads.
+    """
+    digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with path.open("rb") as file_:
+        if os.fstat(file_.fileno()).st_size:  # (can't mmap an empty file!)
+            with mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for digest in digests.values():
+                    digest.update(buffer)
+    return {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+
+
+def hash_files(
+    paths: list[Path],
+    algorithms: list[str],
+    cache: dict,
+    max_workers: int | None = None,
+) -> tuple[dict[str, dict[str, str]], int]:
+    """Return digests for all the files ({name: {algorithm: digest}}) and how many we actually had to hash.
+
+    Note: the cache provided ({name: {"key": [...], algorithm: digest...}}) is updated in-place.
+    """
+    digests, pending = {}, []
+    for path in paths:
+        key = file_key(path.stat())
+        if (cached := cache.get(path.name)) and cached.get("key") == key and all(alg in cached for alg in algorithms):
+            digests[path.name] = {algorithm: cached[algorithm] for algorithm in algorithms}
+        else:
+            pending.append((path, key))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (path, key), digests_ in zip(pending, executor.map(lambda item: hash_file(item[0], algorithms), pending)):
+            digests[path.name] = digests_
+            cache[path.name] = {"key": key, **digests_}
+    return digests, len(pending)
+
+
+def write_manifest(path: Path, digests: dict[str, str]) -> None:
+    """Write a manifest of digests in the same format as sha256sum et al, ie. "<digest>  <name>" (sorted by name)."""
+    path.write_text("".join(f"{digest}  {name}\n" for name, digest in sorted(digests.items())))
+
+
+class Method(AbstractMethod):
+    """Write checksum manifests (e.g. SHA256SUMS) of our distribution files."""
+
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="pathspec",
+                type_=str,
+                default="dist",
+            ),
+            Argument(
+                name="algorithms",
+                type_=str,
+                default="sha256",
+            ),
+        ],
+    )
+
+    def __init__(self, configuration: Configuration, step: dict):
+        """Init."""
+        super().__init__(__file__, configuration, step)
+        self.pathspec = self.get_arg("pathspec", default="dist")
+        algorithms = self.get_arg("algorithms", default="sha256")
+        self.algorithms = algorithms if isinstance(algorithms, list) else algorithms.split()
+        manifests = ", ".join(MANIFESTS.get(algorithm, algorithm) for algorithm in self.algorithms)
+        self.confirm = f"Ok to write checksums of '[italic]{self.pathspec}[/]' to {manifests}?"
+
+    def validate(self) -> list[str]:
+        """Perform any pre-method validation."""
+        algorithms = smart_join(list(MANIFESTS), with_or=True)
+        return [
+            f"(checksums) '[italic]{algorithm}[/]' is not a supported algorithm: \\[{algorithms}]."
+            for algorithm in self.algorithms
+            if algorithm not in MANIFESTS
+        ]
+
+    def run(self, **testing_kwargs) -> bool:
+        """Hash all the files in our directory (those we haven't already) and write the manifest(s)."""
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        path_cache = testing_kwargs.get("path_cache", CACHE_PATH)
+
+        directory = root / self.pathspec
+        manifests = set(MANIFESTS.values())
+        paths = sorted(
+            path
+            for path in (directory.iterdir() if directory.is_dir() else [])
+            if path.is_file() and not path.name.startswith(".") and path.name not in manifests
+        )
+
+        cache = self._read_cache(path_cache, directory)
+        if self.configuration.dry_run:
+            n_cached = sum(1 for path in paths if cache.get(path.name, {}).get("key") == file_key(path.stat()))
+            self.dry_run(f"hash {len(paths) - n_cached} of {len(paths)} file(s) in {self.pathspec} (others cached)")
+            return True
+
+        if not self.do_confirm():
+            return False
+
+        if self.step.verbose:
+            message(f"Running [italic]checksums of {self.pathspec} ({', '.join(self.algorithms)})[/]")
+        try:
+            digests, n_hashed = hash_files(paths, self.algorithms, cache)
+            for algorithm in self.algorithms:
+                write_manifest(directory / MANIFESTS[algorithm], {name: d[algorithm] for name, d in digests.items()})
+        except OSError as err:
+            if not self.step.verbose:
+                message(f"Running [italic]checksums of {self.pathspec}[/]")
+            failure()
+            print(f"[red]≫ {err}[/]")
+            return False
+        self._write_cache(path_cache, directory, {name: cache[name] for name in digests if name in cache})
+
+        if self.step.verbose:
+            success()
+            msg_success(f"≫ {len(paths)} file(s), {n_hashed} hashed, {len(paths) - n_hashed} unchanged")
+        return True
+
+    def _read_cache(self, path_cache: Path, directory: Path) -> dict:
+        """Return our digest cache for the directory specified."""
+        try:
+            return json.loads(path_cache.read_text()).get(str(directory.resolve()), {})
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, path_cache: Path, directory: Path, cache: dict) -> None:
+        """Save our digest cache for the directory specified (the cache is only an optimisation, hence, ok to fail)."""
+        try:
+            caches = json.loads(path_cache.read_text()) if path_cache.exists() else {}
+            caches[str(directory.resolve())] = cache
+            path_cache.parent.mkdir(parents=True, exist_ok=True)
+            path_cache.write_text(json.dumps(caches))
+        except (OSError, ValueError):
+            pass
@@ -1,13 +1,210 @@
 """Clean step."""
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from manage.methods import AbstractMethod
-from manage.models import Configuration
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import (
+    DEFAULT_EXCLUDE,
+    compile_glob,
+    failure,
+    humanize_bytes,
+    message,
+    msg_failure,
+    smart_join,
+    success,
+)
+
+DEFAULT_INCLUDE = "build *.egg-info"
+
+
+def _max_depth(patterns: list[str]) -> int | None:
+    """Return the deepest level any pattern could match at (or None if unbounded, ie. using **)."""
+    if any("**" in pattern for pattern in patterns):
+        return None
+    return max((pattern.strip("/").count("/") for pattern in patterns), default=0)
+
+
+def find_targets(root: Path, include: list[str], exclude: list[str]) -> list[Path]:
+    """Walk the tree from root returning all paths matching include (and NOT exclude) patterns.
+
+    Matched and excluded directories are NOT descended into, nor do we descend any deeper
+    than the include patterns could possibly match (ie. the defaults only look at the top level).
+    """
+    re_include = [compile_glob(pattern) for pattern in include]
+    re_exclude = [compile_glob(pattern) for pattern in exclude]
+    max_depth = _max_depth(include)
+
+    targets = []
+    pending = [(root, 0)]
+    while pending:
+        dir_, depth = pending.pop()
+        try:
+            entries = list(os.scandir(dir_))
+        except OSError:
+            continue
+        for entry in entries:
+            relative = Path(entry.path).relative_to(root).as_posix()
+            if any(regex.fullmatch(relative) for regex in re_exclude):
+                continue
+            if any(regex.fullmatch(relative) for regex in re_include):
+                targets.append(Path(entry.path))
+                continue
+            if entry.is_dir(follow_symlinks=False) and (max_depth is None or depth < max_depth):
+                pending.append((Path(entry.path), depth + 1))
+    return sorted(targets)
+
+
+def measure(path: Path) -> tuple[int, int]:
+    """Return the number of files and total bytes under path (which may be a single file)."""
+    if not path.is_dir() or path.is_symlink():
+        return 1, path.lstat().st_size
+    num_files, num_bytes = 0, 0
+    for dir_, _, files in os.walk(path):
+        for file_ in files:
+            try:
+                num_bytes += os.lstat(os.path.join(dir_, file_)).st_size
+            except OSError:
+                continue
+            num_files += 1
+    return num_files, num_bytes
+
+
+def delete(targets: list[Path], max_workers: int | None = None) -> list[str]:
+    """Delete all the targets provided in parallel, returning a list of any errors encountered.
+
+    To parallelise deletion of a single large tree, we delete each target's *immediate*
+    children concurrently and then remove the (now empty) target directories themselves.
+    """
+    errors = []
+
+    def __remove(path: Path) -> None:
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except OSError as err:
+            errors.append(f"{path}: {err.strerror}")
+
+    directories, work = [], []
+    for target in targets:
+        if target.is_dir() and not target.is_symlink():
+            directories.append(target)
+            work.extend(target.iterdir())
+        else:
+            work.append(target)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(__remove, work))
+
+    for directory in directories:
+        try:
+            directory.rmdir()
+        except OSError as err:
+            errors.append(f"{directory}: {err.strerror}")
+    return errors
+
+
+def delete_in_background(targets: list[Path]) -> list[str]:
+    """Rename the targets out of the way (instantly) and delete them in a detached background process."""
+    errors, renamed = [], []
+    for target in targets:
+        tombstone = target.with_name(f".{target.name}.manage-trash-{uuid.uuid4().hex[:8]}")
+        try:
+            target.rename(tombstone)
+            renamed.append(str(tombstone))
+        except OSError as err:
+            errors.append(f"{target}: {err.strerror}")
+    if renamed:
+        script = "import shutil, sys\nfor path in sys.argv[1:]: shutil.rmtree(path, ignore_errors=True)"
+        subprocess.Popen(
+            [sys.executable, "-c", script, *renamed],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # ie. it's no longer our child, we won't wait for it.
+        )
+    return errors
 
 
 class Method(AbstractMethod):
     """Clean up build artifacts."""
 
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="include",
+                type_=str,
+                default=DEFAULT_INCLUDE,
+            ),
+            Argument(
+                name="exclude",
+                type_=str,
+                default=DEFAULT_EXCLUDE,
+            ),
+            Argument(
+                name="background",
+                type_=bool,
+                default=False,
+            ),
+        ],
+    )
+
     def __init__(self, configuration: Configuration, step: dict):
-        """Easy single command to clean."""
+        """Clean natively (ie. no 'rm' process) based on include/exclude glob patterns."""
         super().__init__(__file__, configuration, step)
-        self.cmd = "rm -rf build *.egg-info"
+        self.include = self._get_patterns("include", DEFAULT_INCLUDE)
+        self.exclude = self._get_patterns("exclude", DEFAULT_EXCLUDE)
+        self.cmd = f"clean {smart_join(self.include, delim='')}"
         self.confirm = f"Ok to clean build environment with '[italic]{self.cmd}[/]'?"
+
+    def _get_patterns(self, arg_name: str, default: str) -> list[str]:
+        """Patterns can be provided either as a space-delimited string or a (toml) list."""
+        patterns = self.get_arg(arg_name, default=default)
+        return patterns.split() if isinstance(patterns, str) else list(patterns)
+
+    def run(self, **testing_kwargs) -> bool:
+        """Find and delete (or report on) everything matching our patterns."""
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        targets = find_targets(root, self.include, self.exclude)
+
+        ################################################################################
+        # Dry-run: Report on what we *would* have deleted
+        ################################################################################
+        if self.configuration.dry_run:
+            num_files, num_bytes = 0, 0
+            for target in targets:
+                files, bytes_ = measure(target)
+                num_files, num_bytes = num_files + files, num_bytes + bytes_
+            names = smart_join([str(target.relative_to(root)) for target in targets], delim="") or "nothing"
+            self.dry_run(f"remove {names}: {num_files} files, {humanize_bytes(num_bytes)}")
+            return True
+
+        if not self.do_confirm():
+            return False
+
+        if self.step.verbose:
+            message(f"Running [italic]{self.cmd}[/]")
+
+        if self.get_arg("background"):
+            errors = delete_in_background(targets)
+        else:
+            errors = delete(targets)
+
+        if errors and not self.step.allow_error:
+            if not self.step.verbose:
+                message(f"Running [italic]{self.cmd}[/]")
+            failure()
+            for error in errors:
+                msg_failure(f"≫ {error}")
+            return False
+
+        if self.step.verbose:
+            success()
+        return True
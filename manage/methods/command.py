@@ -1,6 +1,110 @@
-"""Run a generic (local) command."""
+"""Run a generic (local) command.
+
+A command can be a pipeline, with redirections, and pipelines can be chained with &&, for example:
+
+    zcat data.csv.gz | sort -u > sorted.csv 2> errors.log && wc -l < sorted.csv
+
+We run these ourselves, ie. without a shell: the stages of a pipeline are connected directly with OS pipes
+(nothing passes through us) and redirections are opened as file descriptors (see processes.pipeline).
+Quoting works as in a shell but nothing else does (e.g. variables, globs, ; or ||).
+"""
+import shlex
+
+from manage.executors import arguments
 from manage.methods import AbstractMethod
 from manage.models import Argument, Arguments, Configuration
+from manage.processes import Stage
+
+# Operators we support, longest first (ie. as we match them):
+OPERATORS = ("2>&1", "2>>", "&&", ">>", "2>", "|", "<", ">")
+
+# Redirections and the stage fields they set:
+REDIRECTIONS = {"<": "stdin", ">": "stdout", ">>": "stdout", "2>": "stderr", "2>>": "stderr"}
+
+
+class PipelineError(ValueError):
+    """A command that we can't parse, e.g. a redirection without a file."""
+
+
+def tokenize(command: str) -> list[tuple[str, bool]]:
+    """Split a command into words and operators (with quotes and backslashes as per a shell), ie. [(token, operator?)]."""
+    tokens: list[tuple[str, bool]] = []
+    word, quoted, index = "", False, 0  # (quoted: is the current word a word even if empty, e.g. '')
+
+    def __end_word() -> None:
+        nonlocal word, quoted
+        if word or quoted:
+            tokens.append((word, False))
+        word, quoted = "", False
+
+    while index < len(command):
+        char = command[index]
+        if char.isspace():
+            __end_word()
+        elif char == "'":
+            if (end := command.find("'", index + 1)) < 0:
+                raise PipelineError("unterminated single quote")
+            word, quoted, index = word + command[index + 1 : end], True, end
+        elif char == '"':
+            index += 1
+            while index < len(command) and command[index] != '"':
+                if command[index] == "\\" and command[index + 1 : index + 2] in ('"', "\\", "$", "`"):
+                    index += 1
+                word += command[index]
+                index += 1
+            if index >= len(command):
+                raise PipelineError("unterminated double quote")
+            quoted = True
+        elif char == "\\":
+            word, quoted, index = word + command[index + 1 : index + 2], True, index + 1
+        elif char in "|&<>":
+            start = index
+            if char in "<>" and word == "2" and not quoted:  # ie. 2> (rather than the word "2")
+                start, word = index - 1, ""
+            operator = next((op for op in OPERATORS if command.startswith(op, start)), None)
+            if operator is None or command.startswith("||", start):
+                raise PipelineError(f"unsupported operator at '{command[start:start + 3]}'")
+            __end_word()
+            tokens.append((operator, True))
+            index = start + len(operator) - 1
+        else:
+            word += char
+        index += 1
+    __end_word()
+    return tokens
+
+
+def parse(command: str) -> list[list[Stage]]:
+    """Parse a command into the pipelines to run in turn (ie. separated by &&), each a list of stages."""
+    pipelines: list[list[Stage]] = []
+    stages: list[Stage] = []
+    stage: dict = {"args": []}
+    tokens = iter(tokenize(command))
+    for token, operator in tokens:
+        if not operator:
+            stage["args"].append(token)
+        elif token in ("|", "&&"):
+            if not stage["args"]:
+                raise PipelineError(f"missing command before '{token}'")
+            stages.append(Stage(**stage))
+            stage = {"args": []}
+            if token == "&&":
+                pipelines.append(stages)
+                stages = []
+        elif token == "2>&1":
+            stage["stderr_to_stdout"] = True
+        else:
+            path, is_operator = next(tokens, ("", True))
+            if is_operator:
+                raise PipelineError(f"missing file after '{token}'")
+            stage[REDIRECTIONS[token]] = path
+            if token.endswith(">>"):
+                stage[f"{REDIRECTIONS[token]}_append"] = True
+    if not stage["args"]:
+        raise PipelineError("missing command at the end")
+    stages.append(Stage(**stage))
+    pipelines.append(stages)
+    return pipelines
 
 
 class Method(AbstractMethod):
@@ -23,12 +127,24 @@ class Method(AbstractMethod):
     def validate(self) -> list[str]:
         """Perform any pre-method validation."""
         # Check to make sure argument is provided
-        if not self.get_arg("command"):
+        if not (command := self.get_arg("command")):
             return [f"Sorry, The {self.name} method requires a [italic]command[/] argument."]
+        try:
+            parse(command)
+        except PipelineError as err:
+            return [f"Sorry, unable to run '[italic]{command}[/]' from {self.name}: {err}."]
         return []
 
+    def command_line(self) -> list[str] | None:
+        """Return our command, ie. as run (e.g. for --export ninja), through a shell if it's a pipeline."""
+        if not (command := self.get_arg("command")):
+            return None
+        if self._is_simple(parse(command)):
+            return shlex.split(command)
+        return ["sh", "-c", command]
+
     def run(self) -> bool:
-        """Run a local command."""
+        """Run a local command (or pipelines thereof)."""
         # Get argument...
         command = self.get_arg("command")
 
@@ -36,7 +152,20 @@ class Method(AbstractMethod):
             self.dry_run(command, shell=True)
             return True
 
-        if self.do_confirm(f"Ok to run command: '[italic]{command}[/]'?"):
+        if not self.do_confirm(f"Ok to run command: '[italic]{command}[/]'?"):
             return False
 
-        return self.go(command)[0]
+        if self._is_simple(pipelines := parse(command)):
+            return self.go(command)[0]
+
+        for stages in pipelines:
+            result = self.execute_pipeline(stages)
+            ok = self.report(" ".join(arguments(stages)), result)[0]
+            if result.returncode != 0 or result.limit:
+                return ok  # As per &&, no matter allow_error (which only decides whether the step failed).
+        return True
+
+    @staticmethod
+    def _is_simple(pipelines: list[list[Stage]]) -> bool:
+        """Is this a single command (ie. without pipes, redirections or &&)?"""
+        return len(pipelines) == 1 and len(pipelines[0]) == 1 and pipelines[0][0] == Stage(pipelines[0][0].args)
@@ -1,13 +1,17 @@
 """Method to perform a 'git add' (aka stage) command."""
+import re
 from pathlib import Path
-
-from git import Repo
-from rich.markup import escape
+from typing import TypeVar
 
 from manage.methods import AbstractMethod
 from manage.models import Configuration, Arguments, Argument
 from manage.utilities import msg_failure, msg_success, smart_join
 
+TRepo = TypeVar("TRepo")  # GitPython's Repo (only ever provided when testing).
+
+# What `git add --verbose` says for each file it adds, e.g. "add 'README.md'":
+RE_ADDED = re.compile(r"^add '(.*)'$")
+
 
 class Method(AbstractMethod):
     """git add."""
@@ -33,13 +37,15 @@ class Method(AbstractMethod):
             return [msg]
         return []
 
-    def run(self, repo: Repo | None = None) -> bool:
+    def run(self, repo: TRepo | None = None) -> bool:
         """Do a 'git add' command, either with a specific wildcard or all (if no argument specified).
 
-        Use either repo provided (testing usually) or that in the current directory (normal mode).
+        Use either repo provided (testing usually) or that in the current directory (normal mode). We run git itself
+        (rather than use its library) so the command is recorded or replayed along with the rest (see executors).
         """
-        ...
-        repo = Repo(Path.cwd()) if not repo else repo
+        from rich.markup import escape
+
+        root = Path(repo.working_dir) if repo else Path.cwd()
 
         # Get arguments (and matching confirm message)
         if s_pathspec := self.get_arg("pathspec", optional=True):
@@ -58,13 +64,12 @@ class Method(AbstractMethod):
             return False
 
         # Do it!
-        try:
-            results = repo.index.add(pathspec)
-            if self.step.verbose:
-                for base_index_entry in results:
-                    msg_success(f"git add {base_index_entry.path}")
-            return True
-
-        except OSError:
-            msg_failure(f"Unable to `git add {pathspec=}`")
+        result = self.execute(["git", "add", "--verbose", "--", *pathspec], cwd=root)
+        if result.returncode != 0:
+            msg_failure(f"Unable to `git add {pathspec=}`: {escape(result.stderr.decode().strip())}")
             return False
+        if self.step.verbose:
+            for line in result.stdout.decode().splitlines():
+                if match := RE_ADDED.match(line):
+                    msg_success(f"git add {escape(match.group(1))}")
+        return True
@@ -1,13 +1,14 @@
 """General git commit."""
 from datetime import datetime
 from pathlib import Path
-
-from git import Repo
+from typing import TypeVar
 
 from manage.methods import AbstractMethod
 from manage.models import Argument, Arguments, Configuration
 from manage.utilities import msg_failure, msg_success
 
+TRepo = TypeVar("TRepo")  # GitPython's Repo (only ever provided when testing).
+
 
 class Method(AbstractMethod):
     """git commit."""
@@ -17,7 +18,7 @@ class Method(AbstractMethod):
             Argument(
                 name="message",
                 type_=str,
-                default=f"Commit as of {datetime.now().isoformat().split('.')[0]}",
+                default=None,  # Default is "Commit as of <now>", determined at run-time (not import-time!)
             ),
         ],
     )
@@ -33,16 +34,17 @@ class Method(AbstractMethod):
             return [msg]
         return []
 
-    def run(self, repo: Repo | None = None) -> bool:
+    def run(self, repo: TRepo | None = None) -> bool:
         """Commits *all* staged files (ie. normal git commit).
 
-        Use either repo provided (testing usually) or that in the current directory (normal mode).
+        Use either repo provided (testing usually) or that in the current directory (normal mode). We run git itself
+        (rather than use its library) so the command is recorded or replayed along with the rest (see executors).
         """
-        repo = Repo(Path.cwd()) if not repo else repo
+        root = Path(repo.working_dir) if repo else Path.cwd()
 
         # Get argument...
         if not (commit_message := self.step.get_arg("message")):
-            commit_message = Method.args.get_argument("message").default
+            commit_message = f"Commit as of {datetime.now().isoformat().split('.')[0]}"
 
         # Get the git commit command we'd like to run:
         cmd = f'git commit -m "{commit_message}"'
@@ -58,13 +60,12 @@ class Method(AbstractMethod):
             return False
 
         # Do it!
-        try:
-            repo.index.commit(commit_message)
-            if self.step.verbose:
-                commit = repo.head.commit
-                for file_, diff in commit.stats.files.items():
-                    msg_success(f'git commit -m "{file_}"')
-            return True
-        except OSError:
+        if self.execute(["git", "commit", "--quiet", "-m", commit_message], cwd=root).returncode != 0:
             msg_failure(f"Unable to '[italic]{cmd}[/]'")
             return False
+        if self.step.verbose:
+            result = self.execute(["git", "show", "--name-only", "--format=", "HEAD"], cwd=root)
+            for file_ in result.stdout.decode().splitlines():
+                if file_:
+                    msg_success(f'git commit -m "{file_}"')
+        return True
@@ -4,8 +4,7 @@ from datetime import datetime
 from pathlib import Path
 from pprint import pformat
 
-import requests
-
+from manage.executors import RequestError
 from manage.methods import AbstractMethod
 from manage.models import Configuration, PyProject
 from manage.utilities import failure, message, msg_failure, success
@@ -71,7 +70,14 @@ class Method(AbstractMethod):
         if self.step.verbose:
             message(f"Running [italic]{os.environ['GITHUB_API_RELEASES']}[/] Release: [italic]{v_version}[/]")
 
-        response = requests.post(os.environ["GITHUB_API_RELEASES"], headers=headers, auth=auth, json=json)
+        executor = self.configuration.executor
+        try:
+            response = executor.post(os.environ["GITHUB_API_RELEASES"], headers=headers, auth=auth, json=json)
+        except RequestError as err:
+            if self.step.verbose:
+                failure()
+            msg_failure(f"≫ {err}")
+            return False
 
         if response.status_code in (200, 201):
             if self.step.verbose:
@@ -1,4 +1,5 @@
 """Convert an emacs org file into a markdown version using Pandoc."""
+import shlex
 from pathlib import Path
 
 from manage.methods import AbstractMethod
@@ -42,17 +43,25 @@ class Method(AbstractMethod):
                 fails += f"(pandoc_convert_org_to_markdown) '[italic]{path_md}[/]' does not exist."
         return fails
 
+    def command_line(self) -> list[str] | None:
+        """Return our command (e.g. for --export ninja)."""
+        path_md, path_org = self.get_arg("path_md"), self.get_arg("path_org")
+        return [
+            *("pandoc", "-f", "org", "-t", "markdown-smart", "--wrap", "none"),
+            *("--output", str(path_md), str(path_org)),
+        ]
+
     def run(self) -> bool:
         """Run pandoc.."""
         # Lookup arguments
-        if not (path_md := self.get_arg("path_md")):
+        if not self.get_arg("path_md"):
             return False
 
-        if not (path_org := self.get_arg("path_org")):
+        if not self.get_arg("path_org"):
             return False
 
         # Get our command and confirmation string:
-        cmd = f"pandoc -f org -t markdown-smart --wrap none --output {path_md} {path_org}"
+        cmd = shlex.join(self.command_line())
         confirm = f"Ok to run '[italic]{cmd}[/]'?"
 
         # Dry-run?
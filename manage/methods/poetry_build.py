@@ -1,19 +1,106 @@
 """Build a poetry distribution."""
+import shlex
+import shutil
+from pathlib import Path
+
 from manage.methods import AbstractMethod
-from manage.models import Configuration
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import failure, message, msg_failure, msg_success, smart_join, success
+from manage.vcs import git
+
+BACKENDS = ("poetry", "pep517")
 
 
 class Method(AbstractMethod):
     """Build a poetry distribution."""
 
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="backend",
+                type_=str,
+                default="poetry",
+            ),
+            Argument(
+                name="isolated",
+                type_=bool,
+                default=True,
+            ),
+            Argument(
+                name="source_date_epoch",
+                type_=str,
+                default=None,
+            ),
+        ],
+    )
+
     def __init__(self, configuration: Configuration, step: dict):
         """Easy single command to build."""
         super().__init__(__file__, configuration, step)
-        self.cmd = "poetry build"
+        self.backend = self.get_arg("backend", default="poetry")
+        self.cmd = "poetry build" if self.backend == "poetry" else "pep517 build_sdist & build_wheel"
         self.confirm = f"Ok to build distribution files? ['[italic]{self.cmd}[/]']"
 
     def validate(self) -> list[str]:
         """Perform any pre-method validation."""
-        if msg := self.validate_executable("poetry"):
-            return [msg]
+        if self.backend not in BACKENDS:
+            backends = smart_join(BACKENDS, with_or=True)
+            return [f"(poetry_build) '[italic]{self.backend}[/]' is not a valid backend: \\[{backends}]."]
+        if self.backend == "poetry":
+            if msg := self.validate_executable("poetry"):
+                return [msg]
         return []
+
+    def command_line(self) -> list[str] | None:
+        """Return our command if we're building through poetry (e.g. for --export ninja)."""
+        return shlex.split(self.cmd) if self.backend == "poetry" else None
+
+    def run(self, **testing_kwargs) -> bool:
+        """Build our distribution, either through poetry or by calling our build-backend's hooks directly."""
+        if self.backend == "poetry":
+            return super().run()
+
+        if self.configuration.dry_run:
+            self.dry_run(self.cmd)
+            return True
+
+        if not self.do_confirm():
+            return False
+
+        from manage.pep517 import build
+
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        if self.step.verbose:
+            message(f"Running [italic]{self.cmd}[/]")
+
+        results = build(
+            root,
+            root / "dist",
+            isolated=bool(self.step.get_arg("isolated", default=True)),
+            source_date_epoch=self._get_source_date_epoch(root),
+            python=shutil.which("python", path=self.env["PATH"]) if self.env else None,  # (e.g. a matrix cell's)
+            env=self.env,
+            executor=self.configuration.executor,
+        )
+
+        if fails := [(hook, error) for hook, status, error in results if not status]:
+            if self.step.verbose:
+                failure()
+            for hook, error in fails:
+                msg_failure(f"≫ {hook}: {error}")
+            return False
+
+        if self.step.verbose:
+            success()
+            for _, _, artifact in results:
+                msg_success(f"≫ dist/{artifact}")
+        return True
+
+    def _get_source_date_epoch(self, root: Path) -> int | None:
+        """Return the SOURCE_DATE_EPOCH to build with (if any), "git" means the time of the last commit."""
+        if not (source_date_epoch := self.get_arg("source_date_epoch", optional=True)):
+            return None
+        if str(source_date_epoch) == "git":
+            last = git(root, "log", "-1", "--pretty=%ct", executor=self.configuration.executor)
+            return int(last[0]) if last else None
+        return int(source_date_epoch)
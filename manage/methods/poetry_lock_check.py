@@ -1,7 +1,60 @@
 """Verify that poetry.lock is consistent with pyproject.toml and update if not (good security practice)."""
+import json
+import tomllib
+from hashlib import sha256
+from pathlib import Path
+
+from manage import PYPROJECT_PATH
 from manage.methods import AbstractMethod
 from manage.models import Configuration
-from manage.utilities import msg_warning, warning
+from manage.utilities import msg_debug, msg_warning, warning
+
+# The [tool.poetry] keys that Poetry hashes into poetry.lock's metadata.content-hash; legacy keys are
+# *always* included (even if null) while the others are only included if present (matches Poetry).
+LEGACY_KEYS = ("dependencies", "source", "extras", "dev-dependencies")
+RELEVANT_KEYS = (*LEGACY_KEYS, "group")
+RELEVANT_PROJECT_KEYS = ("requires-python", "dependencies", "optional-dependencies")
+
+
+def get_content_hash(raw_pyproject: dict) -> str:
+    """Return the content-hash of the pyproject.toml provided, calculated the same way Poetry does."""
+    project_content = raw_pyproject.get("project", {})
+    poetry_content = raw_pyproject.get("tool", {}).get("poetry", {})
+
+    relevant_project_content = {}
+    for key in RELEVANT_PROJECT_KEYS:
+        if (data := project_content.get(key)) is not None:
+            relevant_project_content[key] = data
+
+    relevant_poetry_content = {}
+    for key in RELEVANT_KEYS:
+        data = poetry_content.get(key)
+        if data is None and (key not in LEGACY_KEYS or relevant_project_content):
+            continue
+        relevant_poetry_content[key] = data
+
+    if relevant_project_content:
+        relevant_content = {"project": relevant_project_content, "tool": {"poetry": relevant_poetry_content}}
+    else:
+        # Poetry puts [tool.poetry] content at the top-level for backwards compatibility:
+        relevant_content = relevant_poetry_content
+
+    return sha256(json.dumps(relevant_content, sort_keys=True).encode()).hexdigest()
+
+
+def get_locked_hash(path_lock: Path) -> str | None:
+    """Return the metadata.content-hash from the poetry.lock specified (or None if we can't find one).
+
+    Lock files can be large, thus, we only parse the [metadata] table itself (which is at the end).
+    """
+    if not path_lock.exists():
+        return None
+    contents = path_lock.read_text()
+    if (start := contents.rfind("\n[metadata]")) == -1:
+        return None
+    end = contents.find("\n[", start + len("\n[metadata]"))  # eg. [metadata.files] in older lock versions
+    metadata = tomllib.loads(contents[start : end if end != -1 else None])
+    return metadata.get("metadata", {}).get("content-hash")
 
 
 class Method(AbstractMethod):
@@ -17,13 +70,20 @@ class Method(AbstractMethod):
             return [msg]
         return []
 
-    def run(self) -> bool:
-        """Poetry lock check and optional update."""
-        cmd_chck = "poetry lock --check"  # No changes here, thus, no confirm required!
+    def run(self, **testing_kwargs) -> bool:
+        """Poetry lock check (in-process) and optional update (using poetry)."""
         cmd_lock = "poetry lock --no-update"  # Dry-run and confirm are possible on this one.
 
-        # Initial check is easy...if it returns fine, we're done...otherwise, update it!
-        if not self.go(cmd_chck)[0]:
+        path_pyproject = testing_kwargs.get("path_pyproject", PYPROJECT_PATH)  # Allow for testing override...
+        path_lock = path_pyproject.parent / "poetry.lock"
+
+        # Initial check is easy (and cheap)...if the hashes match, we're done...otherwise, update it!
+        content_hash = get_content_hash(tomllib.loads(path_pyproject.read_text()))
+        locked_hash = get_locked_hash(path_lock)
+        if self.step.debug:
+            msg_debug(f"pyproject.toml content-hash: {content_hash[:12]}, poetry.lock: {str(locked_hash)[:12]}")
+
+        if content_hash != locked_hash:
             warning()
             msg_warning("poetry.lock is not consistent with pyproject.toml, attempting fix.")
 
@@ -31,7 +91,7 @@ class Method(AbstractMethod):
                 self.dry_run(cmd_lock, shell=True)
                 return True
 
-            confirm = "Ok to run '[italic]{cmd_lock}[/]' to fix it?"
+            confirm = f"Ok to run '[italic]{cmd_lock}[/]' to fix it?"
             if not self.do_confirm(confirm):
                 return False
 
@@ -1,19 +1,121 @@
-"""Push/publish to PyPI using Poetry."""
+"""Push/publish to PyPI using Poetry (or natively, uploading all distribution files concurrently)."""
+import os
+import tomllib
+from pathlib import Path
+
+from manage import PYPROJECT_PATH
 from manage.methods import AbstractMethod
-from manage.models import Configuration
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import failure, humanize_bytes, message, msg_failure, msg_success, smart_join, success
+
+BACKENDS = ("poetry", "native")
+
+# Environment variables we take credentials from for the native backend (poetry's own, so both backends just work):
+ENV_TOKEN = "POETRY_PYPI_TOKEN_PYPI"
+ENV_USERNAME = "POETRY_HTTP_BASIC_PYPI_USERNAME"
+ENV_PASSWORD = "POETRY_HTTP_BASIC_PYPI_PASSWORD"
 
 
 class Method(AbstractMethod):
     """Push/publish to PyPI using Poetry."""
 
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="backend",
+                type_=str,
+                default="poetry",
+            ),
+            Argument(
+                name="repository_url",
+                type_=str,
+                default=None,
+            ),
+            Argument(
+                name="uploads",
+                type_=int,
+                default=4,
+            ),
+        ],
+    )
+
     def __init__(self, configuration: Configuration, step: dict):
         """Init."""
         super().__init__(__file__, configuration, step)
+        self.backend = self.get_arg("backend", default="poetry")
         self.cmd = "poetry publish"
         self.confirm = f"Ok to publish to PyPI with '[italic]{self.cmd}[/]'?"
 
     def validate(self) -> list[str]:
         """Perform any pre-method validation."""
-        if msg := self.validate_executable("poetry"):
-            return [msg]
+        if self.backend not in BACKENDS:
+            backends = smart_join(BACKENDS, with_or=True)
+            return [f"(poetry_publish) '[italic]{self.backend}[/]' is not a valid backend: \\[{backends}]."]
+        if self.backend == "poetry":
+            if msg := self.validate_executable("poetry"):
+                return [msg]
+            return []
+        if not get_auth():
+            return [
+                f"Can't find environment variable '[italic]{ENV_TOKEN}[/]' "
+                f"(or '[italic]{ENV_USERNAME}[/]' and '[italic]{ENV_PASSWORD}[/]'), required for {self.name}",
+            ]
         return []
+
+    def run(self, **testing_kwargs) -> bool:
+        """Publish our distribution files, either through poetry or by uploading them ourselves."""
+        if self.backend == "poetry":
+            return super().run()
+
+        from manage.upload import DEFAULT_REPOSITORY_URL, find_distributions, upload
+
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        path_pyproject = testing_kwargs.get("path_pyproject", PYPROJECT_PATH)
+        poetry = tomllib.loads(path_pyproject.read_text()).get("tool", {}).get("poetry", {})
+        name, version = poetry.get("name"), poetry.get("version")
+
+        # As per poetry publish, only our current version's files (dist/ usually has those of previous releases too):
+        repository_url = self.get_arg("repository_url", default=DEFAULT_REPOSITORY_URL)
+        dist = root / "dist"
+        paths = find_distributions(dist, name, version) if dist.is_dir() else []
+        if not paths:
+            msg_failure(f"Sorry, no distribution files of v{version} found in dist/ to publish, have you built them?")
+            return False
+
+        cmd = f"upload {len(paths)} file(s) of v{version} from dist/ to {repository_url}"
+        if self.configuration.dry_run:
+            self.dry_run(cmd)
+            return True
+
+        if not self.do_confirm(f"Ok to publish to PyPI, ie. [italic]{cmd}[/]?"):
+            return False
+
+        if self.step.verbose:
+            message(f"Running [italic]{cmd}[/]")
+        max_workers = int(self.get_arg("uploads", default=4))
+        results = upload(paths, repository_url, get_auth(), max_workers, self.configuration.executor)
+
+        ok = all(result.status != "failed" for result in results)
+        if self.step.verbose:
+            if ok:
+                success()
+            else:
+                failure()
+        for result in results:
+            if result.status == "failed":
+                msg_failure(f"≫ {result.path.name}: {result.message}")
+            elif self.step.verbose and result.status == "skipped":
+                msg_success(f"≫ {result.path.name}: skipped, {result.message}")
+            elif self.step.verbose:
+                speed = f"{humanize_bytes(result.throughput())}/s"
+                msg_success(f"≫ {result.path.name}: {humanize_bytes(result.size)} in {result.seconds:.2f}s ({speed})")
+        return ok
+
+
+def get_auth() -> tuple[str, str] | None:
+    """Return our (username, password) credentials for the index, if we have any."""
+    if token := os.environ.get(ENV_TOKEN):
+        return "__token__", token
+    if os.environ.get(ENV_USERNAME) and os.environ.get(ENV_PASSWORD):
+        return os.environ[ENV_USERNAME], os.environ[ENV_PASSWORD]
+    return None
@@ -2,15 +2,17 @@
 import sys
 from pathlib import Path
 
+from manage import PYPROJECT_PATH
 from manage.methods import AbstractMethod
 from manage.models import Argument, Arguments, Configuration, PyProject
-from manage.utilities import failure, message, smart_join
+from manage.utilities import failure, message, msg_failure, smart_join, success
+from manage.version import BUMP_RULES, bump_version, write_pyproject_version
 
-BUMP_RULES = ("patch", "minor", "major", "prepatch", "preminor", "premajor", "prerelease")
+BACKENDS = ("native", "poetry")
 
 
 class Method(AbstractMethod):
-    """Do a version "bump" of pyproject.toml using poetry by a specified "level"."""
+    """Do a version "bump" of pyproject.toml (natively or using poetry) by a specified "level"."""
 
     args = Arguments(
         arguments=[
@@ -19,6 +21,11 @@ class Method(AbstractMethod):
                 type_=str,
                 default="patch",
             ),
+            Argument(
+                name="backend",
+                type_=str,
+                default="native",
+            ),
         ],
     )
 
@@ -30,9 +37,16 @@ class Method(AbstractMethod):
         """Perform any pre-method validation."""
         fails = []
 
-        # Check to see if executable is available
-        if msg := self.validate_executable("poetry"):
-            fails.append(msg)
+        backend = self.configuration.find_method_arg_value(Path(__file__).stem, "backend")
+        backend = backend or self.get_arg("backend", default="native")
+        if backend not in BACKENDS:
+            backends = smart_join(BACKENDS, with_or=True)
+            fails.append(f"(poetry_version) '[italic]{backend}[/]' is not a valid backend: \\[{backends}].")
+
+        # Check to see if executable is available (only needed if we're not bumping natively)
+        if backend == "poetry":
+            if msg := self.validate_executable("poetry"):
+                fails.append(msg)
 
         if bump_rule := self.configuration.find_method_arg_value(Path(__file__).stem, "bump_rule"):
             if bump_rule not in BUMP_RULES:
@@ -41,50 +55,69 @@ class Method(AbstractMethod):
 
         return fails
 
-    def run(self) -> bool:
-        """Do a version "bump" of pyproject.toml using poetry to bump up to a specified poetry "level"."""
-        # Get argument
+    def run(self, **testing_kwargs) -> bool:
+        """Do a version "bump" of pyproject.toml up to a specified poetry "level"."""
+        # Get arguments
         if not (bump_rule := self.get_arg("bump_rule")):
             return False
+        backend = self.get_arg("backend", default="native")
 
-        pyproject: PyProject = PyProject.factory()
+        path_pyproject = testing_kwargs.get("path_pyproject", PYPROJECT_PATH)  # Allow for testing override...
+        pyproject: PyProject = PyProject.factory(path_pyproject)
         v_old_version = f"v{pyproject.version}"
 
         cmd = f"poetry version {bump_rule}"
 
         ################################################################################
-        # For confirmation purposes, use poetry to get what our next
-        # version *should* be (NOTE: This is a DRY-RUN only!!!!)
+        # For confirmation purposes, get what our next version *should* be
+        # (natively, unless we've been explicitly asked to use poetry to do it)
         ################################################################################
-        success, new_version_or_error = self.go(f"{cmd} --dry-run --short")
-        if not success:
+        if backend == "poetry":
+            success_, new_version_or_error = self.go(f"{cmd} --dry-run --short")
+        else:
+            try:
+                success_, new_version_or_error = True, bump_version(pyproject.version or "", bump_rule)
+            except ValueError as err:
+                success_, new_version_or_error = False, str(err)
+
+        if not success_:
             failure()
             msg = (
-                "Sorry, poetry couldn't determine a new version number "
+                "Sorry, couldn't determine a new version number "
                 f"from pyproject.toml: [italic]{new_version_or_error}[/]"
             )
             message(msg)
             sys.exit(1)
 
+        action = f"upgrade from '[italic]{v_old_version}[/]' to '[italic]v{new_version_or_error}[/]' in pyproject.toml"
+
         ################################################################################
         # Dry-run?
         ################################################################################
         if self.configuration.dry_run:
-            self.dry_run(cmd, shell=True)
+            self.dry_run(cmd if backend == "poetry" else action, shell=backend == "poetry")
             return True
 
-        confirm = (
-            f"Ok to upgrade from '[italic]{v_old_version}[/]' "
-            f"to '[italic]v{new_version_or_error}[/]' in pyproject.toml? "
-            f"'[italic]{cmd}[/]'"
-        )
+        confirm = f"Ok to {action}?" + (f" '[italic]{cmd}[/]'" if backend == "poetry" else "")
         if not self.do_confirm(confirm):
             return False
 
         ################################################################################
-        # Run it by doing the REAL poetry version!
+        # Run it by doing the REAL version update!
         ################################################################################
-        status, _ = self.go(cmd)
-        if status:
-            return True
-        return False
+        if backend == "poetry":
+            status, _ = self.go(cmd)
+            return bool(status)
+
+        if self.step.verbose:
+            message(f"Running update on pyproject.toml version to: '[italic]{new_version_or_error}[/]'")
+        try:
+            write_pyproject_version(path_pyproject, new_version_or_error)
+        except ValueError as err:
+            if self.step.verbose:
+                failure()
+            msg_failure(f"Sorry, unable to update pyproject.toml: [italic]{err}[/]")
+            return False
+        if self.step.verbose:
+            success()
+        return True
@@ -1,20 +1,105 @@
-"""Change the local __version__.py file to reflect the version number from pyproject.toml."""
+"""Change the local __version__.py file (and any others) to reflect the version number from pyproject.toml."""
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from manage.executors import Executor
 from manage.methods import AbstractMethod
 from manage.models import Argument, Arguments, Configuration, PyProject
-from manage.utilities import msg_failure, message, failure, success
+from manage.utilities import (
+    DEFAULT_EXCLUDE,
+    compile_glob,
+    failure,
+    message,
+    msg_failure,
+    msg_success,
+    smart_join,
+    success,
+)
+from manage.vcs import git
+
+# Where a version is typically found, each with exactly ONE group for the version itself, ie.
+# __init__.py, Sphinx's conf.py, Dockerfiles (LABEL/ARG/ENV), Helm's Chart.yaml and package.json respectively:
+DEFAULT_PATTERNS = [
+    r"""^__version__\s*=\s*["']([^"']+)["']""",
+    r"""^(?:version|release)\s*=\s*["']([^"']+)["']""",
+    r"""^(?:LABEL|ARG|ENV)\s+(?:version|VERSION)=["']?([^"'\s]+)""",
+    r"""^(?:appVersion|version):\s*["']?([^"'\s#]+)""",
+    r"""^\s*"version"\s*:\s*"([^"]+)\"""",
+]
+
+
+def compile_patterns(patterns: list[str]) -> re.Pattern:
+    """Combine all the patterns into a single (multi-line) regex, such that each file is only scanned once.
+
+    As each pattern has exactly one group, the group that matched is always the match's lastindex.
+    """
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.MULTILINE)
+
+
+def find_candidates(root: Path, globs: list[str], executor: Executor | None = None) -> list[Path]:
+    """Return all the files under root matching any of the globs, respecting .gitignore (if we're in a git repo)."""
+    regexes = [compile_glob(glob) for glob in globs]
+    if (files := git(root, "ls-files", "--cached", "--others", "--exclude-standard", executor=executor)) is None:
+        files = []  # Not a git repository, walk it ourselves (ignoring the usual suspects)..
+        for dir_, dirs, names in os.walk(root):
+            dirs[:] = [name for name in dirs if name not in DEFAULT_EXCLUDE.split()]
+            files.extend(Path(dir_, name).relative_to(root).as_posix() for name in names)
+    return sorted(root / file_ for file_ in files if any(regex.fullmatch(file_) for regex in regexes))
+
+
+def scan(path: Path, regex: re.Pattern, version: str) -> tuple[str, list[str]] | None:
+    """Return the new contents of the file with ALL its versions replaced (and the old versions found), if any."""
+    try:
+        contents = path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+    olds, chunks, last = [], [], 0
+    for match in regex.finditer(contents):
+        start, end = match.span(match.lastindex)
+        olds.append(match.group(match.lastindex))
+        chunks.extend([contents[last:start], version])
+        last = end
+    if not olds:
+        return None
+    return "".join(chunks) + contents[last:], olds
+
+
+def write_atomically(path: Path, contents: str) -> None:
+    """Write the file via a temporary one alongside it, such that it's never seen half-written."""
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as file_:
+            file_.write(contents)
+        shutil.copymode(path, name)
+        os.replace(name, path)
+    except BaseException:
+        Path(name).unlink(missing_ok=True)
+        raise
 
 
 class Method(AbstractMethod):
-    """Change the local __version__.py file to reflect the version number from pyproject.toml."""
+    """Change the local __version__.py file (and any others) to reflect the version number from pyproject.toml."""
 
     args = Arguments(
         arguments=[
             Argument(
                 name="init_path",
                 type_=str,
-                default=Path.cwd() / Path("__init__.py"),
+                default="__init__.py",  # Relative to cwd when used (NOT when imported!)
+            ),
+            Argument(
+                name="paths",
+                type_=str,
+                default=None,
+            ),
+            Argument(
+                name="patterns",
+                type_=str,
+                default=None,
             ),
         ],
     )
@@ -22,6 +107,10 @@ class Method(AbstractMethod):
     def __init__(self, configuration: Configuration, step: dict):
         """Setup."""
         super().__init__(__file__, configuration, step)
+        paths = self.get_arg("paths", optional=True)
+        self.paths = (paths.split() if isinstance(paths, str) else list(paths)) if paths else []
+        patterns = self.get_arg("patterns", default=DEFAULT_PATTERNS)
+        self.patterns = [patterns] if isinstance(patterns, str) else list(patterns)  # (regexes may have spaces!)
 
     def validate(self) -> list[str]:
         """Perform any pre-method validation."""
@@ -30,41 +119,59 @@ class Method(AbstractMethod):
             if not Path(init_file).exists():
                 msg = f"Sorry, path '[italic]{init_file}[/]' could not be found for the {self.name} method."
                 return [msg]
+        msgs = []
+        for pattern in self.patterns:
+            try:
+                if re.compile(pattern).groups != 1:
+                    msgs.append(f"({self.name}:patterns) '[italic]{pattern}[/]' must have exactly one group.")
+            except re.error as err:
+                msgs.append(f"({self.name}:patterns) '[italic]{pattern}[/]' is not a valid regex ({err}).")
+        return msgs
 
     def run(self, **testing_kwargs) -> bool:
-        """Search for line like '__version__ = <foo>' and replace foo with current version from pyproject.toml."""
+        """Search for lines like '__version__ = <foo>' and replace foo with current version from pyproject.toml."""
         # We use the live version of the pyproject file (in case a previous step updated it since we started this run!)
         kwargs = {"debug": self.configuration.debug}
         if "path_pyproject" in testing_kwargs:  # Allow for testing override...
             kwargs["path_pyproject"] = testing_kwargs["path_pyproject"]
         pyproject: PyProject = PyProject.factory(**kwargs)
-
-        # Setup the new "version" line we'll be putting into the __init__.py
         release_tag = f"{pyproject.version}"  # eg. A.B.C
-        match_pattern = "__version__ ="
-        new_version_line = f'{match_pattern} "{release_tag}"'
-
-        # Read the current contents of __init__.py
-        path_init_py = Path(self.get_arg("init_path"))
-        init_contents = path_init_py.read_text()
-
-        # Look for our "version" line..
-        version_line = None
-        for line in init_contents.split("\n"):
-            if line.casefold().startswith(match_pattern):
-                version_line = line
-                old_version = line.replace(match_pattern, "").strip().replace('"', "")
-
-        # Did we find it?
-        if not version_line:
+        root = testing_kwargs.get("root", Path.cwd())
+
+        # Which files? Those explicitly named (which MUST have a version) and any matching our globs (which may not):
+        globs = [path for path in self.paths if any(char in path for char in "*?[")]
+        explicit = [root / path for path in self.paths if path not in globs]
+        if not self.paths or self.get_arg("init_path"):
+            explicit.insert(0, root / self.get_arg("init_path", default="__init__.py"))
+        found = find_candidates(root, globs, self.configuration.executor) if globs else []
+        candidates = list(dict.fromkeys(explicit + found))
+
+        # Scan all the candidates (in parallel) for their version(s):
+        regex = compile_patterns(self.patterns)
+        with ThreadPoolExecutor() as executor:
+            results = dict(zip(candidates, executor.map(lambda path: scan(path, regex, release_tag), candidates)))
+
+        # Did we find them?
+        if missing := [path for path in explicit if not results.get(path)]:
+            failure()
+            for path in missing:
+                msg_failure(f"Sorry, couldn't find a version line in {path.name} (or it doesn't exist)!")
+            return False
+        if not any(results.values()):
             failure()
-            msg_failure(f"Sorry, couldn't find line starting with '[italic]{match_pattern}[/]' in {path_init_py.name}!")
+            msg_failure(f"Sorry, couldn't find a version line in any files matching {smart_join(globs, delim='')}!")
             return False
 
-        action = (
-            f"update {path_init_py.name}'s [italic]__version__[/] line "
-            f"from [italic]{old_version}[/] to [italic]{release_tag}[/]"
-        )
+        # We only (re)write the files that will actually change:
+        changes = {path: result for path, result in results.items() if result and set(result[1]) != {release_tag}}
+        if not changes:
+            if self.step.verbose:
+                msg_success(f"All versions are already [italic]{release_tag}[/]")
+            return True
+
+        names = smart_join([path.name for path in changes], delim="")
+        olds = smart_join(sorted({old for _, olds in changes.values() for old in olds}), delim="")
+        action = f"update {names}'s version from [italic]{olds}[/] to [italic]{release_tag}[/]"
 
         ################################################################################
         # Dry-run
@@ -79,12 +186,12 @@ class Method(AbstractMethod):
         if not self.do_confirm(f"Ok to {action}?"):
             return False
 
-        # RUN!! Replace the current unrelease_header line with the new contents and write it out!
+        # RUN!! Replace the current version(s) in each file with the new one and write it out!
         if self.step.verbose:
-            message(f"Running update on {path_init_py.name} __version__ to: '{new_version_line}'")
+            message(f"Running update on {names} version to: '{release_tag}'")
 
-        init_contents = init_contents.replace(version_line, new_version_line)
-        path_init_py.write_text(init_contents)
+        for path, (contents, _) in changes.items():
+            write_atomically(path, contents)
 
         if self.step.verbose:
             success()
@@ -1,20 +1,149 @@
 """Run pre-commit."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+from manage import MANAGE_PATH
 from manage.methods import AbstractMethod
-from manage.models import Configuration
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import msg_success
+from manage.vcs import get_tree, git
+
+PRE_COMMIT_CONFIG = ".pre-commit-config.yaml"
+
+# Where we remember the (working) tree state of our last fully-clean run:
+STATE_PATH = MANAGE_PATH / "pre_commit.json"
+
+# Special values for our "since" argument (anything else is taken to be a git ref, e.g. "origin/main"):
+SINCE_ALL = "all"  # ie. pre-commit run --all-files (the default)
+SINCE_STAGED = "staged"  # Files in git's index (ie. what would be committed)
+SINCE_LAST = "last"  # Files changed since our last fully-clean run
 
 
 class Method(AbstractMethod):
     """Run pre-commit."""
 
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="since",
+                type_=str,
+                default=SINCE_ALL,
+            ),
+            Argument(
+                name="batches",
+                type_=int,
+                default=4,
+            ),
+        ],
+    )
+
     def __init__(self, configuration: Configuration, step: dict):
         """Easy single command to run pre-commit."""
         super().__init__(__file__, configuration, step)
         self.cmd = "pre-commit run --all-files"
         self.confirm = None
+        self.since = str(self.get_arg("since", default=SINCE_ALL))
 
     def validate(self) -> list[str]:
         """Perform any pre-method validation."""
         if msg := self.validate_executable("pre-commit"):
             return [msg]
+        try:
+            if int(self.get_arg("batches", default=4)) < 1:
+                raise ValueError
+        except ValueError:
+            return [f"(pre_commit) '[italic]{self.get_arg('batches')}[/]' is not a valid number of batches."]
         return []
+
+    def run(self, **testing_kwargs) -> bool:
+        """Run pre-commit, either on all files or (incrementally) only those that have changed."""
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        path_state = testing_kwargs.get("path_state", STATE_PATH)
+
+        # Only checking what's changed since our last fully-clean run and nothing has? Then there's nothing to do!
+        # (only then, otherwise we'd be skipping runs that were asked for, e.g. all files after a hook's been updated)
+        tree = get_tree(root, self.configuration.executor) if self.since == SINCE_LAST else None
+        if tree and tree == read_state(path_state).get("tree"):
+            if self.step.verbose:
+                msg_success("pre-commit: no changes since the last clean run, skipping")
+            return True
+
+        files = self.get_changed_files(root, path_state)
+        if files is not None and not files:
+            if self.step.verbose:
+                msg_success(f"pre-commit: no files changed ({self.since}), skipping")
+            return True
+
+        batches = self.get_batches(files) if files is not None else []
+        if self.configuration.dry_run:
+            if files is None:
+                self.dry_run(self.cmd, shell=True)
+            else:
+                self.dry_run(f"pre-commit run --files <{len(files)} files in {len(batches)} batch(es)>", shell=True)
+            return True
+
+        if not self.do_confirm():
+            return False
+
+        if files is None:
+            ok = self.go(self.cmd)[0]
+        else:
+            cmds = [["pre-commit", "run", "--files", *batch] for batch in batches]
+            with ThreadPoolExecutor(max_workers=len(cmds)) as executor:
+                results = list(executor.map(self.execute, cmds))
+            ok = True
+            for batch, result in zip(batches, results):
+                ok &= self.report(f"pre-commit run --files <{len(batch)} files>", result)[0]
+
+        # Only remember the tree if we know *all* of it is clean (ie. all files or everything since the last clean):
+        if ok and (files is None or self.since == SINCE_LAST):
+            write_state(path_state, {"tree": get_tree(root, self.configuration.executor)})
+        return ok
+
+    def get_changed_files(self, root: Path, path_state: Path) -> list[str] | None:
+        """Return the files to check, None means all of them (ie. --all-files)."""
+        if self.since == SINCE_ALL:
+            return None
+        executor = self.configuration.executor
+        diff = ("--name-only", "--diff-filter=ACMR")
+        if self.since == SINCE_STAGED:
+            files = git(root, "diff", "--cached", *diff, executor=executor)
+        elif self.since == SINCE_LAST:
+            if not (last_tree := read_state(path_state).get("tree")) or not (tree := get_tree(root, executor)):
+                return None  # No clean run yet, we have to check everything.
+            files = git(root, "diff-tree", "-r", *diff, last_tree, tree, executor=executor)
+        else:
+            if not (base := git(root, "merge-base", self.since, "HEAD", executor=executor)):
+                return None
+            if not (tree := get_tree(root, executor)):
+                return None
+            files = git(root, "diff-tree", "-r", *diff, base[0], tree, executor=executor)
+        if files is None or PRE_COMMIT_CONFIG in files:
+            return None  # The hooks themselves have changed, everything needs to be checked again!
+        return files
+
+    def get_batches(self, files: list[str]) -> list[list[str]]:
+        """Split the files into (at most) "batches" batches, to be run in parallel."""
+        n_batches = max(1, min(int(self.get_arg("batches", default=4)), len(files)))
+        return [files[index::n_batches] for index in range(n_batches)]
+
+
+################################################################################
+# State support methods
+################################################################################
+def read_state(path_state: Path) -> dict:
+    """Return our saved state (if any)."""
+    try:
+        return json.loads(path_state.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(path_state: Path, state: dict) -> None:
+    """Save our state (which is only an optimisation, hence, not being able to is ok)."""
+    try:
+        path_state.parent.mkdir(parents=True, exist_ok=True)
+        path_state.write_text(json.dumps(state))
+    except OSError:
+        pass
@@ -1,4 +1,5 @@
 """Method to run SASS pre-processor."""
+import shlex
 from pathlib import Path
 
 from manage.methods import AbstractMethod
@@ -40,12 +41,14 @@ class Method(AbstractMethod):
 
         return fails
 
+    def command_line(self) -> list[str] | None:
+        """Return our command (e.g. for --export ninja)."""
+        return ["sass", *self.get_arg("pathspec").split()]
+
     def run(self) -> bool:
         """Do it."""
-        # Lookup argument and get resultant command:
-        pathspec = self.get_arg("pathspec")
-
-        cmd = f"sass {pathspec}"
+        # Get resultant command:
+        cmd = shlex.join(self.command_line())
 
         if self.configuration.dry_run:
             self.dry_run(cmd, shell=True)
@@ -0,0 +1,221 @@
+"""Fill the README's Unreleased section from the git history (ie. the commits since the last version tag)."""
+import json
+import re
+from pathlib import Path
+from typing import Iterator
+
+from manage import MANAGE_PATH
+from manage.executors import Executor
+from manage.methods import AbstractMethod
+from manage.models import Argument, Arguments, Configuration
+from manage.utilities import failure, message, msg_failure, msg_success, success
+from manage.vcs import git
+
+# Where we remember the last commit processed (so repeated runs only walk the commits since):
+CACHE_PATH = MANAGE_PATH / "changelog.json"
+
+# The header of our Unreleased section, in either markdown or org format, e.g. "### Unreleased" or "** Unreleased":
+RE_UNRELEASED = re.compile(r"^(#+|\*+)\s+unreleased\s*$", re.IGNORECASE)
+RE_HEADER = re.compile(r"^(#+|\*+)\s")
+
+# Conventional-commit types (e.g. "fix(cli): ...") and the changelog prefix each is given (in this order):
+RE_CONVENTIONAL = re.compile(r"^(?P<type>[a-z]+)(\([^)]*\))?(?P<breaking>!)?:\s*(?P<subject>.+)$")
+PREFIXES = {
+    "feat": "ADD",
+    "fix": "FIX",
+    "build": "INTERNAL",
+    "chore": "INTERNAL",
+    "ci": "INTERNAL",
+    "docs": "INTERNAL",
+    "perf": "INTERNAL",
+    "refactor": "INTERNAL",
+    "style": "INTERNAL",
+    "test": "INTERNAL",
+}
+PREFIX_ORDER = ("CHG", "ADD", "FIX", "INTERNAL")
+RE_PREFIX = re.compile(rf"^({'|'.join(PREFIX_ORDER)}):\s*")
+
+
+class Method(AbstractMethod):
+    """Fill the README's Unreleased section from the git history (ie. the commits since the last version tag)."""
+
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="readme",
+                type_=str,
+                default=None,
+            ),
+            Argument(
+                name="conventional",
+                type_=bool,
+                default=False,
+            ),
+        ],
+    )
+
+    def __init__(self, configuration: Configuration, step: dict):
+        """Update Changelog."""
+        super().__init__(__file__, configuration, step)
+        self.conventional = str(self.get_arg("conventional", default=False)).casefold() in ("true", "1", "yes")
+
+    def validate(self) -> list[str]:
+        """Perform any pre-method validation."""
+        if msg := self.validate_executable("git"):
+            return [msg]
+        if (readme := self.get_arg("readme")) and not Path(readme).exists():
+            return [f"Sorry, path '[italic]{readme}[/]' could not be found for the {self.name} method."]
+        return []
+
+    def run(self, **testing_kwargs) -> bool:
+        """Add an entry to the Unreleased section for each (new) commit since the last version tag."""
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        path_cache = testing_kwargs.get("path_cache", CACHE_PATH)
+        executor = self.configuration.executor
+
+        if not (path_readme := self._get_readme_path(root)):
+            msg_failure("Sorry, couldn't find either a README.org or README.md in the top-level directory!")
+            return False
+        if not (head := git(root, "rev-parse", "HEAD", executor=executor)):
+            msg_failure("Sorry, unable to find any commits, is this a git repository?")
+            return False
+        head = head[0]
+
+        # Where do we start from? The last commit we processed (if it's since the last tag) or the last tag itself:
+        tag = git(root, "describe", "--tags", "--abbrev=0", "HEAD", executor=executor)
+        base = git(root, "rev-parse", f"{tag[0]}^{{commit}}", executor=executor)[0] if tag else None
+        cache = read_cache(path_cache)
+        if cache.get("base") == base and cache.get("head") and is_ancestor(root, cache["head"], head, executor):
+            since = cache["head"]
+        else:
+            since = base
+
+        lines = path_readme.read_text().split("\n")
+        if (section := find_section(lines)) is None:
+            failure()
+            msg_failure(f"Sorry, couldn't find a header-line with 'Unreleased' in {path_readme.name}!")
+            return False
+
+        existing = {normalise(line) for line in lines[section[0] + 1 : section[1]] if line.strip()}
+        entries = []
+        for subject in iter_subjects(root, f"{since}..{head}" if since else head, executor):
+            if (entry := self.to_entry(subject)) and normalise(entry) not in existing:
+                existing.add(normalise(entry))
+                entries.append(entry)
+        if self.conventional:
+            entries.sort(key=prefix_order)  # (stable, ie. within each prefix, commits are still in order)
+
+        ################################################################################
+        # Dry-run
+        ################################################################################
+        description = f"add {len(entries)} entr{'y' if len(entries) == 1 else 'ies'} to {path_readme.name}'s "
+        description += f"'[italic]Unreleased[/]' section (from commits since {tag[0] if tag else 'the start'})"
+        if self.configuration.dry_run:
+            self.dry_run(description)
+            return True
+
+        if not entries:
+            if self.step.verbose:
+                msg_success(f"No new commits since {tag[0] if tag else 'the start'} for {path_readme.name}")
+            write_cache(path_cache, {"base": base, "head": head})
+            return True
+
+        ################################################################################
+        # Confirmation
+        ################################################################################
+        if not self.do_confirm(f"Ok to {description}?"):
+            return False
+
+        if self.step.verbose:
+            message(f"Running update of {path_readme.name}'s Unreleased section")
+
+        indent = get_indent(lines, section, path_readme.suffix)
+        insert_at = max((i for i in range(section[0], section[1]) if lines[i].strip()), default=section[0]) + 1
+        lines[insert_at:insert_at] = [f"{indent}- {entry}" for entry in entries]
+        path_readme.write_text("\n".join(lines))
+        write_cache(path_cache, {"base": base, "head": head})
+
+        if self.step.verbose:
+            success()
+            for entry in entries:
+                msg_success(f"≫ {entry}")
+        return True
+
+    def to_entry(self, subject: str) -> str | None:
+        """Return the changelog entry for a commit subject (if any), e.g. "fix: x" -> "FIX: x" if conventional."""
+        subject = subject.strip()
+        if not self.conventional or not (match := RE_CONVENTIONAL.match(subject)):
+            return subject or None
+        prefix = "CHG" if match["breaking"] else PREFIXES.get(match["type"])
+        return f"{prefix}: {match['subject']}" if prefix else match["subject"]
+
+    def _get_readme_path(self, root: Path) -> Path | None:
+        """Return the README we're to work on, either that specified or the default one (org first)."""
+        if s_readme := self.get_arg("readme", optional=True):
+            return Path(s_readme)
+        for format_ in ("org", "md"):
+            if (path_readme := root / f"README.{format_}").exists():
+                return path_readme
+        return None
+
+
+################################################################################
+# Git/README support methods
+################################################################################
+def iter_subjects(root: Path, range_: str, executor: Executor | None = None) -> Iterator[str]:
+    """Yield the subject of each (non-merge) commit in the range specified, oldest first.
+
+    ie. we only ever walk the range requested (rather than all of the history). Note: git is run through the
+    executor (to be recorded or replayed) and thus its output is read all at once, not streamed.
+    """
+    yield from git(root, "log", "--reverse", "--no-merges", "--format=%s", range_, executor=executor) or []
+
+
+def is_ancestor(root: Path, commit: str, descendant: str, executor: Executor | None = None) -> bool:
+    """Is the commit an ancestor of the descendant? (ie. history hasn't been rewritten since we processed it)."""
+    return git(root, "merge-base", "--is-ancestor", commit, descendant, executor=executor) is not None
+
+
+def find_section(lines: list[str]) -> tuple[int, int] | None:
+    """Return the (header, end) line indices of the (first) Unreleased section, if there is one."""
+    for index, line in enumerate(lines):
+        if RE_UNRELEASED.match(line):
+            end = next((i for i in range(index + 1, len(lines)) if RE_HEADER.match(lines[i])), len(lines))
+            return index, end
+    return None
+
+
+def get_indent(lines: list[str], section: tuple[int, int], suffix: str) -> str:
+    """Return the indentation of the section's existing entries (or the default for the README's format)."""
+    for line in lines[section[0] + 1 : section[1]]:
+        if line.lstrip().startswith("- "):
+            return line[: len(line) - len(line.lstrip())]
+    return "   " if suffix == ".org" else ""
+
+
+def prefix_order(entry: str) -> int:
+    """Sort key to group entries by their prefix (those without one last)."""
+    prefix = entry.split(":")[0]
+    return PREFIX_ORDER.index(prefix) if prefix in PREFIX_ORDER else len(PREFIX_ORDER)
+
+
+def normalise(entry: str) -> str:
+    """Return an entry (line) without its bullet and prefix, e.g. "   - FIX: Thing." -> "thing", for comparisons."""
+    return RE_PREFIX.sub("", entry.strip().removeprefix("- ")).strip().rstrip(".").casefold()
+
+
+def read_cache(path_cache: Path) -> dict:
+    """Return our cached state (if any)."""
+    try:
+        return json.loads(path_cache.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(path_cache: Path, state: dict) -> None:
+    """Save our state (which is only an optimisation, hence, not being able to is ok)."""
+    try:
+        path_cache.parent.mkdir(parents=True, exist_ok=True)
+        path_cache.write_text(json.dumps(state))
+    except OSError:
+        pass
@@ -0,0 +1,210 @@
+"""Verify our distribution files (ie. wheels and sdists) before they're published, without unpacking them.
+
+For each distribution file of our current version (from pyproject.toml), we check that:
+
+- Its metadata (METADATA or PKG-INFO) is valid and carries the same name and version as its file name.
+- It contains the packages expected (by default, those of `[tool.poetry] packages`, else the project's name).
+- For wheels, that every file is listed in RECORD with the right hash and size, and vice-versa.
+
+Only the zip's central directory and the members we need are read from wheels (RECORD hashes are checked
+in parallel, as both zlib and hashlib release the GIL), sdists are streamed through once (nothing is
+extracted to disk).
+"""
+import base64
+import csv
+import hashlib
+import re
+import tarfile
+import tomllib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import HeaderParser
+from pathlib import Path
+
+from manage import PYPROJECT_PATH
+from manage.methods import AbstractMethod
+from manage.models import Argument, Arguments, Configuration, PyProject
+from manage.upload import find_distributions, normalize_name, normalize_version, parse_filename
+from manage.utilities import failure, message, msg_success, print, success
+
+CHUNK_SIZE = 256 * 1024
+
+# Hash algorithms allowed in a RECORD (see the binary distribution format spec, ie. not md5 or sha1):
+ALGORITHMS = ("sha256", "sha384", "sha512")
+
+# Files of a wheel that aren't (or can't be) hashed in its RECORD:
+UNHASHED = ("RECORD", "RECORD.jws", "RECORD.p7s")
+
+
+def check_metadata(path: Path, raw: bytes, name: str, version: str) -> list[str]:
+    """Return any problems with the core metadata (raw) of a distribution file."""
+    try:
+        metadata = HeaderParser().parsestr(raw.decode())
+    except UnicodeDecodeError as err:
+        return [f"{path.name}: metadata isn't valid UTF-8 ({err})"]
+    fields = ("Metadata-Version", "Name", "Version")
+    problems = [f"{path.name}: metadata is missing {field}" for field in fields if not metadata[field]]
+    if metadata["Name"] and normalize_name(metadata["Name"]) != name:
+        problems.append(f"{path.name}: metadata has name '{metadata['Name']}'")
+    if metadata["Version"] and normalize_version(metadata["Version"]) != normalize_version(version):
+        problems.append(f"{path.name}: metadata has version {metadata['Version']}")
+    return problems
+
+
+def check_packages(path: Path, names: list[str], packages: list[str], prefixes: tuple[str, ...] = ("",)) -> list[str]:
+    """Return any of the packages expected that aren't in the distribution (names being its members)."""
+    found = set()
+    for name in names:
+        for prefix in prefixes:
+            if name.startswith(prefix):
+                found.add(name[len(prefix) :].split("/")[0].removesuffix(".py"))
+    return [f"{path.name}: package '{package}' is missing" for package in packages if package not in found]
+
+
+def check_member(zip_: zipfile.ZipFile, info: zipfile.ZipInfo, hash_: str, size: str) -> str | None:
+    """Return a problem if the member's (decompressed) contents don't match its hash and size from RECORD."""
+    algorithm, _, expected = hash_.partition("=")
+    if algorithm not in ALGORITHMS:
+        return f"{info.filename} has an unsupported hash algorithm in RECORD ('{algorithm}')"
+    digest, actual_size = hashlib.new(algorithm), 0
+    with zip_.open(info) as member:
+        while chunk := member.read(CHUNK_SIZE):
+            digest.update(chunk)
+            actual_size += len(chunk)
+    if base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode() != expected:
+        return f"{info.filename} doesn't match its hash in RECORD"
+    if size and size != str(actual_size):
+        return f"{info.filename} is {actual_size} bytes, not {size} as per RECORD"
+    return None
+
+
+def verify_wheel(path: Path, name: str, version: str, packages: list[str]) -> list[str]:
+    """Return any problems with the wheel, reading only its central directory and the members we need."""
+    with zipfile.ZipFile(path) as zip_:
+        infos = {info.filename: info for info in zip_.infolist() if not info.is_dir()}
+        dist_infos = {name_.split("/")[0] for name_ in infos if re.fullmatch(r"[^/]+\.dist-info/[^/]+", name_)}
+        if len(dist_infos) != 1:
+            return [f"{path.name}: expected one .dist-info directory, found {len(dist_infos)}"]
+        dist_info = dist_infos.pop()
+        required = [f"{dist_info}/{file_}" for file_ in ("METADATA", "WHEEL", "RECORD")]
+        if missing := [name_ for name_ in required if name_ not in infos]:
+            return [f"{path.name}: {', '.join(missing)} missing"]
+
+        problems = check_metadata(path, zip_.read(f"{dist_info}/METADATA"), name, version)
+        problems += check_packages(path, list(infos), packages)
+
+        record = {row[0]: row[1:] for row in csv.reader(zip_.read(f"{dist_info}/RECORD").decode().splitlines()) if row}
+        unhashed = {f"{dist_info}/{file_}" for file_ in UNHASHED}
+        unrecorded = [name_ for name_ in infos if name_ not in record and name_ not in unhashed]
+        problems += [f"{path.name}: {name_} isn't in RECORD" for name_ in unrecorded]
+        problems += [f"{path.name}: {name_} is in RECORD but not the wheel" for name_ in record if name_ not in infos]
+        to_check = []
+        for name_, fields in record.items():
+            if name_ in infos and name_ not in unhashed:
+                hash_, size = (fields + ["", ""])[:2]
+                if hash_:
+                    to_check.append((infos[name_], hash_, size))
+                else:
+                    problems.append(f"{path.name}: {name_} has no hash in RECORD")
+
+        with ThreadPoolExecutor() as executor:
+            results = executor.map(lambda item: check_member(zip_, *item), to_check)
+            problems += [f"{path.name}: {problem}" for problem in results if problem]
+    return problems
+
+
+def verify_sdist(path: Path, name: str, version: str, packages: list[str]) -> list[str]:
+    """Return any problems with the sdist, streaming through its headers (and only reading its PKG-INFO)."""
+    top = path.name[: -len(".tar.gz")]
+    names, metadata = [], None
+    with tarfile.open(path, mode="r|gz") as tar:
+        for member in tar:
+            names.append(member.name)
+            if member.name == f"{top}/PKG-INFO" and member.isfile():
+                metadata = tar.extractfile(member).read()
+    if outside := [name_ for name_ in names if name_ != top and not name_.startswith(f"{top}/")]:
+        return [f"{path.name}: {len(outside)} file(s) outside of {top}/, e.g. {outside[0]}"]
+    if metadata is None:
+        return [f"{path.name}: {top}/PKG-INFO is missing"]
+    problems = check_metadata(path, metadata, name, version)
+    return problems + check_packages(path, names, packages, prefixes=(f"{top}/", f"{top}/src/"))
+
+
+def expected_packages(raw_pyproject: dict) -> list[str]:
+    """Return the (top-level) packages we expect in our distributions, as per pyproject.toml."""
+    poetry = raw_pyproject.get("tool", {}).get("poetry", {})
+    if includes := [package["include"] for package in poetry.get("packages", []) if "include" in package]:
+        return [include.split("/")[0].removesuffix(".py") for include in includes if not re.search(r"[*?\[]", include)]
+    return [normalize_name(poetry["name"])] if poetry.get("name") else []
+
+
+class Method(AbstractMethod):
+    """Verify our distribution files before they're published, without unpacking them."""
+
+    args = Arguments(
+        arguments=[
+            Argument(
+                name="pathspec",
+                type_=str,
+                default="dist",
+            ),
+            Argument(
+                name="packages",
+                type_=str,
+                default=None,
+            ),
+        ],
+    )
+
+    def __init__(self, configuration: Configuration, step: dict):
+        """Init."""
+        super().__init__(__file__, configuration, step)
+        self.pathspec = self.get_arg("pathspec", default="dist")
+        packages = self.get_arg("packages", optional=True)
+        self.packages = packages.split() if isinstance(packages, str) else packages
+
+    def run(self, **testing_kwargs) -> bool:
+        """Verify each distribution file of our current version (concurrently), reporting any problems found."""
+        root = testing_kwargs.get("root", Path.cwd())  # Allow for testing override...
+        path_pyproject = testing_kwargs.get("path_pyproject", PYPROJECT_PATH)
+
+        raw_pyproject = tomllib.loads(path_pyproject.read_text())
+        version = PyProject.factory_from_raw(raw_pyproject, path_pyproject.parent).version
+        packages = self.packages if self.packages is not None else expected_packages(raw_pyproject)
+        directory = root / self.pathspec
+
+        paths = find_distributions(directory, version=version or "") if directory.is_dir() else []
+        parsed = {path: parse_filename(path) for path in paths}
+
+        if self.configuration.dry_run:
+            self.dry_run(f"verify {len(paths)} distribution file(s) of v{version} in {self.pathspec}")
+            return True
+
+        if self.step.verbose:
+            message(f"Running [italic]verify_dist of {self.pathspec} (v{version})[/]")
+
+        def __verify(path: Path) -> list[str]:
+            verify = verify_wheel if path.name.endswith(".whl") else verify_sdist
+            try:
+                return verify(path, parsed[path][0], version, packages)
+            except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile, UnicodeDecodeError, csv.Error) as err:
+                return [f"{path.name}: unable to read ({err or type(err).__name__})"]
+
+        if paths:
+            with ThreadPoolExecutor() as executor:
+                problems = [problem for problems_ in executor.map(__verify, paths) for problem in problems_]
+        else:
+            problems = [f"No distribution files of v{version} in {self.pathspec}, perhaps run poetry_build first?"]
+
+        if problems:
+            if not self.step.verbose:
+                message(f"Running [italic]verify_dist of {self.pathspec} (v{version})[/]")
+            failure()
+            for problem in problems:
+                print(f"[red]≫ {problem}[/]")
+            return False
+
+        if self.step.verbose:
+            success()
+            msg_success(f"≫ {', '.join(path.name for path in paths)} verified")
+        return True
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 # fmt: off
 from manage.models.pyproject     import PyProject     # noqa: F401
@@ -26,6 +26,13 @@ class Arguments(BaseModel):
     """Collection of Arguments for a step method."""
 
     arguments: list[Argument] = []
+    _by_name: dict[str, Argument] = PrivateAttr(default_factory=dict)  # Index, built once on creation
+
+    def model_post_init(self, __context) -> None:
+        """Index our arguments by name (first one wins, as with a linear search)."""
+        self._by_name = {}
+        for arg in self.arguments:
+            self._by_name.setdefault(arg.name, arg)
 
     def __iter__(self):
         for arg in self.arguments:
@@ -33,13 +40,7 @@ class Arguments(BaseModel):
 
     def get_argument(self, argument_name: str) -> Argument | None:
         """Lookup Argument by name."""
-        for arg in self.arguments:
-            if arg.name == argument_name:
-                return arg
-        return None
+        return self._by_name.get(argument_name)
 
     def __contains__(self, argument_name: str) -> bool:
-        for arg in self.arguments:
-            if arg.name == argument_name:
-                return True
-        return False
+        return argument_name in self._by_name
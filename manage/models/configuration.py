@@ -1,9 +1,10 @@
 """Core data types."""
 from argparse import Namespace
-from typing import Self, TypeVar
+from typing import Any, Self, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
+from manage import executors
 from manage.utilities import msg_debug
 
 
@@ -19,16 +20,45 @@ class Configuration(BaseModel):
     do_help     : bool | None = None  # Were we requested to just display help?
     do_print    : bool | None = None  # Were we requested to print the recipes contents?
     do_validate : bool | None = None  # Validate recipes and quit?
+    do_stats    : bool | None = None  # Were we requested to display run-history statistics?
+    export      : str  | None = None  # Were we requested to export our target(s) to a build file, e.g. "ninja"?
 
     # Standard execution arguments (including method specific ones)
     debug       : bool | None = None  # Are we running in debug mode?
     verbose     : bool | None = None  # Are we running in verbose mode?
-    target      : str  | None = None  # What is the target to be performed?
+    target      : str  | None = None  # What is the target to be performed? (ie. the first if several)
+    targets     : list | None = []    # All the targets to be performed (in order)
     confirm     : bool | None = None  # Should we perform confirmations on steps?
     dry_run     : bool | None = None  # Are we running in dry-run mode (True) or live mode (False)
+    jobs        : int  | None = None  # Maximum number of (independent) steps to run concurrently
+    resume      : bool | None = None  # Continue from the first step not completed by the last run?
+    shard       : tuple | None = None # Run only this part of the target(s), ie. (i, n) from --shard i/n
+    shard_weights: str | None = None  # File of step durations to balance shards by (else by number of steps)
     method_args : list | None = []    # Set of "dynamic" arguments for specific methods (from CLI)
+    record      : str  | None = None  # Cassette file to record all commands run (and their results) to
+    replay      : str  | None = None  # Cassette file to replay all commands run from (instead of running them)
+    executor    : Any  | None = None  # How methods run commands, by default, from record/replay above (see executors)
     # fmt: on
 
+    # Index of method_args, ie. {method: {arg: value}} (both casefolded), built once on creation:
+    _method_args_by_method: dict[str, dict[str, str]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        """Index our method arguments so steps can find theirs without scanning them all (and setup our executor)."""
+        self._method_args_by_method = {}
+        for (method, arg), value in self.method_args or []:
+            self._method_args_by_method.setdefault(method.casefold(), {})[arg.casefold()] = value
+        if self.executor is None:
+            self.executor = executors.factory(self.record, self.replay)
+        if self.targets and not self.target:
+            self.target = self.targets[0]
+        elif self.target and not self.targets:
+            self.targets = [self.target]
+
+    def get_run_name(self) -> str:
+        """Return the name of this run, ie. its target(s), e.g. "build release"."""
+        return " ".join(self.targets or [])
+
     @classmethod
     def get_version_fmt(cls, version_raw: str | None) -> str:
         """Get formatted version from a raw one."""
@@ -36,10 +66,11 @@ class Configuration(BaseModel):
 
     def find_method_arg_value(self, cls: str, arg: str) -> str | None:
         """Find/return the the command-line argument for the respective method/class and argument."""
-        for (method, arg), value in self.method_args:
-            if cls.casefold() == method and arg.casefold() == arg:
-                return value
-        return None
+        return self.get_method_args(cls).get(arg.casefold())
+
+    def get_method_args(self, cls: str) -> dict[str, str]:
+        """Return all the command-line arguments for the respective method/class, ie. {arg: value}."""
+        return self._method_args_by_method.get(cls.casefold(), {})
 
     @classmethod
     def factory(cls, args: tuple[Namespace, dict], test: bool = False, **kwargs_testing) -> Self:
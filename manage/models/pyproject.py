@@ -3,7 +3,7 @@ import tomllib
 from pathlib import Path
 from typing import Self, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from manage import PYPROJECT_PATH
 from manage.utilities import msg_debug, msg_failure, msg_warning, smart_join
@@ -24,9 +24,16 @@ class PyProject(BaseModel):
     # fmt: off
     version: str  | None = None  # Current version string..
     package: str  | None = None  # Package name..
-    recipes: dict | None = None  # These are RAW recipe dicts here!
+    recipes: dict | None = None  # These are RAW recipe dicts here (including those from any includes)!
+    include_errors: list[str] = []  # Issues with any shared recipe files included
     # fmt: on
 
+    _targets: dict[str, str] = PrivateAttr(default_factory=dict)  # Casefolded -> actual recipe name
+
+    def model_post_init(self, __context) -> None:
+        """Index our recipe names (case-insensitively) once, rather than on every lookup."""
+        self._targets = {name.casefold(): name for name in self.recipes or {}}
+
     def get_formatted_list_of_targets(self, supplements: list[str] = []) -> str:
         """Return a comma-delimited list of available recipe targets."""
         targets_recipes = list(self.recipes.keys()) + supplements
@@ -43,10 +50,20 @@ class PyProject(BaseModel):
 
     def is_valid_target(self, target: str) -> bool:
         """Return true if proposed target name is a valid recipe."""
-        return target.casefold() in [recipe.casefold() for recipe in self.recipes.keys()]
+        return self.get_target(target) is not None
+
+    def get_target(self, target: str) -> str | None:
+        """Return the actual recipe name for the proposed (case-insensitive) target name, if valid."""
+        return self._targets.get(target.casefold())
 
     def validate(self) -> bool:
         """Return True is everything's OK with our pyproject object."""
+        # Were we able to read all the shared recipe files included?
+        if self.include_errors:
+            for error in self.include_errors:
+                msg_failure(error)
+            return False
+
         # Do we have any recipes?
         if not self.recipes:
             msg_failure("No recipes found in 'tool.manage.recipes?")
@@ -64,17 +81,23 @@ class PyProject(BaseModel):
         raw_pyproject = tomllib.loads(path_pyproject.read_text())
         if debug:
             msg_debug(f"Successfully read/re-read {path_pyproject}")
-        return PyProject.factory_from_raw(raw_pyproject)
+        return PyProject.factory_from_raw(raw_pyproject, path_pyproject.parent)
 
     @classmethod
-    def factory_from_raw(cls, raw_pyproject: dict) -> Self:
+    def factory_from_raw(cls, raw_pyproject: dict, root: Path | None = None) -> Self:
         """Convert the raw_pyproject dict provided (from pyproject.toml) and return an instance."""
         parms = {}
+        raw_manage = raw_pyproject.get("tool", {}).get("manage", {})
 
         ################################################################################
-        # Actual recipes!
+        # Actual recipes! (our own overriding any from shared recipe files included)
         ################################################################################
-        parms["recipes"] = raw_pyproject.get("tool", {}).get("manage", {}).get("recipes", {})
+        parms["recipes"] = raw_manage.get("recipes", {})
+        if includes := raw_manage.get("include"):
+            from manage.include import load_all
+
+            recipes, parms["include_errors"] = load_all(includes, root or PYPROJECT_PATH.parent)
+            parms["recipes"] = recipes | parms["recipes"]
 
         # *Current* version of it (note, might very likely be null if user isn't managing a formal package!)
         parms["version"] = raw_pyproject.get("tool", {}).get("poetry", {}).get("version", None)
@@ -1,11 +1,11 @@
 """Core data types."""
-from rich.console import Console
-from typing import Self, TypeVar
+from typing import Dict, List, Self, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 TClass = TypeVar("Class")
+TConsole = TypeVar("TConsole")
 TConfiguration = TypeVar("TConfiguration")
 TStep = TypeVar("TStep")
 
@@ -15,6 +15,17 @@ class Recipe(BaseModel):
 
     description: str | None = None
     steps: list[TStep] = []
+    matrix: Dict[str, List[str]] | None = None  # Run each (method) step once per cell, e.g. {"python": ["3.12"]}
+
+    @field_validator("matrix")
+    @classmethod
+    def check_matrix(cls, matrix: dict | None) -> dict | None:
+        """Ensure our matrix (if any) is valid."""
+        if matrix:
+            from manage.matrix import check
+
+            check(matrix)
+        return matrix
 
     def __iter__(self):
         return iter(self.steps)
@@ -22,7 +33,7 @@ class Recipe(BaseModel):
     def __len__(self):
         return len(self.steps)
 
-    def print(self, console: Console, name: str, configuration: TConfiguration) -> None:
+    def print(self, console: TConsole, name: str, configuration: TConfiguration) -> None:
         """Print the recipe to the specified console."""
         console.print(f"\n[bold italic]{name}[/] ≫ {self.description}")
         steps = [step._str_() for step in self.steps]
@@ -33,6 +44,6 @@ class Recipe(BaseModel):
         """Return a new Recipe instance based on args and current configuration."""
         from manage.models import Step
 
-        recipe = cls(description=recipe_args.get("description", "-"))
+        recipe = cls(description=recipe_args.get("description", "-"), matrix=recipe_args.get("matrix"))
         recipe.steps = [Step.factory(configuration, method_classes, **d_step) for d_step in recipe_args.get("steps")]
         return recipe
@@ -1,14 +1,16 @@
 """Core data types."""
-from rich.console import Console
-from typing import Iterable, Self, TypeVar
+from pathlib import Path
+from typing import Iterable, MutableSet, Self, TypeVar
 
-from pydantic import RootModel
+from pydantic import PrivateAttr, RootModel
 
 TClass = TypeVar("Class")
 TRecipe = TypeVar("TRecipes")
 TConfiguration = TypeVar("TConfiguration")
 TPyProject = TypeVar("TRecipes")
 TRecipes = TypeVar("TRecipes", bound="Recipes")
+THistory = TypeVar("THistory")
+TJournal = TypeVar("TJournal")
 
 
 class Recipes(RootModel):
@@ -16,6 +18,15 @@ class Recipes(RootModel):
 
     root: dict[str, TRecipe] = {}
 
+    # Indices, built once on creation (and kept up-to-date by set):
+    _keys: tuple[str, ...] = PrivateAttr(default=())  # Sorted recipe names
+    _targets: dict[str, str] = PrivateAttr(default_factory=dict)  # Casefolded -> actual recipe name
+
+    def model_post_init(self, __context) -> None:
+        """Build our indices."""
+        self._keys = tuple(sorted(self.root))
+        self._targets = {id_.casefold(): id_ for id_ in self._keys}
+
     def __len__(self):
         return len(self.root)
 
@@ -28,35 +39,57 @@ class Recipes(RootModel):
 
     def set(self, id_: str, recipe: TRecipe) -> None:
         """Treat Recipes as a mapping, setting a specific Recipe using it's id."""
+        if id_ not in self.root:
+            self._keys = tuple(sorted((*self._keys, id_)))
+            self._targets[id_.casefold()] = id_
         self.root[id_] = recipe
 
     def keys(self) -> Iterable[str]:
         """Get the names of all Recipes."""
-        return iter(sorted(self.root.keys()))
+        return iter(self._keys)
 
     def check_target(self, recipe_target: str) -> bool:
         """Is the target provide valid against our current recipes? (on a case-folded basis)."""
-        return recipe_target.casefold() in [id_.casefold() for id_ in self.keys()]
+        return recipe_target.casefold() in self._targets
+
+    def get_target(self, recipe_target: str) -> str | None:
+        """Return the actual name of the recipe for the target provided (on a case-folded basis), if valid."""
+        return self._targets.get(recipe_target.casefold())
 
     def print(self, configuration: TConfiguration):
-        """Print either all the recipes or only that for target."""
+        """Print either all the recipes or only those for our target(s) (one at a time, as we go)."""
+        from rich.console import Console
+
         console = Console(width=60)
+        if configuration.targets:
+            for target in configuration.targets:
+                if recipe_name := self.get_target(target):
+                    self.get(recipe_name).print(console, recipe_name, configuration)
+            return True
         for recipe_name, recipe in self:
-            if configuration.target and configuration.target != recipe_name:
-                continue
             recipe.print(console, recipe_name, configuration)
         return True
 
-    def validate_all_recipes(self, configuration: TConfiguration, fails: list[str] = []) -> list[str]:
+    def validate_all_recipes(self, configuration: TConfiguration, fails: list[str] | None = None) -> list[str]:
         """Validate all recipes defined (using method above to walk each one) and returning all issues encountered."""
-        all_msgs = set()
-        for recipe_id, recipe in self:
-            if msgs := self.validate_recipe(configuration, recipe_id):
-                all_msgs.update(msgs)
-        return list(all_msgs)
-
-    def validate_recipe(self, configuration: TConfiguration, target: str, fails: list[str] = []) -> list[str]:
-        """Walk the tree and validate a *specific* recipe."""
+        fails, validated = [] if fails is None else fails, set()
+        for recipe_id in self.keys():
+            self.validate_recipe(configuration, recipe_id, fails, validated)
+        return list(dict.fromkeys(fails))  # (de-duplicated)
+
+    def validate_recipe(
+        self,
+        configuration: TConfiguration,
+        target: str,
+        fails: list[str] | None = None,
+        validated: MutableSet[str] | None = None,  # (note: "set" is one of our methods!)
+    ) -> list[str]:
+        """Walk the tree and validate a *specific* recipe (each nested recipe only once)."""
+        fails = [] if fails is None else fails
+        validated = set() if validated is None else validated
+        if target in validated:
+            return fails
+        validated.add(target)
         for step in self.get(target):
             # Each step to be performed could be either a method OR another step:
             if step.class_:
@@ -65,20 +98,44 @@ class Recipes(RootModel):
                     fails.extend(msgs)
             else:
                 # Run another recipe!
-                self.validate_recipe(configuration, step.recipe, fails)
+                self.validate_recipe(configuration, step.recipe, fails, validated)
         return fails
 
-    def run(self, configuration: TConfiguration):
-        """Walk the tree, either calling 'run' on the respective method."""
-        for step in self.get(configuration.target):
-            # Each step to be performed could be either a method OR another step:
-            if step.class_:
-                # Instantiate the method's class associated with the step
-                step.class_(configuration, step).run()
-            else:
-                # Run another recipe!
-                configuration.target = step.recipe  # Override the target (but leave the rest)
-                self.walk(configuration)
+    def run(
+        self,
+        configuration: TConfiguration,
+        history: THistory | None = None,
+        journal: TJournal | None = None,
+    ) -> bool:
+        """Walk each target's tree, calling 'run' on the respective method of each step (recording each in history).
+
+        Live runs also keep a journal of the steps completed so that, if a step fails, the run can be
+        resumed from it (with --resume) rather than from the top. Raises JournalError if it can't be.
+        """
+        from manage import scheduler
+        from manage.history import History, read_weights
+        from manage.journal import Journal
+
+        history = History() if history is None else history
+        groups = scheduler.plan(self, *configuration.targets)
+        if configuration.shard:
+            weights = read_weights(Path(configuration.shard_weights)) if configuration.shard_weights else None
+            groups = scheduler.shard(groups, *configuration.shard, weights)
+        journal = Journal(executor=configuration.executor) if journal is None else journal
+        completed = journal.resume(configuration.get_run_name(), groups) if configuration.resume else set()
+        if configuration.dry_run:
+            journal = None  # (nothing's actually completed in a dry-run!)
+        elif not configuration.resume:
+            journal.start(configuration.get_run_name(), groups)
+
+        try:
+            if not scheduler.run(configuration, groups, history, journal, completed):
+                return False
+        finally:
+            history.close()
+        if journal is not None:
+            journal.finish()
+        return True
 
     @classmethod
     def factory(cls, configuration: TConfiguration, pyproject: TPyProject, method_classes: dict[str, TClass]) -> Self:
@@ -1,10 +1,9 @@
 """Core data types."""
-from copy import deepcopy
-from typing import Any, Dict, Self, TypeVar
+from typing import Any, Dict, List, Self, TypeVar
 
 from pydantic import BaseModel, model_validator
 
-from manage.utilities import msg_debug
+from manage.utilities import msg_debug, parse_bytes
 
 TClass = TypeVar("Class")
 TConfiguration = TypeVar("TConfiguration")
@@ -22,6 +21,16 @@ class Step(BaseModel):
     verbose     : bool | None = None
     debug       : bool | None = None
     allow_error : bool | None = None
+    parallel    : bool | None = None   # Can this step run concurrently with adjacent parallel steps?
+    always_run  : bool | None = None   # Run even if an identical step has already run (and nothing's changed since)?
+    timeout     : float | None = None  # Max wall-clock seconds for the command(s) run by this step
+    max_memory  : int | str | None = None  # Max (virtual) memory for each command, e.g. 1073741824 or "1G"
+    cpu_seconds : int | None = None    # Max CPU seconds for each command
+    cpus        : int | None = None    # Job tokens the step needs when run concurrently (e.g. 4 for "pytest -n 4")
+    memory      : int | str | None = None  # Memory to reserve for the step when run concurrently, e.g. "2G"
+    matrix      : Dict[str, List[str]] | None = None  # Run once per cell, e.g. {"python": ["3.11", "3.12"]}
+    inputs      : List[str] | None = None  # Files (or globs) the step reads, e.g. ["scss/*.scss"] (see --export)
+    outputs     : List[str] | None = None  # Files the step writes, e.g. ["static/site.css"] (see --export)
     arguments   : Dict[str, Any] = {}  # Supplemental arguments for the callable
 
     # NOT from inbound manage file:
@@ -36,6 +45,19 @@ class Step(BaseModel):
             raise ValueError("must provide either method or recipe")
         if self.method and self.recipe:
             raise ValueError("must not provide both method and recipe")
+        for size in ("max_memory", "memory"):
+            if (value := getattr(self, size)) is not None:
+                try:
+                    setattr(self, size, parse_bytes(value))
+                except ValueError:
+                    raise ValueError(f"{size} must be a number of bytes (e.g. 536870912 or '512M'), not '{value}'")
+        if self.matrix:
+            from manage.matrix import check
+
+            check(self.matrix)
+        for limit in ("timeout", "max_memory", "cpu_seconds", "cpus", "memory"):
+            if (value := getattr(self, limit)) is not None and value <= 0:
+                raise ValueError(f"{limit} must be greater than zero")
         return self
 
     def get_arg(self, arg_key: str, default: Any | None = None) -> Any | None:
@@ -97,21 +119,20 @@ class Step(BaseModel):
         # However, we might have any number of DYNAMIC command-line args *specific* to this method:
         if not self.method:  # Only true if this step is a method, e.g. git_commit
             return self
-        for (method_name, method_arg), cli_value in configuration.method_args:  # e.g. ("git_commit","message"),".."
-            if method_name == self.method:
-                if default_arg := self.class_.args.get_argument(method_arg):
-                    if default_arg.default:
-                        debugs.append(
-                            f"- {self.name()}: overriding [italic]{method_arg}[/] from "
-                            f"[italic]{default_arg.default}[/] to [italic]{cli_value}[/] "
-                            "from command-line",
-                        )
-                    else:
-                        debugs.append(
-                            f"- {self.name()}: setting [italic]{method_arg}[/] to [italic]{cli_value}[/] "
-                            "from command-line",
-                        )
-                    self.arguments[method_arg] = cli_value
+        for method_arg, cli_value in configuration.get_method_args(self.method).items():  # e.g. "message": ".."
+            if default_arg := self.class_.args.get_argument(method_arg):
+                if default_arg.default:
+                    debugs.append(
+                        f"- {self.name()}: overriding [italic]{method_arg}[/] from "
+                        f"[italic]{default_arg.default}[/] to [italic]{cli_value}[/] "
+                        "from command-line",
+                    )
+                else:
+                    debugs.append(
+                        f"- {self.name()}: setting [italic]{method_arg}[/] to [italic]{cli_value}[/] "
+                        "from command-line",
+                    )
+                self.arguments[method_arg] = cli_value
 
         if configuration.debug:
             for debug in debugs:
@@ -120,19 +141,11 @@ class Step(BaseModel):
         return self
 
     def _str_(self) -> dict:
-        """Return a 'cleaned-up' copy of this step's __dict__ for printing."""
-        step = deepcopy(self)
-
-        # We don't need this for printing..
-        delattr(step, "class_")
-
-        if step.confirm is None:
-            delattr(step, "confirm")
-
-        # And one of these will be empty!
-        if step.method:
-            delattr(step, "recipe")
-        else:
-            delattr(step, "method")
-
-        return step.__dict__
+        """Return a 'cleaned-up' view of this step's __dict__ for printing (without copying the step)."""
+        # We don't need class_ for printing, one of method/recipe will be empty and neither are options not set:
+        skip = {"class_", "recipe" if self.method else "method"}
+        return {
+            attr: value
+            for attr, value in self.__dict__.items()
+            if attr not in skip and value is not None and value != Step.model_fields[attr].default
+        }
@@ -0,0 +1,113 @@
+"""Exporting our target(s) as a ninja build file (ie. --export ninja) and, optionally, running it with ninja.
+
+Each method step becomes a build edge running the command its method would (see AbstractMethod.command_line),
+with the step's declared `inputs` (files or globs) and `outputs` as the edge's inputs and outputs, hence
+ninja only re-runs a step when its inputs have changed (and, with restat, only re-runs the steps after it
+when its outputs actually changed). A step without outputs is always run (as it would be by us).
+
+The order of the recipe is kept through order-only dependencies: each step runs after all those of the group
+(see scheduler.plan) before it, while the steps of a group (ie. parallel ones) are left to ninja to run
+concurrently. Steps whose methods can't be expressed as a command (e.g. clean) or that run in a matrix
+can't be exported.
+"""
+import glob
+import shlex
+import shutil
+import subprocess
+from pathlib import Path
+from typing import TypeVar
+
+from manage import MANAGE_PATH, scheduler
+
+TConfiguration = TypeVar("TConfiguration")
+TRecipes = TypeVar("TRecipes")
+
+NINJA_PATH = Path("build.ninja")
+
+# Outputs of the steps that don't declare any (never created, hence, always run):
+STAMP_PATH = Path(MANAGE_PATH.name) / "ninja"
+
+RULE = """\
+rule step
+  command = $cmd
+  description = $desc
+  restat = 1
+"""
+
+
+def escape_path(path: str) -> str:
+    """Escape a path for use in a build line, e.g. "a b:c" -> "a$ b$:c"."""
+    return path.replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+def escape(value: str) -> str:
+    """Escape a variable's value (ie. a command or description)."""
+    return value.replace("$", "$$")
+
+
+def export(configuration: TConfiguration, recipes: TRecipes) -> tuple[str, list[str]]:
+    """Return the ninja build file for our target(s) along with the steps that couldn't be exported (if any)."""
+    lines, fails = [f"# Generated by manage --export ninja {configuration.get_run_name()}", "", RULE], []
+    emitted: dict[tuple[str, str], list[str]] = {}  # Outputs of each step exported (by key), ie. each only once
+    previous: str | None = None  # Phony output of the last group, ie. what the next group runs after
+
+    for target in configuration.targets:
+        for number, group in enumerate(scheduler.plan(recipes, target), start=1):
+            outputs = []
+            for job in group:
+                if job.key in emitted:  # (e.g. a recipe included by several targets)
+                    outputs.extend(emitted[job.key])
+                    continue
+                if job.cell:
+                    fails.append(f"{job.describe()}: steps run in a matrix can't be exported.")
+                    continue
+                method = job.step.class_(configuration, job.step)
+                if (command := method.command_line()) is None:
+                    fails.append(f"{job.describe()}: the [italic]{job.step.method}[/] method can't be exported.")
+                    continue
+                command = shlex.join(command) + (" || true" if job.step.allow_error else "")
+                edge_outputs = job.step.outputs or [str(STAMP_PATH / f"{job.recipe}.{job.index + 1}")]
+                inputs = _expand(job.step.inputs or [])
+                lines.append(
+                    f"build {' '.join(map(escape_path, edge_outputs))}: step"
+                    + "".join(f" {escape_path(input_)}" for input_ in inputs)
+                    + (f" || {escape_path(previous)}" if previous else ""),
+                )
+                lines.append(f"  cmd = {escape(command)}")
+                lines.append(f"  desc = {escape(job.describe())}")
+                emitted[job.key] = edge_outputs
+                outputs.extend(edge_outputs)
+            if outputs:
+                previous = str(STAMP_PATH / f"{target}.group-{number}")
+                lines.append(f"build {escape_path(previous)}: phony {' '.join(map(escape_path, outputs))}")
+                lines.append("")
+        lines.append(f"build {escape_path(target)}: phony{' ' + escape_path(previous) if previous else ''}")
+        lines.append("")
+
+    lines.append(f"default {' '.join(map(escape_path, configuration.targets))}")
+    return "\n".join(lines) + "\n", fails
+
+
+def run(configuration: TConfiguration, path: Path = NINJA_PATH) -> int:
+    """Run our target(s) from the build file specified through ninja, returning its exit code."""
+    args = ["ninja", "-f", str(path)]
+    if configuration.jobs and configuration.jobs > 1:  # (otherwise, we leave it to ninja's default)
+        args.extend(["-j", str(configuration.jobs)])
+    if configuration.verbose:
+        args.append("-v")
+    return subprocess.run(args + configuration.targets).returncode
+
+
+def validate() -> str | None:
+    """Make sure that we can run ninja."""
+    if not shutil.which("ninja"):
+        return "Sorry, couldn't find '[italic]ninja[/]' on your path."
+    return None
+
+
+def _expand(inputs: list[str]) -> list[str]:
+    """Expand any globs in the inputs specified (an input that doesn't exist yet is kept as-is, e.g. a generated one)."""
+    paths = []
+    for input_ in inputs:
+        paths.extend(sorted(glob.glob(input_, recursive=True)) if any(char in input_ for char in "*?[") else [input_])
+    return paths
@@ -0,0 +1,165 @@
+"""Minimal PEP 517 build "frontend", ie. call a project's [build-system] backend hooks directly.
+
+Hooks are called either in this process or (when isolation matters) in a worker process, ie.
+python -c <_WORKER> <build-backend> <hook> <directory> [<backend-path>...] from the project's root.
+"""
+import importlib
+import os
+import sys
+import threading
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from manage.executors import Executor
+
+HOOKS = ("build_sdist", "build_wheel")
+
+# Default as per PEP 517 if a project doesn't have a [build-system] table:
+DEFAULT_BUILD_BACKEND = "setuptools.build_meta:__legacy__"
+
+# In-process builds change our cwd and environment while they run, one at a time please:
+_lock = threading.Lock()
+
+# Run (by the build's python, with -c rather than as a file so nothing of ours is on its sys.path) to call a single
+# hook, ie. with only the backend-path (if any) on the path ahead of the interpreter's own, as for any PEP 517 frontend:
+_WORKER = """\
+import importlib, os, sys
+if sys.path and sys.path[0] == "":
+    del sys.path[0]  # (ie. the project's root, unless PYTHONSAFEPATH is set)
+build_backend, hook, directory, *backend_path = sys.argv[1:]
+sys.path[:0] = [os.path.abspath(path) for path in backend_path]
+module_name, _, object_path = build_backend.partition(":")
+backend = importlib.import_module(module_name)
+for attr in object_path.split(".") if object_path else []:
+    backend = getattr(backend, attr)
+print(getattr(backend, hook)(directory))
+"""
+
+
+def get_build_system(path_pyproject: Path) -> tuple[str, list[str]]:
+    """Return the build-backend and backend-path (if any) from the specified pyproject.toml."""
+    build_system = tomllib.loads(path_pyproject.read_text()).get("build-system", {})
+    return build_system.get("build-backend", DEFAULT_BUILD_BACKEND), build_system.get("backend-path", [])
+
+
+def load_backend(build_backend: str, backend_path: list[str] | None = None, root: Path | None = None) -> Any:
+    """Import and return the backend object specified, e.g. "poetry.core.masonry.api" or "module:object"."""
+    root = root or Path.cwd()
+    for path in reversed(backend_path or []):
+        if (path := str((root / path).resolve())) not in sys.path:
+            sys.path.insert(0, path)
+    module_name, _, object_path = build_backend.partition(":")
+    backend = importlib.import_module(module_name)
+    for attr in object_path.split(".") if object_path else []:
+        backend = getattr(backend, attr)
+    return backend
+
+
+def call_hook(
+    build_backend: str,
+    hook: str,
+    directory: Path,
+    backend_path: list[str] | None = None,
+    root: Path | None = None,
+) -> str:
+    """Call a single build hook of the backend specified, returning the basename of the artifact built."""
+    return getattr(load_backend(build_backend, backend_path, root), hook)(str(directory))
+
+
+def _call_hook_isolated(
+    build_backend: str,
+    hook: str,
+    directory: Path,
+    backend_path: list[str],
+    root: Path,
+    python: str | None = None,
+    env: dict[str, str] | None = None,
+    executor: Executor | None = None,
+) -> str:
+    """Call the hook in a separate worker process (e.g. so backends can't interfere with us or each other).
+
+    The worker is run through the executor provided (see manage.executors), ie. it can be recorded and replayed,
+    hence, the directory is passed relative to the project's root where possible (ie. the same on any checkout).
+    """
+    directory_ = os.path.relpath(directory, root) if directory.is_relative_to(root) else str(directory)
+    cmd = [python or sys.executable, "-c", _WORKER, build_backend, hook, directory_, *backend_path]
+    executor = executor or Executor()
+    result = executor.run(cmd, cwd=root, env=env)
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(stderr or f"{hook} failed with return code {result.returncode}")
+    return result.stdout.decode(errors="replace").strip().split("\n")[-1]  # Backends may be chatty, name's last.
+
+
+@contextmanager
+def _in_process(root: Path, source_date_epoch: int | None) -> Iterator[None]:
+    """Run from the project's root (and with its SOURCE_DATE_EPOCH, if any), restoring both afterwards."""
+    previous_cwd, previous_epoch = Path.cwd(), os.environ.get("SOURCE_DATE_EPOCH")
+    os.chdir(root)
+    if source_date_epoch is not None:
+        os.environ["SOURCE_DATE_EPOCH"] = str(source_date_epoch)
+    try:
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        if source_date_epoch is not None:
+            if previous_epoch is None:
+                del os.environ["SOURCE_DATE_EPOCH"]
+            else:
+                os.environ["SOURCE_DATE_EPOCH"] = previous_epoch
+
+
+def build(
+    root: Path,
+    dist_dir: Path,
+    hooks: tuple[str, ...] = HOOKS,
+    isolated: bool = True,
+    source_date_epoch: int | None = None,
+    python: str | None = None,
+    env: dict[str, str] | None = None,
+    executor: Executor | None = None,
+) -> list[tuple[str, bool, str]]:
+    """Build all the artifacts requested, returning (hook, success, artifact name or error) for each.
+
+    By default (isolated), each hook is called concurrently in its own worker process, run from the project's root
+    and with its own environment (using the python interpreter specified, if any, e.g. to build with a specific python
+    version). Otherwise, the hooks are called in turn in *this* process, from the project's root and with
+    SOURCE_DATE_EPOCH set while they run. As backends are free to change process-wide state (e.g. setuptools'
+    changes the cwd and sys.argv), only do so when nothing else is running alongside the build.
+
+    Worker processes are run through the executor specified (if any, e.g. to record or replay them), in-process
+    builds can't be recorded nor replayed so we always use workers with anything other than the real thing.
+    """
+    executor = executor or Executor()
+    build_backend, backend_path = get_build_system(root / "pyproject.toml")
+    isolated = isolated or python is not None or env is not None or type(executor) is not Executor
+    root, dist_dir = root.resolve(), dist_dir.resolve()
+    dist_dir.mkdir(parents=True, exist_ok=True)
+
+    def __build(hook: str, function: Callable[..., str], *args) -> tuple[str, bool, str]:
+        try:
+            return hook, True, function(*args)
+        except Exception as err:  # Any backend error is a build failure, not *our* failure.
+            return hook, False, f"{type(err).__name__}: {err}"
+
+    if isolated:
+        env = dict(env if env is not None else os.environ)
+        if source_date_epoch is not None:
+            env["SOURCE_DATE_EPOCH"] = str(source_date_epoch)
+
+        def __isolated(hook: str) -> tuple[str, bool, str]:
+            args = (build_backend, hook, dist_dir, backend_path, root, python, env, executor)
+            return __build(hook, _call_hook_isolated, *args)
+
+        with ThreadPoolExecutor(max_workers=len(hooks)) as pool:
+            return list(pool.map(__isolated, hooks))
+
+    with _lock, _in_process(root, source_date_epoch):
+        try:
+            backend = load_backend(build_backend, backend_path, root)
+        except ImportError as err:
+            return [(hook, False, f"Unable to import build-backend '{build_backend}': {err}") for hook in hooks]
+        return [__build(hook, getattr(backend, hook), str(dist_dir)) for hook in hooks]
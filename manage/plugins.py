@@ -0,0 +1,130 @@
+"""Third-party methods, ie. those of other (installed) packages registered under our entry-point group.
+
+A package provides methods by registering each method's class under the "manage.methods" group,
+e.g. in its pyproject.toml:
+
+    [tool.poetry.plugins."manage.methods"]
+    deploy_docs = "our_methods.deploy_docs:Method"
+
+Finding entry points means reading the metadata of *every* installed distribution (slow in large
+environments), hence, we cache the resulting index (name -> "module:attribute") in .manage/plugins.json,
+keyed by the modification times of the directories on our path (which change whenever a distribution
+is installed or removed). A plugin's module is only imported when a method of that name is first
+looked up, ie. when a recipe step (or --help) needs it.
+"""
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterator, TypeVar
+
+from manage import MANAGE_PATH
+from manage.utilities import msg_failure
+
+ENTRY_POINT_GROUP = "manage.methods"
+
+CACHE_PATH = MANAGE_PATH / "plugins.json"
+
+TClass = TypeVar("Class")
+
+
+def _path_mtimes() -> dict[str, int]:
+    """Return the modification time of each directory on our path (ie. where distributions are installed)."""
+    mtimes = {}
+    for entry in sys.path:
+        try:
+            mtimes[entry or "."] = os.stat(entry or ".").st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def discover(path_cache: Path | None = None) -> dict[str, str]:
+    """Return the methods registered by installed distributions, ie. {name: "module:attribute"}."""
+    path_cache = path_cache or CACHE_PATH
+    key = _path_mtimes()
+    try:
+        cache = json.loads(path_cache.read_text())
+        if cache.get("key") == key:
+            return cache["plugins"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    from importlib.metadata import entry_points
+
+    plugins = {entry_point.name: entry_point.value for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+    try:
+        path_cache.parent.mkdir(parents=True, exist_ok=True)
+        path_cache.write_text(json.dumps({"key": key, "plugins": plugins}))
+    except OSError:
+        pass  # (our cache is only an optimisation)
+    return plugins
+
+
+def load(name: str, spec: str) -> TClass | None:
+    """Import and return the method class of a plugin, e.g. "our_methods.deploy_docs:Method" (or None)."""
+    module_name, _, attribute = spec.partition(":")
+    try:
+        cls = importlib.import_module(module_name)
+        for part in (attribute or "Method").split("."):
+            cls = getattr(cls, part)
+    except Exception as err:  # (anything can happen importing someone else's code!)
+        msg_failure(f"Sorry, unable to load method [italic]{name}[/] from '[italic]{spec}[/]': {err}")
+        return None
+    return cls
+
+
+class MethodClasses(dict):
+    """Our method classes by name, ie. the built-ins along with any plugins (only imported on first use).
+
+    Built-in methods take precedence over plugins of the same name.
+    """
+
+    def __init__(self, classes: dict[str, TClass], plugins: dict[str, str] | None = None):
+        """Note: plugins are provided as {name: "module:attribute"}, see discover."""
+        super().__init__(classes)
+        self.plugins = {name: spec for name, spec in (plugins or {}).items() if name not in classes}
+
+    def __missing__(self, name: str) -> TClass:
+        if (spec := self.plugins.pop(name, None)) and (cls := load(name, spec)):
+            self[name] = cls
+            return cls
+        raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return super().__contains__(name) or name in self.plugins
+
+    def get(self, name: str, default: TClass | None = None) -> TClass | None:
+        """Return the method class of the name provided (importing it if it's a plugin), else the default."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def load_all(self) -> None:
+        """Import all our plugins (e.g. for --help), those that can't be loaded are dropped."""
+        for name in list(self.plugins):
+            self.get(name)
+
+    def __iter__(self) -> Iterator[str]:
+        self.load_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self.plugins)
+
+    def keys(self):
+        """Return the names of all our methods (importing any plugins not yet imported)."""
+        self.load_all()
+        return super().keys()
+
+    def values(self):
+        """Return all our method classes (importing any plugins not yet imported)."""
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        """Return all our (name, method class) pairs (importing any plugins not yet imported)."""
+        self.load_all()
+        return super().items()
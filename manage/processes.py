@@ -0,0 +1,304 @@
+"""Running external commands, each in its own process group and with optional resource limits.
+
+Every command is started in a new session (and thus process group) so that the command *and*
+anything it spawned can be killed as a whole, e.g. on a timeout or when the user hits Ctrl-C.
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import NamedTuple
+
+# How long we give a process group to exit on SIGTERM before we resort to SIGKILL.
+KILL_GRACE = 2.0
+
+# Limits that can be applied to a step (and what we call them in our reporting):
+LIMITS = ("timeout", "max_memory", "cpu_seconds")
+
+_active: set[subprocess.Popen] = set()
+_active_lock = threading.Lock()
+
+# Processes (ie. process groups) we've killed ourselves, e.g. on a timeout or Ctrl-C:
+_killed: weakref.WeakSet[subprocess.Popen] = weakref.WeakSet()
+
+# File descriptors every command inherits (ie. those of our jobserver's pipe while it's running):
+_pass_fds: tuple[int, ...] = ()
+
+
+class Completed(NamedTuple):
+    """Result of running a command."""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    limit: str | None = None  # Which (if any) of our LIMITS caused the command to be killed.
+
+
+# Run (by our python) in place of a command that has resource limits: sets them then exec's the command. We don't
+# use a preexec_fn for this as it isn't safe to run one in a process with threads (which we often are, e.g. --jobs).
+_LIMITS_WRAPPER = """\
+import os, resource, sys
+max_memory, cpu_seconds, args = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3:]
+if max_memory:
+    resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+if cpu_seconds:  # (SIGXCPU at the soft limit, SIGKILL from the kernel at the hard one)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+try:
+    os.execvp(args[0], args)
+except OSError as err:
+    sys.stderr.write(f"{args[0]}: {err.strerror}\\n")
+    sys.exit(127 if isinstance(err, FileNotFoundError) else 126)  # (as per a shell)
+"""
+
+
+def _with_limits(args: list[str], max_memory: int | None, cpu_seconds: int | None) -> list[str]:
+    """Return the command line to run args by, ie. through our wrapper if it has any resource limits."""
+    if not (max_memory or cpu_seconds):
+        return list(args)
+    return [sys.executable, "-S", "-c", _LIMITS_WRAPPER, str(max_memory or 0), str(cpu_seconds or 0), *args]
+
+
+def _detect_limit(completed: Completed, max_memory: int | None, cpu_seconds: int | None, killed: bool) -> str | None:
+    """Make our best guess as to whether a resource limit was the cause of a command's failure.
+
+    Only signals the kernel delivers for a limit count, ie. not a SIGKILL (or anything else) of ours (killed).
+    """
+    if completed.returncode == 0:
+        return None
+    if cpu_seconds and (
+        completed.returncode == -signal.SIGXCPU or (completed.returncode == -signal.SIGKILL and not killed)
+    ):
+        return "cpu_seconds"
+    if max_memory and not killed:  # (RLIMIT_AS fails allocations, how a command copes is up to it)
+        stderr = completed.stderr.lower()
+        if (
+            completed.returncode in (-signal.SIGSEGV, -signal.SIGABRT)
+            or b"memoryerror" in stderr
+            or b"cannot allocate memory" in stderr
+            or b"out of memory" in stderr
+        ):
+            return "max_memory"
+    return None
+
+
+def kill(process: subprocess.Popen, grace: float = KILL_GRACE) -> None:
+    """Kill the process group of the process specified, politely at first (SIGTERM) and then not (SIGKILL)."""
+    _killed.add(process)
+    for sig, wait in ((signal.SIGTERM, grace), (signal.SIGKILL, None)):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return  # Already gone.
+        try:
+            process.wait(timeout=wait)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def kill_all() -> None:
+    """Kill all process groups we currently have running (e.g. on Ctrl-C)."""
+    with _active_lock:
+        processes = list(_active)
+    for process in processes:
+        kill(process)
+
+
+def inherit(*fds: int) -> None:
+    """Set the file descriptors that every command we run from now on inherits (none if not specified)."""
+    global _pass_fds
+    _pass_fds = fds
+
+
+def run(
+    args: list[str],
+    timeout: float | None = None,
+    max_memory: int | None = None,
+    cpu_seconds: int | None = None,
+    **popen_kwargs,
+) -> Completed:
+    """Run the command specified (in its own process group, with resource limits), killing it if it takes too long."""
+    process = subprocess.Popen(
+        _with_limits(args, max_memory, cpu_seconds),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+        pass_fds=_pass_fds,
+        **popen_kwargs,
+    )
+    with _active_lock:
+        _active.add(process)
+    try:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill(process)
+            stdout, stderr = process.communicate()
+            return Completed(process.returncode, stdout, stderr, "timeout")
+        except BaseException:  # ie. KeyboardInterrupt, don't leave anything behind!
+            kill(process)
+            raise
+    finally:
+        with _active_lock:
+            _active.discard(process)
+
+    completed = Completed(process.returncode, stdout, stderr)
+    return completed._replace(limit=_detect_limit(completed, max_memory, cpu_seconds, process in _killed))
+
+
+class Stage(NamedTuple):
+    """A command in a pipeline, along with any redirections of its input and output (to/from files)."""
+
+    args: list[str]
+    stdin: str | None = None  # File to read from (instead of the previous stage's output)
+    stdout: str | None = None  # File to write to (instead of the next stage's input)
+    stdout_append: bool = False
+    stderr: str | None = None  # File to write errors to (instead of our stderr)
+    stderr_append: bool = False
+    stderr_to_stdout: bool = False  # ie. 2>&1
+
+    def describe(self) -> list[str]:
+        """Return the stage as arguments, e.g. ["sort", "<", "in.txt"] (ie. to record and replay it by)."""
+        args = list(self.args)
+        if self.stdin:
+            args += ["<", self.stdin]
+        if self.stdout:
+            args += [">>" if self.stdout_append else ">", self.stdout]
+        if self.stderr:
+            args += ["2>>" if self.stderr_append else "2>", self.stderr]
+        if self.stderr_to_stdout:
+            args += ["2>&1"]
+        return args
+
+
+def pipeline(
+    stages: list[Stage],
+    timeout: float | None = None,
+    max_memory: int | None = None,
+    cpu_seconds: int | None = None,
+    cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+) -> Completed:
+    """Run the stages specified connected by OS pipes (as a shell would, but without one), as per run.
+
+    Each stage's output is read directly by the next (ie. nothing passes through us) and redirections
+    are opened as file descriptors for the stages. We only read the output of the last stage (unless
+    redirected) and the errors of all stages. All the stages run in a single (new) process group, that
+    of the first, with the same limits. As with a shell's pipefail, the return code is that of the last
+    stage to fail, although a stage killed by SIGPIPE (ie. whose output wasn't all read) doesn't count.
+    """
+
+    def __open(path: str, flags: int) -> int:
+        return os.open(Path(cwd or ".") / path, flags, 0o666)
+
+    write_flags = os.O_WRONLY | os.O_CREAT
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    chunks: dict[int, list[bytes]] = {out_read: [], err_read: []}
+    readers = [threading.Thread(target=_drain, args=(fd, chunks[fd]), daemon=True) for fd in (out_read, err_read)]
+    for reader in readers:
+        reader.start()
+
+    started: list[subprocess.Popen] = []
+    stdin: int | None = None
+    error: OSError | None = None
+    try:
+        for index, stage in enumerate(stages):
+            fds = [stdin] if stdin is not None else []  # (ours to close once the stage has started, or failed to)
+            next_stdin = None
+            try:
+                if stage.stdin:  # (instead of the previous stage's output, if any)
+                    stdin = __open(stage.stdin, os.O_RDONLY)
+                    fds.append(stdin)
+                if stage.stdout:
+                    stdout = __open(stage.stdout, write_flags | (os.O_APPEND if stage.stdout_append else os.O_TRUNC))
+                    fds.append(stdout)
+                elif index < len(stages) - 1:
+                    next_stdin, stdout = os.pipe()
+                    fds.append(stdout)
+                else:
+                    stdout = out_write
+                if stage.stderr:
+                    stderr = __open(stage.stderr, write_flags | (os.O_APPEND if stage.stderr_append else os.O_TRUNC))
+                    fds.append(stderr)
+                else:
+                    stderr = subprocess.STDOUT if stage.stderr_to_stdout else err_write
+                process = subprocess.Popen(
+                    _with_limits(stage.args, max_memory, cpu_seconds),
+                    stdin=stdin if stdin is not None else subprocess.DEVNULL,
+                    stdout=stdout,
+                    stderr=stderr,
+                    cwd=cwd,
+                    env=env,
+                    pass_fds=_pass_fds,
+                    process_group=started[0].pid if started else 0,  # (a new session's group can't be joined)
+                )
+            except BaseException:
+                if next_stdin is not None:
+                    os.close(next_stdin)
+                raise
+            finally:
+                for fd in fds:
+                    os.close(fd)
+            started.append(process)
+            if index == 0:
+                with _active_lock:
+                    _active.add(process)
+            stdin = next_stdin
+    except BaseException as err:
+        if started:
+            kill(started[0])
+        if not isinstance(err, OSError):
+            raise
+        error = err  # e.g. a command or file that doesn't exist, reported as a shell would (once we've cleaned up)
+    finally:
+        os.close(out_write)  # (the stages have their own copies, our readers see EOF once they've all exited)
+        os.close(err_write)
+
+    limit = None
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        for process in started:
+            try:
+                process.wait(timeout=max(0, deadline - time.monotonic()) if deadline else None)
+            except subprocess.TimeoutExpired:
+                kill(started[0])
+                limit = "timeout"
+                break
+    except BaseException:  # ie. KeyboardInterrupt, don't leave anything behind!
+        kill(started[0])
+        raise
+    finally:
+        for process in started:
+            process.wait()
+        if started:
+            with _active_lock:
+                _active.discard(started[0])
+        for reader in readers:
+            reader.join()
+
+    if error is not None:
+        not_found = isinstance(error, FileNotFoundError) and error.filename == stages[len(started)].args[0]
+        return Completed(127 if not_found else 1, b"", str(error).encode())  # (as per a shell)
+    returncode = 0
+    for index, process in enumerate(started):
+        if process.returncode != 0 and not (process.returncode == -signal.SIGPIPE and index < len(started) - 1):
+            returncode = process.returncode
+    completed = Completed(returncode, b"".join(chunks[out_read]), b"".join(chunks[err_read]), limit)
+    if limit:
+        return completed
+    killed = bool(started) and started[0] in _killed
+    return completed._replace(limit=_detect_limit(completed, max_memory, cpu_seconds, killed))
+
+
+def _drain(fd: int, chunks: list[bytes]) -> None:
+    """Read everything from the file descriptor specified (until EOF) into chunks, then close it."""
+    try:
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
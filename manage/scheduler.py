@@ -0,0 +1,345 @@
+"""Step scheduling, ie. turning a recipe target into an ordered plan of steps and running it.
+
+A "plan" is a list of groups, each group being a list of steps that are independent of each
+other (ie. consecutive method steps marked with `parallel = true` or the cells of a step with
+a `matrix`); groups are run in order while the steps *within* a group may be run concurrently
+(up to --jobs at a time, see jobserver). If any step of a group fails, no further groups are run.
+
+A plan can cover several targets (e.g. `manage build release`), in which case the same step may
+appear more than once (e.g. a `clean` recipe included by both). A step identical to one already
+run (same method and arguments) is skipped if the project hasn't changed since (see journal.fingerprint),
+unless it's marked `always_run`. As the fingerprint only covers the files tracked by git, steps are never
+skipped outside a git repository, mark those whose effects are on untracked or ignored files (e.g. build/)
+as `always_run`.
+
+A plan can also be split across several (CI) runners with --shard i/n, see shard.
+"""
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Callable, NamedTuple, TypeVar
+
+from manage import matrix, processes
+from manage.dashboard import Dashboard
+from manage.history import History, args_hash
+from manage.jobserver import Jobserver
+from manage.journal import Journal, fingerprint, job_id
+from manage.matrix import expand
+from manage.utilities import capture, msg_failure, msg_success, msg_warning, print, print_captured
+
+TConfiguration = TypeVar("TConfiguration")
+TRecipes = TypeVar("TRecipes")
+TStep = TypeVar("TStep")
+
+# Statuses that don't make a run a failure (a matrix cell is skipped if its interpreter isn't available):
+OK_STATUSES = ("success", "skipped")
+
+
+class Job(NamedTuple):
+    """A single (method) step to be executed, along with where it came from.
+
+    This is our (compact, tuple-based) representation of a step on the execution path, anything
+    needed repeatedly while scheduling (ie. the history key) is computed once, when planning.
+    """
+
+    recipe: str  # Name of the recipe that the step is defined in (which may be nested in our target)
+    index: int  # Index of the step within its recipe
+    step: TStep
+    key: tuple[str, str]  # (method, args_hash), how we look up estimated durations from our run history
+    cell: tuple[tuple[str, str], ...] = ()  # Matrix cell to run the step in (if any), e.g. (("python", "3.12"),)
+
+    @classmethod
+    def factory(cls, recipe: str, index: int, step: TStep, cell: tuple[tuple[str, str], ...] = ()) -> "Job":
+        """Return a new Job for the step specified."""
+        arguments = {**step.arguments, "matrix": dict(cell)} if cell else step.arguments
+        return cls(recipe, index, step, (step.method, args_hash(arguments)), cell)
+
+    def describe(self) -> str:
+        """Return a short description of the job, e.g. "build:2 command"."""
+        return f"{self.recipe}:{self.index + 1} {self.step.method}"
+
+
+def plan(recipes: TRecipes, *targets: str) -> list[list[Job]]:
+    """Flatten the (possibly nested) recipe target(s) into groups of independent steps."""
+    groups: list[list[Job]] = []
+    open_group = False  # Can the next parallel step join the last group? (never across recipe boundaries)
+
+    def __walk(recipe_name: str, matrix: dict | None) -> None:
+        nonlocal open_group
+        open_group = False
+        recipe = recipes.get(recipe_name)
+        matrix = recipe.matrix or matrix  # (a recipe's matrix applies to any recipes nested within it)
+        for index, step in enumerate(recipe):
+            if step.recipe:
+                __walk(step.recipe, matrix)
+                open_group = False
+                continue
+            jobs = [Job.factory(recipe_name, index, step, cell) for cell in expand(step.matrix or matrix) or [()]]
+            if step.parallel and open_group:
+                groups[-1].extend(jobs)
+            else:
+                groups.append(jobs)
+            open_group = bool(step.parallel)
+
+    for target in targets:
+        __walk(target, None)
+    return groups
+
+
+def unit(job: Job, group: list[Job]) -> str | None:
+    """Return the unit of work the job is sharded with, ie. its matrix cell or itself if independent (else None).
+
+    All the steps of a matrix cell stay together (as each depends on those before it in the same cell),
+    whereas steps that aren't independent of those around them aren't sharded at all.
+    """
+    if job.cell:
+        return matrix.describe(job.cell)
+    return job_id(job) if len(group) > 1 else None
+
+
+def assign(groups: list[list[Job]], count: int, weights: dict[tuple[str, str], float] | None = None) -> dict[str, int]:
+    """Deterministically assign each unit of work in the plan to one of count shards (0-based), balancing their load.
+
+    Units are weighted by their number of steps unless we're given weights (ie. the expected duration of
+    each step from --shard-weights, the *same* file for every runner) that cover all of them. Units are
+    then assigned heaviest first, each to the least loaded shard (ties broken by name and shard number).
+    """
+    estimates = weights or {}
+    units: dict[str, list[Job]] = {}
+    for group in groups:
+        for job in group:
+            if (unit_ := unit(job, group)) is not None:
+                units.setdefault(unit_, []).append(job)
+
+    with_durations = all(job.key in estimates for jobs in units.values() for job in jobs)
+
+    def __weight(jobs: list[Job]) -> float:
+        return sum(estimates[job.key] for job in jobs) if with_durations else len(jobs)
+
+    loads, assignments = [0.0] * count, {}
+    for unit_, jobs in sorted(units.items(), key=lambda item: (-__weight(item[1]), item[0])):
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        loads[shard] += __weight(jobs)
+        assignments[unit_] = shard
+    return assignments
+
+
+def shard(
+    groups: list[list[Job]],
+    index: int,
+    count: int,
+    weights: dict[tuple[str, str], float] | None = None,
+) -> list[list[Job]]:
+    """Return only those steps of the plan for shard index (of count, 1-based as per --shard 1/3), see assign.
+
+    Steps that aren't independent (ie. not parallel nor a matrix cell) are run by every shard.
+    """
+    assignments = assign(groups, count, weights)
+    sharded = []
+    for group in groups:
+        jobs = [job for job in group if (unit_ := unit(job, group)) is None or assignments[unit_] == index - 1]
+        if jobs:
+            sharded.append(jobs)
+    return sharded
+
+
+def order(group: list[Job], estimates: dict[tuple[str, str], float]) -> list[Job]:
+    """Order a group of independent steps longest-expected-duration first (steps with no history go first)."""
+    if len(group) < 2:
+        return group
+    return sorted(group, key=lambda job: -estimates.get(job.key, float("inf")))
+
+
+def critical_path(groups: list[list[Job]], estimates: dict[tuple[str, str], float]) -> tuple[float, list[Job]]:
+    """Return the expected duration and steps of the critical (ie. longest) path through the plan."""
+    total, path = 0.0, []
+    for group in groups:
+        longest = max(group, key=lambda job: estimates.get(job.key, 0.0))
+        total += estimates.get(longest.key, 0.0)
+        path.append(longest)
+    return total, path
+
+
+def execute(
+    configuration: TConfiguration,
+    target: str,
+    job: Job,
+    history: History | None,
+    journal: Journal | None = None,
+) -> bool:
+    """Run a single step (recording its execution in our history), returning its success."""
+    return execute_status(configuration, target, job, history, journal) in OK_STATUSES
+
+
+def execute_status(
+    configuration: TConfiguration,
+    target: str,
+    job: Job,
+    history: History | None,
+    journal: Journal | None = None,
+) -> str:
+    """Run a single step (recording it in our history, unless a dry-run, and journal), returning its status."""
+    status, instance = "error", None
+    started_at, wall_start = time.time(), time.perf_counter()
+    cpu_start = time.process_time() + _children_cpu_time()
+    try:
+        # Instantiate the method's class associated with the step and run it (in its matrix cell's environment):
+        instance = job.step.class_(configuration, job.step)
+        if job.cell:
+            instance.env = matrix.environment(job.cell, executor=configuration.executor)
+        status = "success" if instance.run() else (getattr(instance, "limit", None) or "failure")
+    except matrix.MatrixError as err:
+        msg_warning(str(err))
+        status = "skipped"
+    except (KeyboardInterrupt, EOFError):
+        status = "interrupted"
+        raise
+    finally:
+        if history is not None and not configuration.dry_run:  # (a dry-run's "durations" would skew our estimates)
+            history.record(
+                started_at=started_at,
+                target=target,
+                recipe=job.recipe,
+                step=job.index,
+                method=job.step.method,
+                args_hash=job.key[1],
+                status=status,
+                wall_time=time.perf_counter() - wall_start,
+                cpu_time=time.process_time() + _children_cpu_time() - cpu_start,
+                exit_code=getattr(instance, "exit_code", None),
+                output_size=getattr(instance, "output_size", 0),
+            )
+    if status == "success" and journal is not None:
+        journal.complete(job)
+    return status
+
+
+def run(
+    configuration: TConfiguration,
+    groups: list[list[Job]],
+    history: History | None = None,
+    journal: Journal | None = None,
+    completed: set[str] | frozenset[str] = frozenset(),
+    state: Callable[[], str | None] | None = None,
+) -> bool:
+    """Run all the groups in the plan provided, returning True if all steps were successful.
+
+    Steps that were completed by a previous run (ie. their job_id is in completed, see --resume) are skipped,
+    as are those identical to one already run in this run if the project's state (by default, its fingerprint)
+    hasn't changed since (never if there's no state to compare, ie. None).
+    """
+    estimates = history.estimates() if history is not None else {}
+    state = state or (lambda: fingerprint(journal.root if journal is not None else None, configuration.executor))
+    jobs = max(1, configuration.jobs or 1)
+    target = configuration.get_run_name()
+    repeated = _repeated(groups)
+    done: dict[tuple[str, str], str | None] = {}  # Job key -> state of the project after it last ran (if repeated)
+    results: list[tuple[Job, str]] = []
+    with Jobserver(jobs) if jobs > 1 else nullcontext() as jobserver:
+        for group in groups:
+            for job in [job for job in group if job_id(job) in completed]:
+                msg_success(f"Skipping [italic]{job.describe()}[/], completed by the last run")
+            group = [job for job in group if job_id(job) not in completed]
+            if done and any(job.key in done for job in group):
+                current = state()
+                for job in [job for job in group if _is_duplicate(job, done, current)]:
+                    msg_success(f"Skipping [italic]{job.describe()}[/], already run (and nothing has changed since)")
+                group = [job for job in group if not _is_duplicate(job, done, current)]
+            group = order(group, estimates)
+
+            first = len(results)
+            try:
+                if len(group) == 1 or jobs == 1:
+                    for job in group:
+                        if job.cell:
+                            print(_header(job))
+                        results.append((job, execute_status(configuration, target, job, history, journal)))
+                else:
+                    jobserver.refresh()
+                    results.extend(_run_concurrently(configuration, group, jobserver, history, journal))
+            finally:
+                if journal is not None:
+                    journal.checkpoint()  # (once per group, ie. when none of its steps are still running)
+
+            if failed := [job.describe() for job, status in results if status not in OK_STATUSES]:
+                msg_failure(f"Stopping, [italic]{', '.join(failed)}[/] failed")
+                break
+
+            if ran := [job for job, status in results[first:] if status == "success" and job.key in repeated]:
+                current = state()
+                done.update((job.key, current) for job in ran)
+
+    if cells := [(job.describe(), job.cell, status) for job, status in results if job.cell]:
+        matrix.print_grid(cells)
+    return all(status in OK_STATUSES for _, status in results)
+
+
+def _repeated(groups: list[list[Job]]) -> set[tuple[str, str]]:
+    """Return the keys of the jobs that appear more than once in the plan (ie. that might not need re-running)."""
+    seen, repeated = set(), set()
+    for job in (job for group in groups for job in group):
+        (repeated if job.key in seen else seen).add(job.key)
+    return repeated
+
+
+def _is_duplicate(job: Job, done: dict[tuple[str, str], str | None], current: str | None) -> bool:
+    """Has an identical job already been run with the project in its current state (if we know it)?"""
+    return not job.step.always_run and current is not None and done.get(job.key) == current
+
+
+def _run_concurrently(
+    configuration: TConfiguration,
+    group: list[Job],
+    jobserver: Jobserver,
+    history: History | None,
+    journal: Journal | None = None,
+) -> list[tuple[Job, str]]:
+    """Run the (independent) jobs in the group concurrently, printing the output of each as a block when done.
+
+    Each job is started (in order) once the jobserver has the tokens and memory it needs. While running,
+    the jobs are shown on a live dashboard (if we're on a terminal) with their full output logged.
+    """
+
+    def __execute(job: Job, ticket: int) -> tuple[str, str]:
+        reservation = jobserver.reserve(ticket, job.step.cpus, job.step.memory)
+        try:
+            with dashboard.step(job) as output, capture(output):
+                status = execute_status(configuration, configuration.get_run_name(), job, history, journal)
+        finally:
+            jobserver.release(reservation)
+        return status, output.getvalue()
+
+    results = []
+    with (
+        Dashboard(group) as dashboard,
+        ThreadPoolExecutor(max_workers=min(jobserver.jobs, len(group))) as executor,
+    ):
+        futures = {executor.submit(__execute, job, jobserver.ticket()): (index, job) for index, job in enumerate(group)}
+        try:
+            for future in as_completed(futures):
+                status, output = future.result()
+                index, job = futures[future]
+                if job.cell:
+                    print(_header(job))
+                print_captured(output)
+                results.append((index, job, status))
+        except KeyboardInterrupt:
+            # Only *we* (the main thread) see Ctrl-C, kill the other steps' commands before we wait on them:
+            for future in futures:
+                future.cancel()
+            jobserver.cancel()
+            processes.kill_all()
+            raise
+    return [(job, status) for _, job, status in sorted(results, key=lambda result: result[0])]
+
+
+def _header(job: Job) -> str:
+    """Return a header for the output of a job run in a matrix cell."""
+    return f"[bold]── {job.describe()} \\[{matrix.describe(job.cell)}] ──[/]"
+
+
+def _children_cpu_time() -> float:
+    """Return the total CPU time (user+system) of all our (waited-for) child processes."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
@@ -0,0 +1,284 @@
+"""Minimal (but concurrent and streaming) client for the "legacy" PyPI upload API, ie. what twine/poetry use.
+
+See https://warehouse.pypa.io/api-reference/legacy.html#upload-api for the details.
+"""
+import hashlib
+import re
+import tarfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import HeaderParser
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from manage.executors import HTTP_NOT_RECORDED, Executor, RequestError
+
+DEFAULT_REPOSITORY_URL = "https://upload.pypi.org/legacy/"
+
+CHUNK_SIZE = 64 * 1024
+
+# How many times we try to upload a single file (on connection errors or 5xx responses) and the initial back-off:
+ATTEMPTS = 3
+BACKOFF = 1.0
+
+# What indexes respond with (in lower-case) when they already have a file, e.g. PyPI's "400 File already exists."
+# and "400 This filename has already been used, use a different version." (PyPI puts these in the reason!):
+EXISTING = ("file already exists", "filename has already been used", "already exists")
+
+# Metadata headers that can appear more than once (and the form field each is uploaded as):
+MULTI_FIELDS = {
+    "Classifier": "classifiers",
+    "Dynamic": "dynamic",
+    "Obsoletes-Dist": "obsoletes_dist",
+    "Platform": "platform",
+    "Project-URL": "project_urls",
+    "Provides-Dist": "provides_dist",
+    "Provides-Extra": "provides_extra",
+    "Requires-Dist": "requires_dist",
+    "Requires-External": "requires_external",
+    "Supported-Platform": "supported_platform",
+}
+
+
+class UploadError(Exception):
+    """A distribution file couldn't be uploaded (or even prepared for upload)."""
+
+
+class Result(NamedTuple):
+    """Result of uploading a single distribution file."""
+
+    path: Path
+    status: str  # "uploaded", "skipped" (ie. the index already has it) or "failed"
+    size: int
+    seconds: float
+    message: str = ""
+
+    def throughput(self) -> float:
+        """Return bytes/second for the upload (0 if we didn't actually upload anything)."""
+        return self.size / self.seconds if self.status == "uploaded" and self.seconds else 0.0
+
+
+################################################################################
+# Distribution file metadata
+################################################################################
+def normalize_name(name: str) -> str:
+    """Return a project name as it's used in a distribution's file name, e.g. "My-Package" -> "my_package"."""
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+
+def normalize_version(version: str) -> str:
+    """Return the normalized form of a version (e.g. "1.0.0-RC.1" -> "1.0.0rc1"), as used by build backends."""
+    try:
+        from packaging.version import InvalidVersion, Version
+    except ImportError:  # (it's almost always there but isn't one of our dependencies)
+        return version.strip().lower()
+    try:
+        return str(Version(version))
+    except InvalidVersion:
+        return version.strip().lower()
+
+
+def parse_filename(path: Path) -> tuple[str, str] | None:
+    """Return the (normalized) name and version of a distribution file from its name (or None if not one)."""
+    if path.name.endswith(".whl"):
+        parts = path.name[: -len(".whl")].split("-")
+        return (normalize_name(parts[0]), parts[1]) if len(parts) in (5, 6) else None
+    name, _, version = path.name[: -len(".tar.gz")].rpartition("-")
+    return (normalize_name(name), version) if name else None
+
+
+def find_distributions(dist_dir: Path, name: str | None = None, version: str | None = None) -> list[Path]:
+    """Return the distribution files (ie. wheels and sdists) in the directory specified.
+
+    Only those of the project name and/or version specified (if any), e.g. not the files of previous releases.
+    """
+    paths = sorted(path for path in dist_dir.iterdir() if path.name.endswith((".whl", ".tar.gz")))
+    if name is None and version is None:
+        return paths
+    return_ = []
+    for path in paths:
+        if not (parsed := parse_filename(path)):
+            continue
+        if name is not None and parsed[0] != normalize_name(name):
+            continue
+        if version is not None and normalize_version(parsed[1]) != normalize_version(version):
+            continue
+        return_.append(path)
+    return return_
+
+
+def read_metadata(path: Path) -> str:
+    """Return the (raw) core metadata from a wheel (METADATA) or sdist (PKG-INFO), without extracting anything."""
+    try:
+        if path.name.endswith(".whl"):
+            with zipfile.ZipFile(path) as zip_:
+                names = [name for name in zip_.namelist() if name.count("/") == 1]
+                name = next(name for name in names if name.endswith(".dist-info/METADATA"))
+                return zip_.read(name).decode()
+        with tarfile.open(path) as tar:
+            for member in tar:  # (streams, the top-level PKG-INFO is almost always first)
+                if member.name.count("/") == 1 and member.name.endswith("/PKG-INFO"):
+                    return tar.extractfile(member).read().decode()
+    except (OSError, StopIteration, tarfile.TarError, zipfile.BadZipFile, UnicodeDecodeError) as err:
+        raise UploadError(f"Unable to read metadata from {path.name} ({err or type(err).__name__})")
+    raise UploadError(f"Unable to find metadata (PKG-INFO) in {path.name}")
+
+
+def get_fields(path: Path) -> list[tuple[str, str]]:
+    """Return the form fields to upload the distribution file with (ie. its metadata and digests)."""
+    message = HeaderParser().parsestr(read_metadata(path))
+
+    if path.name.endswith(".whl"):
+        filetype, pyversion = "bdist_wheel", path.name.split("-")[-3]
+    else:
+        filetype, pyversion = "sdist", "source"
+
+    fields = [
+        (":action", "file_upload"),
+        ("protocol_version", "1"),
+        ("filetype", filetype),
+        ("pyversion", pyversion),
+        ("metadata_version", message.get("Metadata-Version", "")),
+    ]
+    for header in dict.fromkeys(message.keys()):  # (de-duplicated but in order)
+        if header in ("Metadata-Version", "Description"):
+            continue
+        if header in MULTI_FIELDS:
+            fields.extend((MULTI_FIELDS[header], value) for value in message.get_all(header))
+        else:
+            fields.append((header.lower().replace("-", "_"), message[header]))
+    if description := message.get_payload() or message.get("Description"):
+        fields.append(("description", description))
+
+    fields.extend(get_digests(path))
+    return fields
+
+
+def get_digests(path: Path) -> list[tuple[str, str]]:
+    """Return the digests of the file (as form fields), reading it in chunks (ie. not into memory all at once)."""
+    digests = {
+        "md5_digest": hashlib.md5(),
+        "sha256_digest": hashlib.sha256(),
+        "blake2_256_digest": hashlib.blake2b(digest_size=32),
+    }
+    with path.open("rb") as file_:
+        while chunk := file_.read(CHUNK_SIZE):
+            for digest in digests.values():
+                digest.update(chunk)
+    return [(field, digest.hexdigest()) for field, digest in digests.items()]
+
+
+################################################################################
+# Streaming multipart/form-data body
+################################################################################
+class MultipartBody:
+    """A multipart/form-data request body that streams its file from disk (rather than holding it in memory).
+
+    Being "file-like" (read) with a known length means requests sends it with a Content-Length, in chunks.
+    """
+
+    def __init__(self, fields: list[tuple[str, str]], path: Path):
+        """Build all the parts except the file's contents (which we read as we go)."""
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in fields
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="content"; filename="{path.name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.size = path.stat().st_size
+        self._length = len(head) + self.size + len(tail)
+        self._chunks = self._iter_chunks(head, path, tail)
+        self._buffer = b""
+
+    def _iter_chunks(self, head: bytes, path: Path, tail: bytes) -> Iterator[bytes]:
+        yield head
+        with path.open("rb") as file_:
+            while chunk := file_.read(CHUNK_SIZE):
+                yield chunk
+        yield tail
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Return (up to) size bytes of the body."""
+        while size < 0 or len(self._buffer) < size:
+            if (chunk := next(self._chunks, None)) is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+################################################################################
+# Uploading
+################################################################################
+def is_existing(status_code: int, text: str) -> bool:
+    """Return True if the response means that the index already has the file (which we treat as a success)."""
+    return status_code == 409 or (status_code == 400 and any(existing in text.lower() for existing in EXISTING))
+
+
+def upload_file(
+    executor: Executor,
+    session,
+    repository_url: str,
+    path: Path,
+    auth: tuple[str, str] | None = None,
+) -> Result:
+    """Upload a single distribution file (retrying on connection errors or server errors)."""
+    started = time.perf_counter()
+    try:
+        fields = get_fields(path)
+    except UploadError as err:
+        return Result(path, "failed", path.stat().st_size, 0.0, str(err))
+
+    message, delay = "", BACKOFF
+    for attempt in range(1, ATTEMPTS + 1):
+        body = MultipartBody(fields, path)
+        started = time.perf_counter()
+        try:
+            headers = {"Content-Type": body.content_type}
+            response = executor.post(repository_url, session, data=body, auth=auth, headers=headers)
+        except RequestError as err:
+            message = str(err)
+        else:
+            seconds = time.perf_counter() - started
+            if 200 <= response.status_code < 300:
+                return Result(path, "uploaded", body.size, seconds)
+            if is_existing(response.status_code, f"{response.reason} {response.text}"):  # (PyPI uses the reason!)
+                return Result(path, "skipped", body.size, seconds, "already exists")
+            message = f"{response.status_code} {response.reason}: {response.text.strip()[:200]}"
+            if response.status_code < 500 or response.status_code == HTTP_NOT_RECORDED:
+                break  # No point trying again, e.g. bad credentials or invalid metadata.
+        if attempt < ATTEMPTS:
+            time.sleep(delay)
+            delay *= 2
+    return Result(path, "failed", path.stat().st_size, time.perf_counter() - started, message)
+
+
+def upload(
+    paths: list[Path],
+    repository_url: str = DEFAULT_REPOSITORY_URL,
+    auth: tuple[str, str] | None = None,
+    max_workers: int = 4,
+    executor: Executor | None = None,
+) -> list[Result]:
+    """Upload all the distribution files concurrently (over a shared connection pool), returning a result for each.
+
+    Requests are made through the executor provided (e.g. that of our configuration, to record or replay them).
+    """
+    if not paths:
+        return []
+    executor = executor or Executor()
+    max_workers = max(1, min(max_workers, len(paths)))
+    with executor.session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda path: upload_file(executor, session, repository_url, path, auth), paths))
@@ -1,14 +1,76 @@
-"""Utility methods, not meant for direct calling from manage.toml."""
+"""Utility methods, not meant for direct calling from manage.toml.
+
+Note: rich is imported lazily here (ie. on first use), it's one of our most
+expensive imports and commands like --version shouldn't have to pay for it.
+"""
 import re
 import sys
-from typing import Final
-
-from rich import print
-from rich.console import Console
+import threading
+from contextlib import contextmanager
+from io import StringIO
+from typing import Final, Iterator, TextIO
 
 
 TERMINAL_WIDTH: Final = 79
 
+# Directories we never look into when searching a project's files ourselves (e.g. clean, poetry_version_sync):
+DEFAULT_EXCLUDE: Final = ".git .venv"
+
+# Output from the current thread can be captured (see capture below), e.g. for steps running concurrently:
+_local = threading.local()
+
+
+def print(*args, **kwargs) -> None:  # noqa: A001
+    """Print using rich, importing it only when we actually have something to print."""
+    if (console := getattr(_local, "console", None)) is not None:
+        kwargs.pop("flush", None)
+        console.print(*args, **kwargs)
+        return
+    from rich import print as rich_print
+
+    rich_print(*args, **kwargs)
+
+
+def get_console():
+    """Return rich's global console instance (importing it only on first use) or our thread's capturing one."""
+    if (console := getattr(_local, "console", None)) is not None:
+        return console
+    from rich import get_console as rich_get_console
+
+    return rich_get_console()
+
+
+@contextmanager
+def capture(file: TextIO | None = None) -> Iterator[TextIO]:
+    """Capture everything printed by the current thread (styling included), e.g. to print it later as a block.
+
+    By default, to a new StringIO, otherwise, to the file-like object provided (e.g. see dashboard.StepOutput).
+    """
+    from rich.console import Console
+
+    console = get_console()
+    buffer = StringIO() if file is None else file
+    previous, _local.console = (
+        getattr(_local, "console", None),
+        Console(
+            file=buffer,
+            width=console.width,
+            force_terminal=console.is_terminal,
+            color_system=console.color_system,
+        ),
+    )
+    try:
+        yield buffer
+    finally:
+        _local.console = previous
+
+
+def print_captured(captured: str) -> None:
+    """Print output previously captured (see above)."""
+    from rich.text import Text
+
+    get_console().print(Text.from_ansi(captured), end="")
+
 
 def smart_join(lst: list[str], with_or: bool = False, delim: str = ",") -> str:
     """Essentially ', ' but with nicer formatting."""
@@ -22,6 +84,8 @@ def ask_confirm(text: str) -> bool:
     """Ask for confirmation, returns True if "yes" answer or False..Quits if requested!"""
     while True:
         prompt = message(f"{text} (y/N/q)", color="#fffc00")
+        from rich.console import Console
+
         answer = Console().input(prompt).lower()
         if answer in ("q"):
             message("Ok", end_success=True)
@@ -100,6 +164,25 @@ def replace_rich_markup(string: str) -> str:
     return return_
 
 
+def humanize_bytes(num_bytes: int | float) -> str:
+    """Return a human-readable representation of a number of bytes, e.g. 1536 -> '1.5 KB'."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(num_bytes) < 1024 or unit == "TB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def parse_bytes(value: int | str) -> int:
+    """Return the number of bytes in a human-entered size, e.g. 1536, "512M" or "2 GB" (units are powers of 1024)."""
+    if isinstance(value, int):
+        return value
+    value = value.strip().upper().removesuffix("B").removesuffix("I")
+    for exponent, unit in enumerate(("K", "M", "G", "T"), start=1):
+        if value.endswith(unit):
+            return int(float(value[:-1]) * 1024**exponent)
+    return int(value)
+
+
 def shorten_path(path, max_length):
     """Shorten a file path to the max length by cutting parent directories off."""
     if len(str(path)) <= max_length:
@@ -118,3 +201,21 @@ def shorten_path(path, max_length):
     truncated_parts.insert(0, ".../")
 
     return path.__class__(*truncated_parts)
+
+
+def compile_glob(pattern: str) -> re.Pattern:
+    """Convert a Path.glob-style pattern (relative to the project root) into a regex, e.g. **/__pycache__."""
+    regex = ""
+    for part in re.split(r"(\*\*/|\*\*|\*|\?)", pattern.strip("/")):
+        match part:
+            case "**/":
+                regex += "(?:.*/)?"
+            case "**":
+                regex += ".*"
+            case "*":
+                regex += "[^/]*"
+            case "?":
+                regex += "[^/]"
+            case _:
+                regex += re.escape(part)
+    return re.compile(regex)
@@ -95,30 +95,17 @@ def _validate_environment(configuration: Configuration) -> TWarnsFails:
 # CLI step arguments
 ################################################################################
 def _validate_step_args(configuration: Configuration, method_classes: dict[str, TClass]) -> TWarnsFails:
-    """Validate all cli dynamic/step arguments against our Method Classes."""
-
-    def __get_all_args() -> list[tuple[str, str]]:
-        return_ = []
-        for method, class_ in method_classes.items():
-            if not hasattr(class_, "args"):
-                continue
-            for arg in class_.args:
-                return_.append((method.casefold(), arg.name.casefold()))
-        return return_
-
-    args_possible = __get_all_args()
-
-    # Confirm dynamic/method arguments:
+    """Validate all cli dynamic/step arguments against our Method Classes (only those referenced)."""
     fails = []
     for (method, arg), _ in configuration.method_args:  # e.g. ("git_commit", "message"), "aMessage"
         # 1. Confirm all method args are actually bound to know methods:
-        if method.casefold() not in method_classes:
+        if (class_ := method_classes.get(method.casefold())) is None:
             fail = f"'[italic]{method}[/]' is not a recognised method, please check."
             fails.append(fail)
             continue
 
         # 2. Confirm that the argument provided is valid for the respective method/class:
-        if (method.casefold(), arg.casefold()) not in args_possible:
+        if not any(arg.casefold() == argument.name.casefold() for argument in getattr(class_, "args", [])):
             fail = f"'[italic]{arg}[/]' is not a valid argument for '[italic]{method}[/]', please check."
             fails.append(fail)
 
@@ -0,0 +1,47 @@
+"""Git support methods, shared by our methods and the run journal (ie. not meant for direct calling from manage.toml)."""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from manage.executors import Executor
+
+
+def git(
+    root: Path,
+    *args: str,
+    env: dict[str, str] | None = None,
+    executor: Executor | None = None,
+) -> list[str] | None:
+    """Run a git command, returning its output lines or None if it failed (e.g. not a git repository).
+
+    The command is run through the executor provided (e.g. that of our configuration, to record or replay it).
+    """
+    try:
+        result = (executor or Executor()).run(["git", *args], cwd=root, env=env)
+    except OSError:  # (ie. no git!)
+        return None
+    if result.returncode != 0:
+        return None
+    return [line for line in result.stdout.decode(errors="replace").splitlines() if line]
+
+
+def get_tree(root: Path, executor: Executor | None = None) -> str | None:
+    """Return the git tree id of the working tree (ie. tracked files, *including* changes not yet staged).
+
+    We do this using a copy of the index (so as not to disturb the real one), having it pick up any
+    changes and then writing it as a tree (as the index's stat info is copied too, this is quick).
+    """
+    if not (path_index := git(root, "rev-parse", "--git-path", "index", executor=executor)):
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        path_temp = Path(directory) / "index"
+        try:
+            shutil.copyfile(root / path_index[0], path_temp)
+        except OSError:
+            return None  # No index yet (ie. nothing's ever been added)
+        env = {**os.environ, "GIT_INDEX_FILE": str(path_temp)}
+        if git(root, "add", "--update", env=env, executor=executor) is None:
+            return None
+        tree = git(root, "write-tree", env=env, executor=executor)
+    return tree[0] if tree else None
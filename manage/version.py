@@ -0,0 +1,187 @@
+"""Native (ie. no Poetry required) PEP 440 version "bumping" following Poetry's bump rule semantics."""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+BUMP_RULES = ("patch", "minor", "major", "prepatch", "preminor", "premajor", "prerelease")
+
+# Canonical PEP 440 pattern (from the PyPA 'packaging' library), sans surrounding whitespace:
+RE_VERSION = re.compile(
+    r"""
+    v?
+    (?:
+        (?:(?P<epoch>[0-9]+)!)?
+        (?P<release>[0-9]+(?:\.[0-9]+)*)
+        (?P<pre>
+            [-_\.]?
+            (?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)
+            [-_\.]?
+            (?P<pre_n>[0-9]+)?
+        )?
+        (?P<post>
+            (?:-(?P<post_n1>[0-9]+))
+            |
+            (?:
+                [-_\.]?
+                (?P<post_l>post|rev|r)
+                [-_\.]?
+                (?P<post_n2>[0-9]+)?
+            )
+        )?
+        (?P<dev>
+            [-_\.]?
+            (?P<dev_l>dev)
+            [-_\.]?
+            (?P<dev_n>[0-9]+)?
+        )?
+    )
+    (?:\+(?P<local>[a-z0-9]+(?:[-_\.][a-z0-9]+)*))?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+# Normalisation of pre-release labels (PEP 440)
+PRE_LABELS = {"alpha": "a", "a": "a", "beta": "b", "b": "b", "c": "rc", "pre": "rc", "preview": "rc", "rc": "rc"}
+
+
+@dataclass(frozen=True)
+class Version:
+    """A parsed PEP 440 version, only as much as we need to bump it."""
+
+    # fmt: off
+    release : tuple[int, ...]               # eg. (1, 2, 3)
+    epoch   : int                    = 0
+    pre     : tuple[str, int] | None = None  # eg. ("a", 0)
+    post    : int | None             = None
+    dev     : int | None             = None
+    local   : str | None             = None
+    # fmt: on
+
+    @classmethod
+    def parse(cls, version: str) -> Self:
+        """Parse the version string provided, raising ValueError if it's not PEP 440 compliant."""
+        if not (match := RE_VERSION.fullmatch(version.strip())):
+            raise ValueError(f"'{version}' is not a valid PEP 440 version")
+        pre = None
+        if match["pre_l"]:
+            pre = (PRE_LABELS[match["pre_l"].lower()], int(match["pre_n"] or 0))
+        post = None
+        if match["post_n1"] or match["post_l"]:
+            post = int(match["post_n1"] or match["post_n2"] or 0)
+        return cls(
+            release=tuple(int(part) for part in match["release"].split(".")),
+            epoch=int(match["epoch"] or 0),
+            pre=pre,
+            post=post,
+            dev=int(match["dev_n"] or 0) if match["dev_l"] else None,
+            local=match["local"],
+        )
+
+    def __str__(self) -> str:
+        """Return the normalised string form of this version."""
+        str_ = f"{self.epoch}!" if self.epoch else ""
+        str_ += ".".join(str(part) for part in self.release)
+        if self.pre:
+            str_ += f"{self.pre[0]}{self.pre[1]}"
+        if self.post is not None:
+            str_ += f".post{self.post}"
+        if self.dev is not None:
+            str_ += f".dev{self.dev}"
+        if self.local:
+            str_ += f"+{self.local}"
+        return str_
+
+    def is_stable(self) -> bool:
+        """Return True if this is neither a pre-release nor a dev-release."""
+        return self.pre is None and self.dev is None
+
+    def _part(self, index: int) -> int:
+        return self.release[index] if len(self.release) > index else 0
+
+    def _next(self, index: int) -> Self:
+        """Return the next release at the 'index' level (0=major, 1=minor, 2=patch), a la Poetry.
+
+        Like Poetry, an unstable version (eg. 1.3.0a1) whose release is already
+        "on" the next level boundary simply loses its pre-release (ie. becomes 1.3.0).
+        """
+        boundary = tuple(self._part(i) for i in range(index + 1))
+        padded = boundary + (0,) * (len(self.release) - len(boundary))
+        if self.is_stable() or padded < self.release:
+            boundary = boundary[:index] + (boundary[index] + 1,)
+
+        # Retain the precision of the original release (but at least up to the level being bumped):
+        precision = max(len(self.release), index + 1)
+        return Version(release=boundary + (0,) * (precision - len(boundary)), epoch=self.epoch)
+
+    def next_major(self) -> Self:
+        """Return the next major version."""
+        return self._next(0)
+
+    def next_minor(self) -> Self:
+        """Return the next minor version."""
+        return self._next(1)
+
+    def next_patch(self) -> Self:
+        """Return the next patch version."""
+        return self._next(2)
+
+    def first_prerelease(self) -> Self:
+        """Return the first (alpha) pre-release of this version's release."""
+        return Version(release=self.release, epoch=self.epoch, pre=("a", 0))
+
+    def next_prerelease(self) -> Self:
+        """Return the next pre-release, eg. 1.2.3a0 -> 1.2.3a1 (or the first if this is only a dev-release)."""
+        if self.pre is None:
+            return self.first_prerelease()
+        return Version(release=self.release, epoch=self.epoch, pre=(self.pre[0], self.pre[1] + 1))
+
+    def bump(self, rule: str) -> Self:
+        """Return a new version based on the bump rule specified (see BUMP_RULES)."""
+        match rule:
+            case "major" | "premajor":
+                new = self.next_major()
+            case "minor" | "preminor":
+                new = self.next_minor()
+            case "patch" | "prepatch":
+                new = self.next_patch()
+            case "prerelease":
+                return self.next_prerelease() if not self.is_stable() else self.next_patch().first_prerelease()
+            case _:
+                raise ValueError(f"'{rule}' is not a valid bump rule")
+        return new.first_prerelease() if rule.startswith("pre") else new
+
+
+def bump_version(version: str, rule: str) -> str:
+    """Return the version string that results from applying the bump rule specified to the version provided."""
+    return str(Version.parse(version).bump(rule))
+
+
+################################################################################
+# Format-preserving write back to pyproject.toml
+################################################################################
+RE_TABLE = re.compile(r"^\s*\[\[?\s*([^\[\]]+?)\s*\]\]?\s*(#.*)?$")  # Both [table] and [[array.of.tables]]
+RE_VERSION_LINE = re.compile(r"""^(?P<prefix>\s*version\s*=\s*)(?P<quote>["'])(?P<version>[^"']*)(?P=quote)""")
+
+
+def replace_pyproject_version(contents: str, new_version: str, table: str = "tool.poetry") -> str:
+    """Return the contents of a pyproject.toml with ONLY the version value in [table] replaced.
+
+    Everything else (comments, whitespace, quoting style, key ordering etc.) is left as-is.
+    """
+    lines = contents.split("\n")
+    in_table = False
+    for i_line, line in enumerate(lines):
+        if match := RE_TABLE.match(line):
+            in_table = match.group(1).replace('"', "").replace(" ", "") == table
+            continue
+        if in_table and (match := RE_VERSION_LINE.match(line)):
+            start, end = match.span("version")
+            lines[i_line] = line[:start] + new_version + line[end:]
+            return "\n".join(lines)
+    raise ValueError(f"Unable to find a version in the [{table}] section")
+
+
+def write_pyproject_version(path_pyproject: Path, new_version: str) -> None:
+    """Update the [tool.poetry] version in the pyproject.toml specified (in-place and format-preserving)."""
+    path_pyproject.write_text(replace_pyproject_version(path_pyproject.read_text(), new_version))
@@ -1,9 +1,27 @@
 """Conftest."""
 import pytest
 
+from manage import dashboard, history, include, journal, matrix, plugins
+from manage.methods import checksums, pre_commit, update_changelog
 from manage.models import Recipe, Recipes, Step
 
 
+@pytest.fixture(autouse=True)
+def manage_path(tmp_path, monkeypatch):
+    """Keep everything we'd write to .manage (logs, history, caches etc.) out of the repository we're testing from."""
+    path = tmp_path / ".manage"
+    monkeypatch.setattr(dashboard, "LOGS_PATH", path / "logs")
+    monkeypatch.setattr(history, "HISTORY_PATH", path / "history.db")
+    monkeypatch.setattr(journal, "JOURNAL_PATH", path / "journal.json")
+    monkeypatch.setattr(matrix, "ENVS_PATH", path / "envs")
+    monkeypatch.setattr(include, "CACHE_PATH", path / "includes")
+    monkeypatch.setattr(plugins, "CACHE_PATH", path / "plugins.json")
+    monkeypatch.setattr(checksums, "CACHE_PATH", path / "checksums.json")
+    monkeypatch.setattr(pre_commit, "STATE_PATH", path / "pre_commit.json")
+    monkeypatch.setattr(update_changelog, "CACHE_PATH", path / "changelog.json")
+    return path
+
+
 @pytest.fixture
 def recipes():
     # NOTE: Must match contents of tests/test_models.toml!
@@ -1,4 +1,5 @@
 """Test build method."""
+import os
 import pytest
 import tomllib
 from pathlib import Path
@@ -51,3 +52,75 @@ def test_build(configuration, recipes, capsys):
 
     captured = capsys.readouterr()
     assert captured.out == ""
+
+
+fake_backend = """
+import os
+from pathlib import Path
+
+
+def build_sdist(sdist_directory, config_settings=None):
+    name = "fake-1.0.tar.gz"
+    (Path(sdist_directory) / name).write_text(os.environ.get("SOURCE_DATE_EPOCH", "") + "@" + os.getcwd())
+    return name
+
+
+def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+    name = "fake-1.0-py3-none-any.whl"
+    (Path(wheel_directory) / name).write_text(os.environ.get("SOURCE_DATE_EPOCH", "") + "@" + os.getcwd())
+    return name
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a minimal project whose (in-tree) build-backend writes SOURCE_DATE_EPOCH and its cwd into each artifact."""
+    backend = f"fake_backend_{tmp_path.name.replace('-', '_')}"  # Unique as we might import it in-process
+    (tmp_path / "pyproject.toml").write_text(
+        f'[build-system]\nrequires = []\nbuild-backend = "{backend}"\nbackend-path = ["."]\n',
+    )
+    (tmp_path / f"{backend}.py").write_text(fake_backend)
+    return tmp_path
+
+
+@pytest.mark.parametrize("isolated", [False, True])
+def test_build_pep517(configuration, project, isolated):
+    """Test building by calling the build-backend hooks directly (both in-process and in worker processes)."""
+    arguments = dict(backend="pep517", isolated=isolated, source_date_epoch="315532800")
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=arguments)
+    cwd = Path.cwd()
+
+    # Test
+    assert build(configuration, step).run(root=project)
+
+    # Confirm: Both artifacts were built from the project's root with the SOURCE_DATE_EPOCH requested...
+    for name in ("fake-1.0.tar.gz", "fake-1.0-py3-none-any.whl"):
+        assert (project / "dist" / name).read_text() == f"315532800@{project.resolve()}"
+
+    # ...without either leaking into our own process
+    assert Path.cwd() == cwd
+    assert "SOURCE_DATE_EPOCH" not in os.environ
+
+
+def test_build_pep517_worker_path(configuration, project, tmp_path_factory, monkeypatch):
+    """Test that a worker imports modules as the backend would (not ours!), e.g. an installed "version" module."""
+    site = tmp_path_factory.mktemp("site")
+    (site / "version.py").write_text('NAME = "fake-2.0.tar.gz"\n')
+    monkeypatch.setenv("PYTHONPATH", str(site))
+    backend = next(project.glob("fake_backend_*.py"))
+    backend.write_text(backend.read_text().replace('name = "fake-1.0.tar.gz"', "from version import NAME as name"))
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(backend="pep517", isolated=True))
+
+    # Test
+    assert build(configuration, step).run(root=project)
+    assert (project / "dist" / "fake-2.0.tar.gz").exists()
+
+
+def test_build_pep517_bad_backend(configuration, project, capsys):
+    """Test a build-backend that can't be imported."""
+    (project / "pyproject.toml").write_text('[build-system]\nbuild-backend = "no_such_backend"\n')
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(backend="pep517"))
+
+    # Test
+    assert not build(configuration, step).run(root=project)
+    assert "no_such_backend" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+"""Test checksums method."""
+import hashlib
+import os
+
+import pytest
+
+from manage.methods import checksums as checksums_module
+from manage.models import Configuration, Step
+from manage.methods.checksums import Method as checksums  # noqa: N813
+
+
+@pytest.fixture
+def dist(tmp_path):
+    path_dist = tmp_path / "dist"
+    path_dist.mkdir()
+    for index in range(8):
+        (path_dist / f"aPackage-0.{index}.0.tar.gz").write_bytes(os.urandom(100_000 + index))
+    (path_dist / "empty.whl").touch()
+    return path_dist
+
+
+def _run(tmp_path, dry_run: bool = False, **arguments) -> bool:
+    step = Step(method="checksums", arguments=arguments)
+    return checksums(Configuration(dry_run=dry_run), step).run(root=tmp_path, path_cache=tmp_path / "cache.json")
+
+
+def test_checksums(tmp_path, dist):
+    assert _run(tmp_path, algorithms="sha256 blake2b")
+
+    for manifest, algorithm in (("SHA256SUMS", "sha256"), ("B2SUMS", "blake2b")):
+        lines = (dist / manifest).read_text().splitlines()
+        assert len(lines) == 9
+        for line in lines:
+            digest, name = line.split("  ")
+            assert digest == hashlib.new(algorithm, (dist / name).read_bytes()).hexdigest()
+
+
+def test_checksums_cached(tmp_path, dist, monkeypatch):
+    assert _run(tmp_path)
+    manifest = (dist / "SHA256SUMS").read_text()
+
+    # Unchanged files aren't re-hashed...
+    hashed = []
+    hash_file = checksums_module.hash_file
+
+    def _hash_file(path, algorithms):
+        hashed.append(path.name)
+        return hash_file(path, algorithms)
+
+    monkeypatch.setattr(checksums_module, "hash_file", _hash_file)
+    assert _run(tmp_path)
+    assert hashed == []
+    assert (dist / "SHA256SUMS").read_text() == manifest
+
+    # ...but new and changed ones are:
+    (dist / "aPackage-1.0.0.tar.gz").write_bytes(b"new")
+    (dist / "aPackage-0.0.0.tar.gz").write_bytes(b"changed")
+    assert _run(tmp_path)
+    assert sorted(hashed) == ["aPackage-0.0.0.tar.gz", "aPackage-1.0.0.tar.gz"]
+    assert f"{hashlib.sha256(b'changed').hexdigest()}  aPackage-0.0.0.tar.gz" in (dist / "SHA256SUMS").read_text()
+
+
+def test_checksums_dry_run(tmp_path, dist, capsys):
+    assert _run(tmp_path, dry_run=True)
+    assert not (dist / "SHA256SUMS").exists()
+    assert "hash 9 of 9 file(s)" in capsys.readouterr().out
+
+
+def test_checksums_validate():
+    step = Step(method="checksums", arguments=dict(algorithms="sha256 crc32"))
+    assert "crc32" in checksums(Configuration(), step).validate()[0]
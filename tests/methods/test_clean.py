@@ -109,3 +109,65 @@ def test_clean_confirm_verbose(configuration, recipes, mock_input, capsys):
     captured = capsys.readouterr()
     assert "Ok to " in captured.out
     assert "Running " in captured.out
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a small project tree with a variety of build artifacts."""
+    for path in (
+        "build/lib/pkg/__init__.py",
+        "dist/pkg-1.0.tar.gz",
+        "pkg.egg-info/PKG-INFO",
+        "pkg/__init__.py",
+        "pkg/__pycache__/__init__.cpython-311.pyc",
+        "pkg/sub/__pycache__/mod.cpython-311.pyc",
+        ".venv/lib/__pycache__/site.cpython-311.pyc",
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("12345")
+    return tmp_path
+
+
+def test_clean_patterns(configuration, project):
+    """Test configurable include/exclude glob patterns."""
+    # Setup
+    arguments = dict(include="build *.egg-info **/__pycache__", exclude=".venv")
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=arguments)
+
+    # Test
+    assert clean(configuration, step).run(root=project)
+
+    # Confirm: Only the matching paths are gone
+    assert not (project / "build").exists()
+    assert not (project / "pkg.egg-info").exists()
+    assert not (project / "pkg" / "__pycache__").exists()
+    assert not (project / "pkg" / "sub" / "__pycache__").exists()
+    assert (project / "pkg" / "__init__.py").exists()
+    assert (project / "dist" / "pkg-1.0.tar.gz").exists()
+    assert (project / ".venv" / "lib" / "__pycache__").exists()
+
+
+def test_clean_background(configuration, project):
+    """Test rename-then-delete-in-background mode."""
+    # Setup
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(include=["dist"], background=True))
+
+    # Test
+    assert clean(configuration, step).run(root=project)
+
+    # Confirm: Target is gone immediately (even if the background deletion isn't finished yet)
+    assert not (project / "dist").exists()
+
+
+def test_clean_dryrun_report(recipes, project, capsys):
+    """Test that dry-run reports file counts and bytes."""
+    # Setup
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(include="build dist"))
+
+    # Test
+    assert clean(Configuration(dry_run=True), step).run(root=project)
+
+    # Confirm
+    captured = capsys.readouterr()
+    assert "2 files, 10 B" in captured.out
+    assert (project / "build").exists()
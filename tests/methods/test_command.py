@@ -0,0 +1,179 @@
+"""Test command method (and the step limits enforced on all commands run)."""
+import os
+import signal
+import sys
+import threading
+import time
+import unittest.mock as mock
+
+import pytest
+
+from manage.models import Configuration, Step
+from manage.methods.command import Method as command  # noqa: N813
+from manage.methods.command import parse
+from manage import processes
+from manage.processes import Stage
+
+
+def _python(code: str) -> str:
+    return f"{sys.executable} -c '{code}'"
+
+
+@pytest.fixture
+def configuration():
+    return Configuration(dry_run=False)
+
+
+def test_command(configuration, capsys):
+    step = Step(method="command", verbose=True, arguments=dict(command=_python("print(42)")))
+    assert command(configuration, step).run()
+    assert "≫ 42" in capsys.readouterr().out
+
+
+def test_command_confirm(configuration, tmp_path):
+    path = tmp_path / "touched"
+    step = Step(method="command", confirm=True, arguments=dict(command=f"touch {path}"))
+
+    with mock.patch("rich.console.Console.input", return_value="n"):
+        assert not command(configuration, step).run()
+    assert not path.exists(), "Sorry, command was run although it wasn't confirmed!"
+
+    with mock.patch("rich.console.Console.input", return_value="y"):
+        assert command(configuration, step).run()
+    assert path.exists(), "Sorry, command wasn't run although it was confirmed!"
+
+
+def test_command_timeout(configuration, tmp_path, capsys):
+    # Command spawns a (grandchild) process and writes its pid, the whole process group must be killed:
+    path = tmp_path / "pid"
+    code = (
+        "import subprocess, sys, time; "
+        'p = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]); '
+        f'open("{path}", "w").write(str(p.pid)); '
+        "time.sleep(60)"
+    )
+    step = Step(method="command", timeout=0.5, allow_error=True, arguments=dict(command=_python(code)))
+    instance = command(configuration, step)
+
+    started = time.monotonic()
+    assert not instance.run(), "Timeouts should never be allowed as errors."
+    assert time.monotonic() - started < 10
+    assert instance.limit == "timeout"
+    assert "exceeded timeout of 0.5s" in capsys.readouterr().out
+
+    grandchild = int(path.read_text())
+    for _ in range(50):  # (may take a moment to be reaped by init)
+        try:
+            os.kill(grandchild, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail(f"Sorry, grandchild process {grandchild} survived the timeout.")
+
+
+def test_command_cpu_seconds(configuration, capsys):
+    step = Step(method="command", cpu_seconds=1, arguments=dict(command=_python("while True: pass")))
+    instance = command(configuration, step)
+    assert not instance.run()
+    assert instance.limit == "cpu_seconds"
+    assert "exceeded cpu_seconds of 1s" in capsys.readouterr().out
+
+
+def test_command_max_memory(configuration, capsys):
+    step = Step(method="command", max_memory="256M", arguments=dict(command=_python("x = bytearray(1024**3)")))
+    instance = command(configuration, step)
+    assert not instance.run()
+    assert instance.limit == "max_memory"
+    assert "exceeded max_memory of 256.0 MB" in capsys.readouterr().out
+
+
+def test_command_within_limits(configuration):
+    step = Step(
+        method="command",
+        timeout=30,
+        cpu_seconds=30,
+        max_memory="2G",
+        arguments=dict(command=_python("x = bytearray(1024**2)")),
+    )
+    instance = command(configuration, step)
+    assert instance.run()
+    assert instance.limit is None
+
+
+def test_command_killed(configuration):
+    # A command we kill ourselves (e.g. on Ctrl-C) is SIGKILL'ed if it ignores SIGTERM, that's not a limit being hit:
+    code = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+    timer = threading.Timer(0.5, processes.kill_all)
+    timer.start()
+    result = processes.run([sys.executable, "-c", code], max_memory=2 * 1024**3, cpu_seconds=30)
+    assert result.returncode == -signal.SIGKILL
+    assert result.limit is None
+
+
+def test_command_not_found_within_limits(configuration):
+    step = Step(method="command", cpu_seconds=30, allow_error=True, arguments=dict(command="no-such-command --help"))
+    instance = command(configuration, step)
+    assert instance.run()
+    assert instance.exit_code == 127
+    assert instance.limit is None
+
+
+def test_command_pipeline(configuration, tmp_path):
+    # Setup (20MB through the pipe, none of which should pass through us)
+    path = tmp_path / "count"
+    writer = _python("import sys; sys.stdout.buffer.write(bytes(20 * 1024**2))")
+    counter = _python("import sys; print(len(sys.stdin.buffer.read()))")
+    step = Step(method="command", arguments=dict(command=f"{writer} | {counter} > {path} && {_python('1/0')} 2>&1"))
+    instance = command(configuration, step)
+
+    # Test
+    assert not instance.run()
+
+    # Confirm
+    assert path.read_text() == f"{20 * 1024**2}\n"
+    assert instance.exit_code == 1
+
+
+def test_command_pipeline_redirections(configuration, tmp_path):
+    # Setup
+    (tmp_path / "in.txt").write_text("b\na\nb\n")
+    sort = _python("import sys; sys.stdout.writelines(sorted(set(sys.stdin)))")
+    fail = _python('import sys; sys.stderr.write("oops"); sys.exit(3)')
+    step = Step(
+        method="command",
+        arguments=dict(command=f"{sort} < {tmp_path}/in.txt >> {tmp_path}/out.txt && {fail} 2> {tmp_path}/err.txt"),
+    )
+    instance = command(configuration, step)
+
+    # Test
+    assert not instance.run()
+
+    # Confirm
+    assert (tmp_path / "out.txt").read_text() == "a\nb\n"
+    assert (tmp_path / "err.txt").read_text() == "oops"
+    assert instance.exit_code == 3
+
+
+def test_command_pipeline_allow_error(configuration, tmp_path):
+    # Setup (ie. "false && touch x", allowing the error)
+    fail = _python("raise SystemExit(1)")
+    step = Step(method="command", allow_error=True, arguments=dict(command=f"{fail} && touch {tmp_path}/x"))
+
+    # Test (the step doesn't fail but the chain still stops, as per &&)
+    assert command(configuration, step).run()
+    assert not (tmp_path / "x").exists()
+
+
+@pytest.mark.parametrize("command_", ["a |", "| b", "a > ", "a || b", "a & b", "a 'b"])
+def test_command_pipeline_invalid(configuration, command_):
+    step = Step(method="command", arguments=dict(command=command_))
+    assert command(configuration, step).validate()
+
+
+def test_command_pipeline_parse():
+    pipelines = parse("sort -u '|' < in 2>&1 | wc -l > \"out file\" && echo 2 >> log")
+    assert pipelines == [
+        [Stage(["sort", "-u", "|"], stdin="in", stderr_to_stdout=True), Stage(["wc", "-l"], stdout="out file")],
+        [Stage(["echo", "2"], stdout="log", stdout_append=True)],
+    ]
@@ -0,0 +1,69 @@
+"""Test poetry_lock_check method."""
+import tomllib
+from pathlib import Path
+
+import pytest
+
+from manage import PYPROJECT_PATH
+from manage.models import Configuration, Step
+from manage.methods.poetry_lock_check import Method as poetry_lock_check  # noqa: N813
+from manage.methods.poetry_lock_check import get_content_hash, get_locked_hash
+
+pyproject_toml = """
+[tool.poetry]
+name = "myPackage"
+version = "1.0.0"
+
+[tool.poetry.dependencies]
+python = "^3.11"
+"""
+
+poetry_lock = """
+[[package]]
+name = "foo"
+version = "1.0"
+
+[metadata]
+lock-version = "2.0"
+python-versions = "^3.11"
+content-hash = "{content_hash}"
+"""
+
+
+@pytest.fixture
+def path_pyproject(tmp_path):
+    path_ = tmp_path / "pyproject.toml"
+    path_.write_text(pyproject_toml)
+    return path_
+
+
+def test_content_hash():
+    """Our own pyproject.toml should hash to the same value that Poetry put into our poetry.lock."""
+    assert get_content_hash(tomllib.loads(PYPROJECT_PATH.read_text())) == get_locked_hash(Path("poetry.lock"))
+
+
+def test_lock_check_consistent(path_pyproject, capsys):
+    """Test consistent pyproject/lock, nothing should happen (or be output)."""
+    content_hash = get_content_hash(tomllib.loads(pyproject_toml))
+    (path_pyproject.parent / "poetry.lock").write_text(poetry_lock.format(content_hash=content_hash))
+    step = Step(method="aMethod", confirm=False, verbose=False)
+
+    # Test
+    assert poetry_lock_check(Configuration(dry_run=True), step).run(path_pyproject=path_pyproject)
+
+    # Confirm
+    assert capsys.readouterr().out == ""
+
+
+def test_lock_check_stale(path_pyproject, capsys):
+    """Test inconsistent pyproject/lock, we should (dry) run poetry lock."""
+    (path_pyproject.parent / "poetry.lock").write_text(poetry_lock.format(content_hash="stale"))
+    step = Step(method="aMethod", confirm=False, verbose=False)
+
+    # Test
+    assert poetry_lock_check(Configuration(dry_run=True), step).run(path_pyproject=path_pyproject)
+
+    # Confirm
+    captured = capsys.readouterr()
+    assert "not consistent" in captured.out
+    assert "poetry lock --no-update" in captured.out
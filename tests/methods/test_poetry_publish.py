@@ -0,0 +1,168 @@
+"""Test poetry_publish method's native backend (against a local stand-in for a package index)."""
+import hashlib
+import io
+import tarfile
+import threading
+import zipfile
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from manage import upload
+from manage.models import Configuration, Step
+from manage.methods.poetry_publish import Method as poetry_publish  # noqa: N813
+
+METADATA = """Metadata-Version: 2.1
+Name: aPackage
+Version: 1.0.0
+Summary: A package
+Classifier: Programming Language :: Python :: 3
+Classifier: License :: OSI Approved :: MIT License
+Requires-Dist: requests
+
+A long description.
+"""
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    """Stand-in for PyPI's legacy upload API."""
+
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            message = BytesParser().parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+            fields, content, filename = {}, None, None
+            for part in message.get_payload():
+                name = part.get_param("name", header="content-disposition")
+                if name == "content":
+                    content, filename = part.get_payload(decode=True), part.get_filename()
+                else:
+                    fields.setdefault(name, []).append(part.get_payload())
+            with server.lock:
+                server.attempts += 1
+            if server.status:
+                self.send_response(server.status)
+            elif filename in server.files:
+                self.send_response(400, "File already exists.")
+            else:
+                assert hashlib.sha256(content).hexdigest() == fields["sha256_digest"][0]
+                server.files[filename] = (content, fields)
+                self.send_response(200)
+            self.end_headers()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def index():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IndexHandler)
+    server.lock, server.files, server.status = threading.Lock(), {}, None
+    server.active = server.max_active = server.attempts = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def dist(tmp_path):
+    path_dist = tmp_path / "dist"
+    path_dist.mkdir()
+    with zipfile.ZipFile(path_dist / "aPackage-1.0.0-py3-none-any.whl", "w") as zip_:
+        zip_.writestr("apackage/__init__.py", "")
+        zip_.writestr("aPackage-1.0.0.dist-info/METADATA", METADATA)
+    with tarfile.open(path_dist / "aPackage-1.0.0.tar.gz", "w:gz") as tar:
+        for name, contents in (("aPackage-1.0.0/PKG-INFO", METADATA), ("aPackage-1.0.0/setup.py", "x" * 200_000)):
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            tar.addfile(info, io.BytesIO(contents.encode()))
+    return path_dist
+
+
+def _url(index) -> str:
+    return f"http://127.0.0.1:{index.server_address[1]}/legacy/"
+
+
+def test_upload(index, dist):
+    paths = upload.find_distributions(dist)
+    results = upload.upload(paths, _url(index), ("__token__", "aToken"))
+
+    assert [result.status for result in results] == ["uploaded", "uploaded"]
+    assert all(result.throughput() > 0 for result in results)
+    assert sorted(index.files) == sorted(path.name for path in paths)
+    for path in paths:
+        content, fields = index.files[path.name]
+        assert content == path.read_bytes()
+        assert fields["name"] == ["aPackage"] and fields["version"] == ["1.0.0"]
+        assert len(fields["classifiers"]) == 2
+        assert fields["description"] == ["A long description.\n"]
+    assert index.files["aPackage-1.0.0.tar.gz"][1]["filetype"] == ["sdist"]
+    assert index.files["aPackage-1.0.0-py3-none-any.whl"][1]["pyversion"] == ["py3"]
+
+    # Uploading again (e.g. after a partial failure), anything already there is skipped:
+    results = upload.upload(paths, _url(index))
+    assert [result.status for result in results] == ["skipped", "skipped"]
+
+
+def test_upload_retries(index, dist, monkeypatch):
+    monkeypatch.setattr(upload, "BACKOFF", 0)
+    paths = upload.find_distributions(dist)[:1]
+
+    index.status = 503
+    assert upload.upload(paths, _url(index))[0].status == "failed"
+    assert index.attempts == upload.ATTEMPTS
+
+    index.status, index.attempts = 403, 0
+    result = upload.upload(paths, _url(index))[0]
+    assert result.status == "failed" and result.message.startswith("403")
+    assert index.attempts == 1, "Sorry, client errors shouldn't be retried."
+
+
+def test_multipart_body_streams(dist):
+    path = dist / "aPackage-1.0.0.tar.gz"
+    body = upload.MultipartBody([("name", "aPackage")], path)
+    chunks = list(iter(lambda: body.read(8192), b""))
+    assert max(len(chunk) for chunk in chunks) <= 8192
+    assert sum(len(chunk) for chunk in chunks) == len(body)
+    assert path.read_bytes() in b"".join(chunks)
+
+
+def test_is_existing():
+    assert upload.is_existing(409, "Conflict")
+    assert upload.is_existing(400, "File already exists. See https://pypi.org/help/#file-name-reuse for more info.")
+    assert upload.is_existing(400, "This filename has already been used, use a different version. See ...")
+    assert not upload.is_existing(400, "Invalid value for classifiers.")
+    assert not upload.is_existing(403, "Invalid or non-existent authentication information.")
+
+
+def test_poetry_publish_native(index, dist, monkeypatch, capsys):
+    # Setup (a previous release's files are still in dist/, as per usual)
+    (dist.parent / "pyproject.toml").write_text('[tool.poetry]\nname = "aPackage"\nversion = "1.0.0"\n')
+    (dist / "aPackage-0.9.0-py3-none-any.whl").write_bytes((dist / "aPackage-1.0.0-py3-none-any.whl").read_bytes())
+    monkeypatch.setenv("POETRY_PYPI_TOKEN_PYPI", "aToken")
+    arguments = dict(backend="native", repository_url=_url(index), uploads=2)
+    step = Step(method="poetry_publish", verbose=True, arguments=arguments)
+    method = poetry_publish(Configuration(dry_run=False), step)
+
+    # Test (only our current version's files are uploaded)
+    assert not method.validate()
+    assert method.run(root=dist.parent, path_pyproject=dist.parent / "pyproject.toml")
+    assert sorted(index.files) == ["aPackage-1.0.0-py3-none-any.whl", "aPackage-1.0.0.tar.gz"]
+    out = capsys.readouterr().out
+    assert "aPackage-1.0.0.tar.gz" in out and "/s)" in out
+
+
+def test_poetry_publish_native_validate(monkeypatch):
+    for env_var in ("POETRY_PYPI_TOKEN_PYPI", "POETRY_HTTP_BASIC_PYPI_USERNAME", "POETRY_HTTP_BASIC_PYPI_PASSWORD"):
+        monkeypatch.delenv(env_var, raising=False)
+    method = poetry_publish(Configuration(), Step(method="poetry_publish", arguments=dict(backend="native")))
+    assert "POETRY_PYPI_TOKEN_PYPI" in method.validate()[0]
@@ -0,0 +1,48 @@
+"""Test poetry_version method (native backend)."""
+from pathlib import Path
+
+import pytest
+
+from manage.models import Configuration, Step
+from manage.methods.poetry_version import Method as poetry_version  # noqa: N813
+
+pyproject_toml = """
+[tool.poetry]
+name = "myPackage"
+version = "1.9.11"  # Keep me!
+description = "Sample pyproject.toml"
+"""
+
+
+@pytest.fixture
+def path_pyproject():
+    path_ = Path("/tmp/pyproject.toml")
+    path_.write_text(pyproject_toml)
+    yield path_
+    if path_.exists():
+        path_.unlink()
+
+
+def test_poetry_version(path_pyproject):
+    """Test a live (native) bump."""
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(bump_rule="minor"))
+
+    # Test
+    assert poetry_version(Configuration(dry_run=False), step).run(path_pyproject=path_pyproject)
+
+    # Confirm: version changed but nothing else did.
+    assert path_pyproject.read_text() == pyproject_toml.replace('"1.9.11"', '"1.10.0"')
+
+
+def test_poetry_version_dryrun(path_pyproject, capsys):
+    """Test that a dry-run reports the new version without touching pyproject.toml."""
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(bump_rule="patch"))
+
+    # Test
+    assert poetry_version(Configuration(dry_run=True), step).run(path_pyproject=path_pyproject)
+
+    # Confirm
+    assert path_pyproject.read_text() == pyproject_toml
+    captured = capsys.readouterr()
+    assert "DRY-RUN" in captured.out
+    assert "v1.9.12" in captured.out
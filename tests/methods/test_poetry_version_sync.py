@@ -1,4 +1,5 @@
 """Command test."""
+import subprocess
 from pathlib import Path
 
 import pytest
@@ -97,3 +98,49 @@ def test_file_not_found(configuration):
 
     # Test
     assert not poetry_version_sync(configuration, step).validate()
+
+
+def test_multiple_files(configuration, path_pyproject, tmp_path):
+    """Test globbed paths across several kinds of file (only those with a version being rewritten)."""
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("ignored/\n")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "conf.py").write_text('project = "x"\nrelease = "0.1.0"\n')
+    (tmp_path / "package.json").write_text('{\n  "name": "x",\n  "version": "0.1.0"\n}\n')
+    (tmp_path / "Dockerfile").write_text("FROM python:3.11\nLABEL version=0.1.0\n")
+    (tmp_path / "other.py").write_text("x = 1\n")
+    (tmp_path / "ignored").mkdir()
+    (tmp_path / "ignored" / "conf.py").write_text('release = "0.1.0"\n')
+    paths = "**/conf.py package.json Dockerfile *.py"
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(paths=paths))
+
+    # Test
+    assert poetry_version_sync(configuration, step).run(path_pyproject=path_pyproject, root=tmp_path)
+
+    # Confirm
+    assert (tmp_path / "docs" / "conf.py").read_text() == 'project = "x"\nrelease = "M.m.p"\n'
+    assert '"version": "M.m.p"' in (tmp_path / "package.json").read_text()
+    assert "LABEL version=M.m.p" in (tmp_path / "Dockerfile").read_text()
+    assert (tmp_path / "other.py").read_text() == "x = 1\n"
+    assert (tmp_path / "ignored" / "conf.py").read_text() == 'release = "0.1.0"\n'  # (per .gitignore)
+
+
+def test_custom_pattern(configuration, path_pyproject, tmp_path):
+    """Test a pattern of our own, e.g. for a Makefile."""
+    (tmp_path / "Makefile").write_text("VERSION := 0.1.0\n")
+    arguments = dict(paths="Makefile", patterns=r"^VERSION := (\S+)")
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=arguments)
+
+    # Test
+    assert poetry_version_sync(configuration, step).run(path_pyproject=path_pyproject, root=tmp_path)
+
+    # Confirm
+    assert (tmp_path / "Makefile").read_text() == "VERSION := M.m.p\n"
+
+
+def test_invalid_pattern(configuration):
+    """Test that patterns must have exactly one group."""
+    step = Step(method="aMethod", confirm=False, verbose=False, arguments=dict(paths="x", patterns="no group"))
+
+    # Test
+    assert poetry_version_sync(configuration, step).validate()
@@ -0,0 +1,116 @@
+"""Test pre_commit method (using a stand-in pre-commit executable that logs how it was called)."""
+import json
+import os
+import sys
+
+import pytest
+
+from manage.models import Configuration, Step
+from manage.methods.pre_commit import Method as pre_commit  # noqa: N813
+
+FAKE_PRE_COMMIT = f"""#!{sys.executable}
+import json, os, sys
+with open(os.environ["PRE_COMMIT_LOG"], "a") as log:
+    log.write(json.dumps(sys.argv[1:]) + "\\n")
+sys.exit(int(os.environ.get("PRE_COMMIT_EXIT", "0")))
+"""
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    path_bin = tmp_path / "bin"
+    path_bin.mkdir()
+    (path_bin / "pre-commit").write_text(FAKE_PRE_COMMIT)
+    (path_bin / "pre-commit").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{path_bin}{os.pathsep}{os.environ['PATH']}")
+    path_log = tmp_path / "pre-commit.log"
+    monkeypatch.setenv("PRE_COMMIT_LOG", str(path_log))
+    return path_log
+
+
+@pytest.fixture
+def repo(git_repo):
+    for name in ("a.py", "b.py", ".pre-commit-config.yaml"):
+        (git_repo.workspace / name).write_text(f"# {name}\n")
+    git_repo.api.index.add(["a.py", "b.py", ".pre-commit-config.yaml"])
+    git_repo.api.index.commit("Initial commit")
+    return git_repo
+
+
+def _calls(log) -> list[list[str]]:
+    return [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else []
+
+
+def _run(repo, tmp_path, dry_run: bool = False, **arguments) -> bool:
+    step = Step(method="pre_commit", arguments=arguments)
+    return pre_commit(Configuration(dry_run=dry_run), step).run(
+        root=repo.workspace,
+        path_state=tmp_path / "pre_commit.json",
+    )
+
+
+def test_pre_commit_all(repo, tmp_path, log):
+    assert _run(repo, tmp_path)
+    assert _calls(log) == [["run", "--all-files"]]
+
+    # Nothing's changed since our last (clean) run but all files were asked for, so we run again regardless:
+    assert _run(repo, tmp_path)
+    assert _calls(log) == [["run", "--all-files"]] * 2
+
+
+def test_pre_commit_last(repo, tmp_path, log):
+    # First time through, we have no clean run to compare against:
+    assert _run(repo, tmp_path, since="last")
+    assert _calls(log) == [["run", "--all-files"]]
+
+    (repo.workspace / "b.py").write_text("# changed\n")
+    assert _run(repo, tmp_path, since="last")
+    assert _calls(log)[-1] == ["run", "--files", "b.py"]
+
+    # Nothing's changed since our last (clean) run, so nothing to do:
+    assert _run(repo, tmp_path, since="last")
+    assert len(_calls(log)) == 2
+
+    # Changing the hook configuration itself means we need to check everything:
+    (repo.workspace / "a.py").write_text("# changed\n")
+    (repo.workspace / ".pre-commit-config.yaml").write_text("# changed\n")
+    assert _run(repo, tmp_path, since="last")
+    assert _calls(log)[-1] == ["run", "--all-files"]
+
+
+def test_pre_commit_staged_batches(repo, tmp_path, log):
+    names = [f"new_{index}.py" for index in range(5)]
+    for name in names:
+        (repo.workspace / name).write_text(f"# {name}\n")
+    repo.api.index.add(names)
+    (repo.workspace / "a.py").write_text("# changed but not staged\n")
+
+    assert _run(repo, tmp_path, since="staged", batches=2)
+    calls = _calls(log)
+    assert len(calls) == 2
+    assert sorted(file for call in calls for file in call[2:]) == names
+    assert not (tmp_path / "pre_commit.json").exists(), "Sorry, only staged files were checked, not the tree!"
+
+
+def test_pre_commit_ref(repo, tmp_path, log):
+    repo.api.create_head("base")
+    (repo.workspace / "c.py").write_text("# c.py\n")
+    repo.api.index.add(["c.py"])
+    repo.api.index.commit("Second commit")
+
+    assert _run(repo, tmp_path, since="base")
+    assert _calls(log) == [["run", "--files", "c.py"]]
+
+
+def test_pre_commit_failure(repo, tmp_path, log, monkeypatch):
+    monkeypatch.setenv("PRE_COMMIT_EXIT", "1")
+    assert not _run(repo, tmp_path)
+    assert not (tmp_path / "pre_commit.json").exists()
+
+
+def test_pre_commit_dry_run(repo, tmp_path, log, capsys):
+    (repo.workspace / "a.py").write_text("# changed\n")
+    repo.api.index.add(["a.py"])
+    assert _run(repo, tmp_path, dry_run=True, since="staged")
+    assert not _calls(log)
+    assert "pre-commit run --files <1 files in 1 batch(es)>" in capsys.readouterr().out
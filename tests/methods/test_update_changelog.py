@@ -0,0 +1,98 @@
+"""Test update_changelog method."""
+import subprocess
+
+import pytest
+
+from manage.models import Configuration, Step
+from manage.methods import update_changelog as update_changelog_module
+from manage.methods.update_changelog import Method as update_changelog  # noqa: N813
+
+README = """# My Project
+
+## Releases
+### Unreleased
+
+- FIX: Already noted by hand.
+
+### 1.0.0 - 2024-01-16
+- ADD: Something old.
+"""
+
+
+def _git(root, *args):
+    cmd = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args]
+    subprocess.run(cmd, cwd=root, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _commit(root, subject):
+    _git(root, "commit", "--allow-empty", "-m", subject)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "README.md").write_text(README)
+    _git(tmp_path, "add", "README.md")
+    _commit(tmp_path, "Something old")
+    _git(tmp_path, "tag", "v1.0.0")
+    return tmp_path
+
+
+def _run(repo, dry_run: bool = False, **arguments) -> bool:
+    step = Step(method="update_changelog", arguments=arguments)
+    method = update_changelog(Configuration(dry_run=dry_run), step)
+    return method.run(root=repo, path_cache=repo / "changelog.json")
+
+
+def _unreleased(repo) -> list[str]:
+    section = (repo / "README.md").read_text().split("### Unreleased\n")[1].split("###")[0]
+    return [line for line in section.splitlines() if line]
+
+
+def test_update_changelog(repo):
+    _commit(repo, "Add the gizmo")
+    _commit(repo, "Already noted by hand")  # (ie. not duplicated)
+    assert _run(repo)
+    assert _unreleased(repo) == ["- FIX: Already noted by hand.", "- Add the gizmo"]
+    assert "- ADD: Something old." in (repo / "README.md").read_text()  # (ie. nothing from before the tag)
+
+
+def test_update_changelog_incremental(repo, monkeypatch):
+    _commit(repo, "First")
+    assert _run(repo)
+
+    # Subsequent runs only walk the commits since the last one processed:
+    ranges = []
+    iter_subjects = update_changelog_module.iter_subjects
+
+    def _iter_subjects(root, range_, executor=None):
+        ranges.append(range_)
+        return iter_subjects(root, range_, executor)
+
+    monkeypatch.setattr(update_changelog_module, "iter_subjects", _iter_subjects)
+    _commit(repo, "Second")
+    assert _run(repo)
+    first = subprocess.run(["git", "rev-parse", "HEAD~1"], cwd=repo, capture_output=True, text=True).stdout.strip()
+    assert ranges[0].startswith(f"{first}..")
+    assert _unreleased(repo) == ["- FIX: Already noted by hand.", "- First", "- Second"]
+
+
+def test_update_changelog_conventional(repo):
+    for subject in ("fix(cli): Crash on start", "feat: The gizmo", "chore: Tidy up", "feat!: New config", "Other"):
+        _commit(repo, subject)
+    assert _run(repo, conventional=True)
+    assert _unreleased(repo) == [
+        "- FIX: Already noted by hand.",
+        "- CHG: New config",
+        "- ADD: The gizmo",
+        "- FIX: Crash on start",
+        "- INTERNAL: Tidy up",
+        "- Other",
+    ]
+
+
+def test_update_changelog_dry_run(repo, capsys):
+    _commit(repo, "Add the gizmo")
+    assert _run(repo, dry_run=True)
+    assert _unreleased(repo) == ["- FIX: Already noted by hand."]
+    assert "add 1 entry" in capsys.readouterr().out
@@ -0,0 +1,97 @@
+"""Test verify_dist method."""
+import base64
+import hashlib
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from manage.models import Configuration, Step
+from manage.methods.verify_dist import Method as verify_dist  # noqa: N813
+
+pyproject_toml = """
+[tool.poetry]
+name = "my-package"
+version = "1.2.0"
+packages = [{include = "my_package"}]
+"""
+
+METADATA = "Metadata-Version: 2.1\nName: my-package\nVersion: {version}\n"
+
+
+def _hash(data: bytes) -> str:
+    return "sha256=" + base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode()
+
+
+def _wheel(path, version="1.2.0", files=None, tamper=False, metadata_version=None):
+    files = files or {"my_package/__init__.py": b"__version__ = '1.2.0'\n", "my_package/data.bin": bytes(100_000)}
+    dist_info = f"my_package-{version}.dist-info"
+    files = {**files, f"{dist_info}/METADATA": METADATA.format(version=metadata_version or version).encode()}
+    files[f"{dist_info}/WHEEL"] = b""
+    record = "".join(f"{name},{_hash(data)},{len(data)}\n" for name, data in files.items()) + f"{dist_info}/RECORD,,\n"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zip_:
+        for name, data in files.items():
+            zip_.writestr(name, data + (b"!" if tamper and name.endswith("data.bin") else b""))
+        zip_.writestr(f"{dist_info}/RECORD", record)
+
+
+def _sdist(path, version="1.2.0", packages=("my_package",)):
+    top = f"my_package-{version}"
+    files = {f"{top}/PKG-INFO": METADATA.format(version=version).encode(), f"{top}/pyproject.toml": b""}
+    files |= {f"{top}/{package}/__init__.py": b"" for package in packages}
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(pyproject_toml)
+    (tmp_path / "dist").mkdir()
+    _wheel(tmp_path / "dist" / "my_package-1.2.0-py3-none-any.whl")
+    _sdist(tmp_path / "dist" / "my_package-1.2.0.tar.gz")
+    _wheel(tmp_path / "dist" / "my_package-1.1.0-py3-none-any.whl", version="1.1.0", tamper=True)  # (not verified)
+    return tmp_path
+
+
+def _run(root, dry_run: bool = False, **arguments) -> bool:
+    step = Step(method="verify_dist", arguments=arguments)
+    return verify_dist(Configuration(dry_run=dry_run), step).run(root=root, path_pyproject=root / "pyproject.toml")
+
+
+def test_verify_dist(root, capsys):
+    assert _run(root)
+    assert capsys.readouterr().out == ""
+
+
+def test_verify_dist_dry_run(root, capsys):
+    assert _run(root, dry_run=True)
+    assert "verify 2 distribution file(s) of v1.2.0 in dist" in capsys.readouterr().out
+
+
+def test_verify_dist_tampered(root, capsys):
+    _wheel(root / "dist" / "my_package-1.2.0-py3-none-any.whl", tamper=True)
+    assert not _run(root)
+    assert "my_package/data.bin doesn't match its hash" in capsys.readouterr().out
+
+
+def test_verify_dist_metadata(root, capsys):
+    _wheel(root / "dist" / "my_package-1.2.0-py3-none-any.whl", metadata_version="1.1.0")
+    assert not _run(root)
+    assert "my_package-1.2.0-py3-none-any.whl: metadata has version 1.1.0" in capsys.readouterr().out
+
+
+def test_verify_dist_packages(root, capsys):
+    _sdist(root / "dist" / "my_package-1.2.0.tar.gz", packages=())
+    assert not _run(root, packages="my_package")
+    assert "my_package-1.2.0.tar.gz: package 'my_package' is missing" in capsys.readouterr().out
+
+
+def test_verify_dist_missing(root, capsys):
+    for path in (root / "dist").glob("*1.2.0*"):
+        path.unlink()
+    assert not _run(root)
+    assert "No distribution files of v1.2.0" in capsys.readouterr().out
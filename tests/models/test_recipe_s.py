@@ -1,4 +1,5 @@
 """Test Recipe/Recipes models."""
+import time
 from pathlib import Path
 
 from manage.models import Recipe, Step, PyProject, Configuration, Recipes
@@ -33,3 +34,29 @@ def test_recipe():
     step = Step(method="build")
     recipe = Recipe(description="Another Description", steps=[step])
     assert len(recipe) == 1
+
+
+def test_recipes_many():
+    """Test that lookups remain (effectively) constant-time with thousands of (generated) recipes."""
+    n = 5_000
+    raw_recipes = {f"Service_{i:05d}": {"steps": [{"method": "build"}, {"recipe": "common"}]} for i in range(n)}
+    raw_recipes["common"] = {"steps": [{"method": "clean"}]}
+    pyproject = PyProject.factory_from_raw({"tool": {"manage": {"recipes": raw_recipes}}})
+    configuration = Configuration.factory([Namespace(), []], test=True)
+
+    started = time.perf_counter()
+    recipes = Recipes.factory(configuration, pyproject, {})
+    for i in range(n):
+        assert pyproject.is_valid_target(f"service_{i:05d}")
+        assert recipes.check_target(f"SERVICE_{i:05d}")
+    assert time.perf_counter() - started < 10  # (was quadratic, ie. minutes)
+
+    assert pyproject.get_target("service_00042") == "Service_00042"
+    assert recipes.get_target("service_00042") == "Service_00042"
+    assert not recipes.check_target("service_99999")
+    assert list(recipes.keys())[:2] == ["Service_00000", "Service_00001"]
+
+    recipes.set("aaa", Recipe(steps=[Step(method="build")]))
+    assert next(recipes.keys()) == "Service_00000"  # (uppercase sorts first)
+    assert recipes.check_target("AAA")
+    assert list(recipes.keys())[-1] == "common"
@@ -2,7 +2,7 @@
 import pytest
 from pydantic import ValidationError
 
-from manage.models import Step
+from manage.models import Argument, Arguments, Configuration, Step
 
 
 def test_step():
@@ -30,3 +30,37 @@ def test_step_args():
     assert step.get_arg("arg_1_str") == "arg_1_str_value"
     assert step.get_arg("arg_2_bool") is True
     assert step.get_arg("arg_3_int") == 42
+
+
+def test_step_str():
+    """Test the printable view of a step doesn't include (or alter) internals."""
+    step = Step(method="bar", arguments=dict(arg="value"))
+    step.class_ = object
+
+    printable = step._str_()
+    assert "class_" not in printable
+    assert "recipe" not in printable
+    assert "confirm" not in printable
+    assert "timeout" not in printable and "matrix" not in printable, "Sorry, options not set shouldn't be shown!"
+    assert printable["method"] == "bar"
+    assert printable["arguments"] == dict(arg="value")
+    assert step.class_ is object, "Sorry, printing a step shouldn't change it!"
+
+    step = Step(method="bar", timeout=60, parallel=True)
+    assert step._str_() == dict(method="bar", parallel=True, timeout=60)
+
+
+def test_step_runtime_arguments():
+    """Test that command-line method arguments are reflected only onto steps of the respective method."""
+
+    class Method:
+        args = Arguments(arguments=[Argument(name="message", type_=str, default=None)])
+
+    configuration = Configuration(method_args=[(("git_commit", "message"), "aMessage"), (("other", "message"), "no")])
+    step = Step.factory(configuration, {"git_commit": Method}, method="git_commit")
+    other = Step.factory(configuration, {"git_commit": Method}, method="git_add")
+
+    assert step.get_arg("message") == "aMessage"
+    assert other.get_arg("message") is None
+    assert configuration.find_method_arg_value("Git_Commit", "MESSAGE") == "aMessage"
+    assert configuration.find_method_arg_value("git_commit", "other") is None
@@ -1,6 +1,7 @@
 """Test cli methods."""
-from manage.cli import do_help
-from manage.models import Configuration, PyProject
+from manage.cli import do_help, do_shards, do_stats
+from manage.history import History, args_hash, read_weights
+from manage.models import Configuration, PyProject, Recipe, Recipes, Step
 
 
 def test_help(capsys):
@@ -12,6 +13,91 @@ def test_help(capsys):
     assert "RECIPES" in captured.out
 
 
+def test_stats(capsys, tmp_path):
+    # Setup
+    configuration = Configuration.factory([{}, []], test=True)
+    recipes = Recipes.model_validate({"build": Recipe(steps=[Step(method="clean"), Step(method="poetry_build")])})
+    history = History(tmp_path / "history.db")
+    for wall_time in (1.0, 2.0, 3.0):
+        for step, method in enumerate(("clean", "poetry_build")):
+            history.record(
+                started_at=wall_time,
+                target="build",
+                recipe="build",
+                step=step,
+                method=method,
+                args_hash=args_hash({}),
+                status="success",
+                wall_time=wall_time * (step + 1),
+                cpu_time=0.1,
+            )
+
+    # Test
+    do_stats(configuration, recipes, history)
+
+    # Confirm
+    captured = capsys.readouterr()
+    assert "poetry_build" in captured.out
+    assert "Critical path (6.00s): clean → poetry_build" in captured.out
+
+
+def test_shards(capsys, tmp_path):
+    # Setup
+    configuration = Configuration.factory([{}, []], test=True, targets=["lint"], shard=(2, 2))
+    steps = [Step(method="clean"), *[Step(method="command", parallel=True, arguments={"n": n}) for n in range(3)]]
+    recipes = Recipes.model_validate({"lint": Recipe(steps=steps)})
+
+    # Test
+    do_shards(configuration, recipes)
+
+    # Confirm
+    captured = capsys.readouterr()
+    assert captured.out.count("all") == 1
+    assert captured.out.count("1/2") == 2
+    assert captured.out.count("2/2") == 1
+
+
+def test_shards_weights(capsys, tmp_path):
+    # Setup (a history in which the first parallel step is slow, shared through a weights file)
+    path_weights = tmp_path / "weights.json"
+    steps = [Step(method="clean"), *[Step(method="command", parallel=True, arguments={"n": n}) for n in range(3)]]
+    recipes = Recipes.model_validate({"lint": Recipe(steps=steps)})
+    history = History(tmp_path / "history.db")
+    for step, (method, arguments, wall_time) in enumerate(
+        [("clean", {}, 1.0), ("command", {"n": 0}, 9.0), ("command", {"n": 1}, 1.0), ("command", {"n": 2}, 1.0)],
+    ):
+        history.record(
+            started_at=0.0,
+            target="lint",
+            recipe="lint",
+            step=step,
+            method=method,
+            args_hash=args_hash(arguments),
+            status="success",
+            wall_time=wall_time,
+            cpu_time=0.0,
+        )
+    do_stats(Configuration.factory([{}, []], test=True, shard_weights=str(path_weights)), recipes, history)
+    assert read_weights(path_weights)[("command", args_hash({"n": 0}))] == 9.0
+
+    # Test
+    configuration = Configuration.factory(
+        [{}, []],
+        test=True,
+        targets=["lint"],
+        shard=(2, 2),
+        shard_weights=str(path_weights),
+    )
+    capsys.readouterr()
+    do_shards(configuration, recipes)
+
+    # Confirm (ie. the slow step on its own)
+    captured = capsys.readouterr()
+    assert captured.out.count("1/2") == 1
+    assert captured.out.count("2/2") == 2
+    assert "9.00s" in captured.out
+
+
 #
 # Alternative approaches of capturing what's getting written out:
 # (all should work)
@@ -0,0 +1,78 @@
+"""Test the live display (and logs) of steps run concurrently."""
+from io import StringIO
+
+from rich.console import Console
+
+from manage import dashboard, scheduler
+from manage.models import Configuration, Recipe, Recipes, Step
+
+
+class PrintMethod:
+    """Stand-in for a method class, prints each of its 'lines'."""
+
+    def __init__(self, configuration, step):
+        """."""
+        self.step = step
+
+    def run(self) -> bool:
+        """."""
+        for line in self.step.arguments["lines"]:
+            dashboard.get_console().print(line)
+        return True
+
+
+def _step(*lines: str) -> Step:
+    step = Step(method="print", parallel=True, arguments=dict(lines=list(lines)))
+    step.class_ = PrintMethod
+    return step
+
+
+def test_step_output(tmp_path):
+    # Setup
+    output = dashboard.StepOutput(tmp_path / "logs" / "step.log")
+
+    # Test
+    output.write("\x1b[32mfirst\x1b[0m\nRunning [italic]second[/]......")
+
+    # Confirm
+    assert output.last_line == "first"
+    assert output.current() == "Running [italic]second[/]"
+    output.write("\n\n")
+    assert output.current() == "Running [italic]second[/]"
+    output.close()
+    assert (tmp_path / "logs" / "step.log").read_text() == "first\nRunning [italic]second[/]......\n\n"
+    assert output.getvalue().startswith("\x1b[32mfirst")
+
+
+def test_dashboard(tmp_path):
+    # Setup
+    recipes = Recipes.model_validate({"lint": Recipe(steps=[_step("a"), _step("b", "c")])})
+    first, second = scheduler.plan(recipes, "lint")[0]
+    console = Console(file=StringIO(), width=80, force_terminal=False)
+
+    # Test
+    with dashboard.Dashboard([first, second], tmp_path, console) as dashboard_:
+        with dashboard_.step(first) as output:
+            output.write("working on it\n")
+            table = Console(file=StringIO(), width=80)
+            table.print(dashboard_)
+            rendered = table.file.getvalue()
+
+    # Confirm
+    assert dashboard_._live is None  # (not a terminal)
+    assert "lint:1 print" in rendered and "working on it" in rendered and "running" in rendered
+    assert "lint:2 print" in rendered and "waiting" in rendered
+    assert (tmp_path / "lint.0.log").read_text() == "working on it\n"
+
+
+def test_run_logs(tmp_path, monkeypatch):
+    # Setup
+    monkeypatch.setattr(dashboard, "LOGS_PATH", tmp_path)
+    recipes = Recipes.model_validate({"lint": Recipe(steps=[_step("a"), _step("b", "c")])})
+
+    # Test
+    assert scheduler.run(Configuration(target="lint", jobs=2), scheduler.plan(recipes, "lint"))
+
+    # Confirm
+    assert (tmp_path / "lint.0.log").read_text() == "a\n"
+    assert (tmp_path / "lint.1.log").read_text() == "b\nc\n"
@@ -0,0 +1,119 @@
+"""Test our executors, ie. recording and replaying the commands (and requests) that methods make."""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from manage import executors
+from manage.executors import RC_NOT_RECORDED, RecordingExecutor, ReplayExecutor, RequestError, Response
+from manage.vcs import get_tree, git
+from manage.models import Configuration, Step
+from manage.methods.command import Method as command  # noqa: N813
+
+
+def _run(executor, cmd: str, verbose: bool = False) -> bool:
+    step = Step(method="command", verbose=verbose, arguments=dict(command=cmd))
+    return command(Configuration(dry_run=False, executor=executor), step).run()
+
+
+def test_record_replay(tmp_path, capsys):
+    cassette, path = tmp_path / "cassette.jsonl", tmp_path / "touched"
+
+    # Record (running everything for real)...
+    recorder = RecordingExecutor(cassette)
+    assert _run(recorder, f"touch {path}")
+    assert _run(recorder, "echo first")
+    assert not _run(recorder, "sh -c 'echo oops >&2; exit 3'")
+    assert path.exists()
+
+    entries = [json.loads(line) for line in cassette.read_text().splitlines()]
+    assert [entry["returncode"] for entry in entries] == [0, 0, 3]
+    assert entries[1]["stdout"] == "first\n" and entries[2]["stderr"] == "oops\n"
+    assert all(entry["seconds"] >= 0 for entry in entries)
+
+    # ...and replay (running nothing at all, same results):
+    path.unlink()
+    capsys.readouterr()
+    replayer = ReplayExecutor(cassette)
+    assert _run(replayer, f"touch {path}")
+    assert _run(replayer, "echo first", verbose=True)
+    assert not _run(replayer, "sh -c 'echo oops >&2; exit 3'")
+    assert not path.exists(), "Sorry, command was run although it should have been replayed!"
+    output = capsys.readouterr().out
+    assert "≫ first" in output and "oops" in output
+
+
+def test_replay_order_and_unrecorded(tmp_path):
+    cassette = tmp_path / "cassette.jsonl"
+    recorder = RecordingExecutor(cassette)
+    recorder.run(["sh", "-c", "exit 0"])
+    recorder.run(["sh", "-c", "exit 0"], env={"MANAGE_MATRIX": "python=3.12"})
+
+    replayer = ReplayExecutor(cassette)
+    assert replayer.run(["sh", "-c", "exit 0"], env={"MANAGE_MATRIX": "python=3.12"}).returncode == 0
+    assert replayer.run(["sh", "-c", "exit 0"]).returncode == 0
+    assert replayer.run(["sh", "-c", "exit 0"]).returncode == RC_NOT_RECORDED  # (each result is only served once)
+    assert replayer.run(["poetry", "build"]).returncode == RC_NOT_RECORDED
+
+    # Executables are matched by name (e.g. an interpreter in another checkout's virtual environment):
+    args = ["/old/checkout/.venv/bin/python", "-c", "pass"]
+    entry = dict(kind="command", args=args, returncode=0, stdout="", stderr="")
+    cassette.write_text(json.dumps(entry) + "\n")
+    assert ReplayExecutor(cassette).run(["/new/checkout/.venv/bin/python", "-c", "pass"]).returncode == 0
+
+
+def test_record_replay_post(tmp_path, monkeypatch):
+    cassette = tmp_path / "cassette.jsonl"
+    monkeypatch.setattr(executors.Executor, "post", lambda self, url, *args, **kwargs: Response(201, '{"id": 42}'))
+    recorder = RecordingExecutor(cassette)
+    assert recorder.post("https://api.github.com/releases", auth=("me", "secret")).status_code == 201
+    assert "secret" not in cassette.read_text()
+
+    monkeypatch.undo()
+    replayer = ReplayExecutor(cassette)
+    response = replayer.post("https://api.github.com/releases", auth=("me", "secret"))
+    assert response.status_code == 201 and response.json() == {"id": 42}
+    assert replayer.post("https://api.github.com/releases").status_code == 599
+
+
+def test_configuration_executor(tmp_path):
+    assert type(Configuration().executor) is executors.Executor
+    assert isinstance(Configuration(record=str(tmp_path / "cassette.jsonl")).executor, RecordingExecutor)
+    assert isinstance(Configuration(replay=str(tmp_path / "cassette.jsonl")).executor, ReplayExecutor)
+
+
+def test_record_replay_post_error(tmp_path, monkeypatch):
+    cassette = tmp_path / "cassette.jsonl"
+
+    def _post(self, url, session=None, **kwargs):
+        raise RequestError("ConnectionError: no route to host")
+
+    monkeypatch.setattr(executors.Executor, "post", _post)
+    with pytest.raises(RequestError):
+        RecordingExecutor(cassette).post("https://upload.pypi.org/legacy/")
+
+    monkeypatch.undo()
+    with pytest.raises(RequestError, match="no route to host"):
+        ReplayExecutor(cassette).post("https://upload.pypi.org/legacy/")
+
+
+def test_record_replay_git(tmp_path, monkeypatch):
+    # Setup (a git repository, *below* our cwd as commands are recorded by their working directory relative to it):
+    monkeypatch.chdir(tmp_path)
+    root, cassette = tmp_path / "project", tmp_path / "cassette.jsonl"
+    root.mkdir()
+    (root / "README.md").write_text("Hello")
+    for cmd in (["init", "-q"], ["add", "."], ["-c", "user.name=a", "-c", "user.email=a@b", "commit", "-qm", "init"]):
+        subprocess.run(["git", *cmd], cwd=root, check=True)
+
+    recorder = RecordingExecutor(cassette)
+    head, tree = git(root, "rev-parse", "HEAD", executor=recorder), get_tree(root, recorder)
+    assert head and tree
+    assert all(json.loads(line)["cwd"] == "project" for line in cassette.read_text().splitlines())
+
+    # Replayed (even once the repository's gone):
+    shutil.rmtree(root / ".git")
+    replayer = ReplayExecutor(cassette)
+    assert git(root, "rev-parse", "HEAD", executor=replayer) == head
+    assert git(root, "rev-parse", "--git-path", "index", executor=replayer) == [".git/index"]
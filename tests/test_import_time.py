@@ -0,0 +1,43 @@
+"""Import-time regression tests, ie. make sure our entry point stays cheap to load."""
+import subprocess
+import sys
+
+# Cumulative budget (in microseconds) for importing our cli module, NOT including interpreter startup.
+BUDGET_CLI_US = 50_000
+
+# Modules that should only ever be imported on first use (and thus, never for --version).
+HEAVY_MODULES = ("pydantic", "rich", "dotenv", "git", "requests", "manage.models", "manage.methods")
+
+
+def _import_times(*args: str) -> dict[str, int]:
+    """Run python with -X importtime and return a dict of module name -> cumulative import time (us)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.split("\n"):
+        # eg. "import time:      3682 |       8653 | manage.cli"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time_cli():
+    """Importing manage.cli should be within budget and not drag in any of our heavy dependencies."""
+    times = _import_times("-c", "import manage.cli")
+    assert "manage.cli" in times
+    assert times["manage.cli"] < BUDGET_CLI_US, f"manage.cli took {times['manage.cli']}us to import!"
+    for module in HEAVY_MODULES:
+        assert module not in times, f"{module} should not be imported by manage.cli"
+
+
+def test_import_time_version():
+    """Running --version should not import anything heavy."""
+    times = _import_times("-m", "manage", "--version")
+    for module in HEAVY_MODULES:
+        assert module not in times, f"{module} should not be imported for --version"
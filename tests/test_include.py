@@ -0,0 +1,88 @@
+"""Test shared recipe libraries (ie. [tool.manage] include = [...])."""
+from pathlib import Path
+
+import pytest
+
+from manage import include
+from manage.models import PyProject
+
+LIBRARY = """
+[recipes.clean]
+description = "Shared clean"
+[[recipes.clean.steps]]
+method = "clean"
+
+[recipes.build]
+description = "Shared build"
+[[recipes.build.steps]]
+recipe = "clean"
+[[recipes.build.steps]]
+method = "poetry_build"
+arguments = { backend = "pep517", isolated = true }
+"""
+
+PYPROJECT = """
+[tool.manage]
+include = ["{library}"]
+
+[tool.manage.recipes.build]
+description = "Local build"
+[[tool.manage.recipes.build.steps]]
+method = "poetry_build"
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch) -> Path:
+    path = tmp_path / "cache"
+    monkeypatch.setattr(include, "CACHE_PATH", path)
+    return path
+
+
+@pytest.fixture
+def library(tmp_path) -> Path:
+    path = tmp_path / "library" / "recipes.toml"
+    path.parent.mkdir()
+    path.write_text(LIBRARY)
+    return path
+
+
+def test_include(tmp_path, library):
+    path_pyproject = tmp_path / "pyproject.toml"
+    path_pyproject.write_text(PYPROJECT.format(library="library/recipes.toml"))  # (relative to pyproject.toml)
+
+    pyproject = PyProject.factory(path_pyproject)
+
+    assert pyproject.validate()
+    assert sorted(pyproject.recipes) == ["build", "clean"]
+    assert pyproject.recipes["clean"]["description"] == "Shared clean"
+    assert pyproject.recipes["build"]["description"] == "Local build", "Sorry, local recipes should win!"
+
+
+def test_include_cached(library, cache_path, monkeypatch):
+    recipes = include.load(library)
+    assert len(list(cache_path.glob("*.json"))) == 1
+
+    # Second time around, we shouldn't be parsing (or validating) anything:
+    monkeypatch.setattr(include.tomllib, "loads", lambda _: pytest.fail("Sorry, included file was re-parsed!"))
+    assert include.load(library) == recipes
+    assert recipes["build"]["steps"][1]["arguments"] == {"backend": "pep517", "isolated": True}
+
+    # However, any change to the file means it *is* re-parsed:
+    library.write_text(LIBRARY.replace("Shared clean", "Changed clean"))
+    with pytest.raises(pytest.fail.Exception):
+        include.load(library)
+
+
+def test_include_errors(tmp_path, library, cache_path, capsys):
+    library.write_text(LIBRARY + '\n[recipes.bad]\n[[recipes.bad.steps]]\nmethod = "clean"\nrecipe = "build"\n')
+    raw_pyproject = {"tool": {"manage": {"include": [str(library), "missing.toml"], "recipes": {}}}}
+
+    pyproject = PyProject.factory_from_raw(raw_pyproject, tmp_path)
+
+    assert not pyproject.validate()
+    out = " ".join(capsys.readouterr().out.split())  # (undo any wrapping)
+    assert "'bad', step 1" in out
+    assert "must not provide both method and recipe" in out
+    assert "Unable to read included recipes" in out
+    assert not list(cache_path.glob("*.json")), "Sorry, invalid includes shouldn't be cached."
@@ -0,0 +1,79 @@
+"""Test our (GNU make compatible) jobserver and resource-aware scheduling."""
+import os
+import sys
+import threading
+import time
+
+from manage import processes, scheduler
+from manage.jobserver import Jobserver
+from manage.models import Configuration, Recipe, Recipes, Step
+
+JOBS = 3
+
+
+class CountMethod:
+    """Stand-in for a method class, records the maximum number of cpus in use at once (as capped to JOBS)."""
+
+    running, most = 0, 0
+    lock = threading.Lock()
+
+    def __init__(self, configuration, step):
+        """."""
+        self.step = step
+
+    def run(self) -> bool:
+        """."""
+        with CountMethod.lock:
+            CountMethod.running += min(self.step.cpus or 1, JOBS)
+            CountMethod.most = max(CountMethod.most, CountMethod.running)
+        time.sleep(0.05)
+        with CountMethod.lock:
+            CountMethod.running -= min(self.step.cpus or 1, JOBS)
+        return True
+
+
+def _step(**kwargs) -> Step:
+    step = Step(method="count", parallel=True, **kwargs)
+    step.class_ = CountMethod
+    return step
+
+
+def test_cpus():
+    """Steps running concurrently never use more than --jobs cpus between them."""
+    recipes = Recipes.model_validate({"test": Recipe(steps=[_step(cpus=2), _step(cpus=2), _step(), _step(cpus=9)])})
+    CountMethod.running, CountMethod.most = 0, 0
+    assert scheduler.run(Configuration(target="test", jobs=JOBS), scheduler.plan(recipes, "test"))
+    assert CountMethod.most == JOBS  # (the step needing 9 is capped to JOBS, ie. run on its own)
+
+
+def test_memory():
+    """A step isn't started while the memory reserved by those running would exceed that available."""
+    jobserver = Jobserver(4, memory=100)
+    first = jobserver.reserve(jobserver.ticket(), memory=60)
+    started = threading.Event()
+
+    def __second():
+        jobserver.reserve(jobserver.ticket(), memory=60)
+        started.set()
+
+    thread = threading.Thread(target=__second)
+    thread.start()
+    assert not started.wait(0.1)
+    jobserver.release(first)
+    assert started.wait(1)
+    thread.join()
+
+
+def test_makeflags():
+    """Commands we run can take (and return) tokens from our pipe, as advertised in MAKEFLAGS."""
+    script = (
+        "import os, re\n"
+        "r, w = map(int, re.search(r'--jobserver-auth=(\\d+),(\\d+)', os.environ['MAKEFLAGS']).groups())\n"
+        "token = os.read(r, 1)\n"
+        "os.write(w, token)\n"
+        "print(os.environ['MAKEFLAGS'].split()[0], token.decode())\n"
+    )
+    with Jobserver(2):
+        result = processes.run([sys.executable, "-c", script], timeout=10)
+    assert result.stdout.decode().split() == ["-j2", "+"], result.stderr
+    assert "MAKEFLAGS" not in os.environ or "--jobserver-auth" not in os.environ["MAKEFLAGS"]
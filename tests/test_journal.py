@@ -0,0 +1,113 @@
+"""Test our run journal (ie. --resume)."""
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from manage.history import History
+from manage.journal import Journal, JournalError
+from manage.models import Configuration, Recipe, Recipes, Step
+
+
+class RecordMethod:
+    """Stand-in for a method class, records its name when run (and fails if it's in 'failing')."""
+
+    ran: list[str] = []
+    failing: set[str] = set()
+
+    def __init__(self, configuration, step):
+        """."""
+        self.step = step
+
+    def run(self) -> bool:
+        """."""
+        RecordMethod.ran.append(self.step.arguments["name"])
+        if path := self.step.arguments.get("write"):
+            Path(path).write_text(self.step.arguments["name"])
+        return self.step.arguments["name"] not in RecordMethod.failing
+
+
+def _step(name: str, **arguments) -> Step:
+    step = Step(method="record", arguments=dict(name=name, **arguments))
+    step.class_ = RecordMethod
+    return step
+
+
+@pytest.fixture
+def recipes():
+    RecordMethod.ran, RecordMethod.failing = [], {"tag"}
+    return Recipes.model_validate(
+        {
+            "build": Recipe(steps=[_step("version"), _step("build")]),
+            "release": Recipe(steps=[Step(recipe="build"), _step("tag"), _step("publish")]),
+        },
+    )
+
+
+def _run(tmp_path, recipes, resume: bool = False, dry_run: bool = False) -> bool:
+    configuration = Configuration(target="release", dry_run=dry_run, resume=resume)
+    journal = Journal(tmp_path / "journal.json", root=tmp_path)
+    return recipes.run(configuration, History(tmp_path / "history.db"), journal)
+
+
+def test_resume(tmp_path, recipes):
+    # A failure stops the run (and leaves the journal behind)...
+    assert not _run(tmp_path, recipes)
+    assert RecordMethod.ran == ["version", "build", "tag"]
+    assert (tmp_path / "journal.json").exists()
+
+    # ...a dry-run resume shows what would be done (without changing the journal)...
+    RecordMethod.ran, RecordMethod.failing = [], set()
+    assert _run(tmp_path, recipes, resume=True, dry_run=True)
+    assert RecordMethod.ran == ["tag", "publish"]
+    assert (tmp_path / "journal.json").exists()
+
+    # ...and resuming continues from the failed step, removing the journal when done:
+    RecordMethod.ran = []
+    assert _run(tmp_path, recipes, resume=True)
+    assert RecordMethod.ran == ["tag", "publish"]
+    assert not (tmp_path / "journal.json").exists()
+
+
+def test_resume_nothing(tmp_path, recipes):
+    with pytest.raises(JournalError, match="no run"):
+        _run(tmp_path, recipes, resume=True)
+
+
+def test_resume_changed_project(tmp_path, recipes):
+    assert not _run(tmp_path, recipes)
+    (tmp_path / "dist").mkdir()
+    (tmp_path / "dist" / "aPackage-1.0.0.tar.gz").write_text("rebuilt")
+    with pytest.raises(JournalError, match="project has changed"):
+        _run(tmp_path, recipes, resume=True)
+
+
+def test_resume_changed_recipe(tmp_path, recipes):
+    assert not _run(tmp_path, recipes)
+    recipes.get("build").steps.append(_step("docs"))
+    with pytest.raises(JournalError, match="have changed"):
+        _run(tmp_path, recipes, resume=True)
+
+
+def test_resume_fixed(tmp_path):
+    # Setup (a git repository with a step that changes a file, followed by one that fails)
+    (tmp_path / "pyproject.toml").write_text("1.0.0")
+    (tmp_path / "tests.py").write_text("broken")
+    for cmd in (["init", "-q"], ["add", "."], ["-c", "user.name=a", "-c", "user.email=a@b", "commit", "-qm", "init"]):
+        subprocess.run(["git", *cmd], cwd=tmp_path, check=True)
+    RecordMethod.ran, RecordMethod.failing = [], {"test"}
+    recipes = Recipes.model_validate(
+        {"release": Recipe(steps=[_step("1.1.0", write=str(tmp_path / "pyproject.toml")), _step("test")])},
+    )
+    assert not _run(tmp_path, recipes)
+
+    # Fixing a file the run didn't change is fine...
+    (tmp_path / "tests.py").write_text("fixed")
+    RecordMethod.ran, RecordMethod.failing = [], set()
+    assert _run(tmp_path, recipes, resume=True, dry_run=True)
+    assert RecordMethod.ran == ["test"]
+
+    # ...but not changing one it did (ie. undoing the effect of a step already completed):
+    (tmp_path / "pyproject.toml").write_text("1.0.0")
+    with pytest.raises(JournalError, match="project has changed"):
+        _run(tmp_path, recipes, resume=True)
@@ -0,0 +1,112 @@
+"""Test interpreter matrix expansion and execution."""
+import os
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from manage import matrix, scheduler
+from manage.methods.command import Method as command  # noqa: N813
+from manage.models import Configuration, Recipe, Recipes, Step
+
+PYTHON = f"{sys.version_info.major}.{sys.version_info.minor}"  # (ie. an interpreter we *know* exists)
+
+
+def _command(code: str, **kwargs) -> Step:
+    step = Step(method="command", arguments=dict(command=f"python -c '{code}'"), **kwargs)
+    step.class_ = command
+    return step
+
+
+def test_check():
+    Step(method="command", matrix={"python": ["3.11", "3.12.1"]})
+    with pytest.raises(ValidationError, match="not supported"):
+        Step(method="command", matrix={"ruby": ["3.3"]})
+    with pytest.raises(ValidationError, match="not valid"):
+        Recipe(steps=[], matrix={"python": ["latest"]})
+    with pytest.raises(ValidationError):
+        Recipe(steps=[], matrix={"python": [3.1]})  # (ie. unquoted 3.10 in toml!)
+
+
+def test_expand():
+    assert matrix.expand(None) == []
+    assert matrix.expand({"python": ["3.11", "3.12"]}) == [(("python", "3.11"),), (("python", "3.12"),)]
+    assert matrix.describe((("python", "3.12"),)) == "python=3.12"
+
+
+def test_find_interpreter(tmp_path, monkeypatch):
+    for version in ("3.12.1", "3.12.10", "3.12.9", "3.1.4"):
+        (tmp_path / "versions" / version / "bin").mkdir(parents=True)
+        (tmp_path / "versions" / version / "bin" / "python").touch()
+    monkeypatch.setenv("PYENV_ROOT", str(tmp_path))
+    monkeypatch.setenv("PATH", str(tmp_path / "shims"))
+
+    assert matrix.find_interpreter("3.12") == tmp_path / "versions" / "3.12.10" / "bin" / "python"
+    assert matrix.find_interpreter("3.1") == tmp_path / "versions" / "3.1.4" / "bin" / "python"
+    assert matrix.find_interpreter("3.9") is None
+
+
+def test_plan():
+    recipes = Recipes.model_validate(
+        {
+            "test": Recipe(
+                matrix={"python": ["3.11", "3.12"]},
+                steps=[_command("pass"), _command("pass", matrix={"python": ["3.13"]}), Step(recipe="lint")],
+            ),
+            "lint": Recipe(steps=[_command("pass")]),
+        },
+    )
+    groups = scheduler.plan(recipes, "test")
+    assert [[(job.index, job.cell) for job in group] for group in groups] == [
+        [(0, (("python", "3.11"),)), (0, (("python", "3.12"),))],
+        [(1, (("python", "3.13"),))],
+        [(0, (("python", "3.11"),)), (0, (("python", "3.12"),))],  # (nested recipes inherit our matrix)
+    ]
+    assert groups[0][0].key != groups[0][1].key, "Sorry, each cell should have its own history."
+
+
+def test_run(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(matrix, "ENVS_PATH", tmp_path / "envs")
+    code = 'import os, sys; assert sys.prefix == os.environ["VIRTUAL_ENV"]; print(os.environ["MANAGE_MATRIX"])'
+    recipes = Recipes.model_validate(
+        {"test": Recipe(matrix={"python": [PYTHON, "2.0"]}, steps=[_command(code, verbose=True)])},
+    )
+    configuration = Configuration(target="test", jobs=2, dry_run=False)
+
+    assert scheduler.run(configuration, scheduler.plan(recipes, "test"))
+
+    out = capsys.readouterr().out
+    assert (tmp_path / "envs" / f"py{PYTHON}" / "bin" / "python").exists()
+    assert f"── test:1 command [python={PYTHON}] ──" in out
+    assert f"≫ python={PYTHON}" in out
+    assert "Skipping python=2.0" in out
+    assert "Matrix" in out  # (our pass/fail grid)
+
+
+def test_run_foreign_executable(tmp_path, monkeypatch, capsys):
+    # A (python) tool that isn't installed in the cell's environment runs under someone else's interpreter:
+    monkeypatch.setattr(matrix, "ENVS_PATH", tmp_path / "envs")
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "outer-tool").write_text(f'#!{sys.executable}\nprint("outer")\n')
+    (tmp_path / "bin" / "outer-tool").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path / 'bin'}{os.pathsep}{os.environ['PATH']}")
+    step = Step(method="command", arguments=dict(command="outer-tool"), matrix={"python": [PYTHON]})
+    step.class_ = command
+    recipes = Recipes.model_validate({"test": Recipe(steps=[step])})
+
+    assert scheduler.run(Configuration(target="test", jobs=1, dry_run=False), scheduler.plan(recipes, "test"))
+    assert f"'outer-tool' isn't installed in the python={PYTHON} environment" in capsys.readouterr().out
+
+    env = matrix.environment((("python", PYTHON),), tmp_path / "envs")
+    assert matrix.foreign_interpreter("outer-tool", env) == sys.executable
+    assert matrix.foreign_interpreter("python", env) is None
+
+
+def test_run_failure(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(matrix, "ENVS_PATH", tmp_path / "envs")
+    step = _command("raise SystemExit(1)", matrix={"python": [PYTHON]})
+    recipes = Recipes.model_validate({"test": Recipe(steps=[step])})
+    configuration = Configuration(target="test", jobs=1, dry_run=False)
+
+    assert not scheduler.run(configuration, scheduler.plan(recipes, "test"))
+    assert "✖" in capsys.readouterr().out.split("Matrix")[-1]
@@ -0,0 +1,72 @@
+"""Test exporting targets as a ninja build file."""
+from manage import ninja
+from manage.methods.clean import Method as CleanMethod
+from manage.methods.command import Method as CommandMethod
+from manage.methods.sass import Method as SassMethod
+from manage.models import Configuration, Recipe, Recipes, Step
+
+
+def _step(method: str, class_, **kwargs) -> Step:
+    step = Step(method=method, **kwargs)
+    step.class_ = class_
+    return step
+
+
+def _recipes(*steps: Step) -> Recipes:
+    return Recipes.model_validate({"site": Recipe(steps=list(steps))})
+
+
+def test_export(tmp_path, monkeypatch):
+    # Setup
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.scss", "b.scss"):
+        (tmp_path / name).touch()
+    configuration = Configuration.factory([{}, []], test=True, targets=["site"])
+    recipes = _recipes(
+        _step(
+            "sass",
+            SassMethod,
+            arguments={"pathspec": "site.scss site.css"},
+            inputs=["*.scss"],
+            outputs=["site.css"],
+        ),
+        _step("command", CommandMethod, arguments={"command": "cp site.css 'my dir/site.css'"}, parallel=True),
+        _step("command", CommandMethod, arguments={"command": "echo $HOME"}, parallel=True, allow_error=True),
+        _step("command", CommandMethod, arguments={"command": "touch done"}, outputs=["done"]),
+    )
+
+    # Test
+    text, fails = ninja.export(configuration, recipes)
+
+    # Confirm
+    assert not fails
+    lines = text.splitlines()
+    assert "build site.css: step a.scss b.scss" in lines
+    assert "  cmd = sass site.scss site.css" in lines
+    assert "  cmd = cp site.css 'my dir/site.css'" in lines
+    assert "  cmd = echo '$$HOME' || true" in lines
+    assert "build .manage/ninja/site.2: step || .manage/ninja/site.group-1" in lines  # (ie. steps without outputs)
+    assert "build .manage/ninja/site.group-2: phony .manage/ninja/site.2 .manage/ninja/site.3" in lines
+    assert "build done: step || .manage/ninja/site.group-2" in lines
+    assert "build site: phony .manage/ninja/site.group-3" in lines
+    assert lines[-1] == "default site"
+
+
+def test_export_unsupported():
+    # Setup
+    configuration = Configuration.factory([{}, []], test=True, targets=["site"])
+    recipes = _recipes(
+        _step("clean", CleanMethod),
+        _step("command", CommandMethod, arguments={"command": "true"}, matrix={"python": ["3.11", "3.12"]}),
+    )
+
+    # Test
+    _, fails = ninja.export(configuration, recipes)
+
+    # Confirm
+    assert len(fails) == 3  # (clean and each of the command's cells)
+    assert "clean" in fails[0]
+
+
+def test_escape_path():
+    assert ninja.escape_path("my dir/a:b$c") == "my$ dir/a$:b$$c"
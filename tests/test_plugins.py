@@ -0,0 +1,65 @@
+"""Test third-party methods (ie. plugins registered under our entry-point group)."""
+import sys
+
+import pytest
+
+from manage import plugins
+from manage.plugins import MethodClasses, discover
+
+PLUGIN = '''
+"""A plugin method."""
+
+
+class Method:
+    """Deploy our docs."""
+
+    args = []
+'''
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A directory (on our path) with a distribution that registers one method."""
+    path_site = tmp_path / "site"
+    path_dist_info = path_site / "our_methods-1.0.dist-info"
+    path_dist_info.mkdir(parents=True)
+    (path_dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: our-methods\nVersion: 1.0\n")
+    (path_dist_info / "entry_points.txt").write_text("[manage.methods]\ndeploy_docs = our_methods_plugin:Method\n")
+    (path_site / "our_methods_plugin.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(str(path_site))
+    yield path_site
+    sys.modules.pop("our_methods_plugin", None)
+
+
+def test_discover(tmp_path, site, monkeypatch):
+    path_cache = tmp_path / "plugins.json"
+    assert discover(path_cache) == {"deploy_docs": "our_methods_plugin:Method"}
+    assert path_cache.exists()
+
+    # Nothing's been installed, hence our cache is used (ie. we don't look at the metadata at all)...
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda **_: pytest.fail("cache not used"))
+    assert discover(path_cache) == {"deploy_docs": "our_methods_plugin:Method"}
+
+    # ...until something is:
+    (site / "another-1.0.dist-info").mkdir()
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda **_: [])
+    assert discover(path_cache) == {}
+
+
+def test_lazy_import(tmp_path, site):
+    method_classes = MethodClasses({"clean": object}, discover(tmp_path / "plugins.json"))
+    assert "deploy_docs" in method_classes
+    assert "our_methods_plugin" not in sys.modules  # (not until it's used)
+
+    assert method_classes.get("deploy_docs").__doc__ == "Deploy our docs."
+    assert "our_methods_plugin" in sys.modules
+    assert sorted(method_classes) == ["clean", "deploy_docs"]
+
+
+def test_broken_plugin(capsys):
+    method_classes = MethodClasses({}, {"broken": "no_such_module_here:Method"})
+    assert "broken" in method_classes
+    assert method_classes.get("broken") is None
+    assert "broken" not in method_classes
+    assert "unable to load method" in capsys.readouterr().out
+    assert plugins.load("clean", "manage.methods.clean:Method").__name__ == "Method"
@@ -0,0 +1,194 @@
+"""Test step scheduling and run-history recording."""
+import threading
+import time
+
+import pytest
+
+from manage import scheduler
+from manage.history import History, percentile
+from manage.models import Configuration, Recipe, Recipes, Step
+
+
+class SleepMethod:
+    """Stand-in for a method class, sleeps for 'seconds' and records when it started."""
+
+    started: list[str] = []
+    lock = threading.Lock()
+
+    def __init__(self, configuration, step):
+        """."""
+        self.step = step
+        self.exit_code = 0
+        self.output_size = 42
+
+    def run(self) -> bool:
+        """."""
+        with SleepMethod.lock:
+            SleepMethod.started.append(self.step.arguments["name"])
+        time.sleep(self.step.arguments.get("seconds", 0))
+        return not self.step.arguments.get("fail", False)
+
+
+def _step(name: str, seconds: float = 0, fail: bool = False, **kwargs) -> Step:
+    step = Step(method="sleep", arguments=dict(name=name, seconds=seconds, fail=fail), **kwargs)
+    step.class_ = SleepMethod
+    return step
+
+
+@pytest.fixture
+def recipes():
+    return Recipes.model_validate(
+        {
+            "lint": Recipe(
+                steps=[
+                    _step("short", 0.01, parallel=True),
+                    _step("long", 0.10, parallel=True),
+                    _step("medium", 0.05, parallel=True),
+                ],
+            ),
+            "build": Recipe(steps=[_step("first"), Step(recipe="lint"), _step("last")]),
+        },
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    history_ = History(tmp_path / "history.db")
+    yield history_
+    history_.close()
+
+
+def test_plan(recipes):
+    """Nested recipes are flattened, adjacent parallel steps are grouped."""
+    groups = scheduler.plan(recipes, "build")
+    assert [[job.step.arguments["name"] for job in group] for group in groups] == [
+        ["first"],
+        ["short", "long", "medium"],
+        ["last"],
+    ]
+    assert [(job.recipe, job.index) for job in groups[1]] == [("lint", 0), ("lint", 1), ("lint", 2)]
+
+
+def test_run_records_history(recipes, history):
+    """Every step execution is recorded and available as estimates/statistics."""
+    configuration = Configuration(target="build", jobs=1)
+    assert scheduler.run(configuration, scheduler.plan(recipes, "build"), history)
+
+    step_times = history.step_times()
+    assert len(step_times) == 5
+    walls = step_times[("lint", 1, "sleep")]
+    assert len(walls) == 1 and walls[0][0] >= 0.1 and walls[0][2] == "success"
+    assert len(history.estimates()) == 5
+
+
+def test_run_dry_run(recipes, history):
+    """Dry-runs aren't recorded, ie. a preview of a target leaves our estimates as they were."""
+    scheduler.run(Configuration(target="lint", jobs=1), scheduler.plan(recipes, "lint"), history)
+    estimates = history.estimates()
+
+    assert scheduler.run(Configuration(target="lint", jobs=1, dry_run=True), scheduler.plan(recipes, "lint"), history)
+    assert history.estimates() == estimates
+    assert all(len(times) == 1 for times in history.step_times().values())
+
+
+def test_run_longest_first(recipes, history):
+    """With history available, independent steps are started longest-first."""
+    configuration = Configuration(target="lint", jobs=3)
+    groups = scheduler.plan(recipes, "lint")
+    scheduler.run(configuration, groups, history)  # First run to "learn" durations.
+
+    SleepMethod.started = []
+    assert scheduler.run(configuration, groups, history)
+    assert SleepMethod.started == ["long", "medium", "short"]
+
+    total, path = scheduler.critical_path(groups, history.estimates())
+    assert [job.step.arguments["name"] for job in path] == ["long"]
+    assert total >= 0.1
+
+
+def test_run_failure(history):
+    """A failing step is recorded and reflected in the overall result."""
+    recipes = Recipes.model_validate({"fail": Recipe(steps=[_step("bad", fail=True)])})
+    configuration = Configuration(target="fail")
+    assert not scheduler.run(configuration, scheduler.plan(recipes, "fail"), history)
+    assert history.step_times()[("fail", 0, "sleep")][0][2] == "failure"
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 90) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([], 50) is None
+
+
+def test_run_duplicates(history):
+    """Identical steps across several targets are only run again if the project has changed (or always_run)."""
+    recipes = Recipes.model_validate(
+        {
+            "clean": Recipe(steps=[_step("clean")]),
+            "build": Recipe(steps=[Step(recipe="clean"), _step("check"), _step("build")]),
+            "release": Recipe(steps=[Step(recipe="clean"), _step("check"), _step("tag", always_run=True)]),
+            "tag": Recipe(steps=[_step("tag", always_run=True)]),
+        },
+    )
+    configuration = Configuration(targets=["build", "release", "tag"], jobs=1)
+    assert configuration.target == "build"
+
+    # Nothing's changed, each (other than tag) is only run once...
+    SleepMethod.started = []
+    assert scheduler.run(configuration, scheduler.plan(recipes, *configuration.targets), history, state=lambda: "same")
+    assert SleepMethod.started == ["clean", "check", "build", "tag", "tag"]
+
+    # ...whereas if each step changes the project, they're all run:
+    SleepMethod.started, states = [], iter(range(100))
+    groups = scheduler.plan(recipes, *configuration.targets)
+    assert scheduler.run(configuration, groups, history, state=lambda: str(next(states)))
+    assert SleepMethod.started == ["clean", "check", "build", "clean", "check", "tag", "tag"]
+
+
+def test_run_duplicates_without_git(history, tmp_path, monkeypatch):
+    """Outside a git repository, we can't tell if anything's changed (e.g. build/), so nothing's skipped."""
+    monkeypatch.chdir(tmp_path)
+    recipes = Recipes.model_validate(
+        {
+            "clean": Recipe(steps=[_step("clean")]),
+            "build": Recipe(steps=[Step(recipe="clean"), _step("build")]),
+            "release": Recipe(steps=[Step(recipe="clean"), _step("tag")]),
+        },
+    )
+    configuration = Configuration(targets=["build", "release"], jobs=1)
+    SleepMethod.started = []
+    assert scheduler.run(configuration, scheduler.plan(recipes, *configuration.targets), history)
+    assert SleepMethod.started == ["clean", "build", "clean", "tag"]
+
+
+def test_shard():
+    """Independent steps are split (deterministically) across shards, the others are run by all of them."""
+    recipes = Recipes.model_validate(
+        {
+            "ci": Recipe(
+                steps=[
+                    _step("setup"),
+                    *[_step(name, parallel=True) for name in ("a", "b", "c", "d", "e")],
+                    _step("test", matrix={"python": ["3.11", "3.12"]}),
+                    _step("report"),
+                ],
+            ),
+        },
+    )
+    groups = scheduler.plan(recipes, "ci")
+
+    def __names(index: int, estimates: dict) -> list[str]:
+        sharded = scheduler.shard(groups, index, 2, estimates)
+        return [job.step.arguments["name"] + (job.cell[0][1] if job.cell else "") for group in sharded for job in group]
+
+    # Without weights, balanced by number of steps...
+    assert __names(1, {}) == ["setup", "a", "c", "e", "test3.12", "report"]
+    assert __names(2, {}) == ["setup", "b", "d", "test3.11", "report"]
+
+    # ...with them (ie. --shard-weights), by their expected durations:
+    estimates = {job.key: 1.0 for group in groups for job in group}
+    estimates[groups[1][0].key] = 10.0  # ie. "a" is slow
+    assert __names(1, estimates) == ["setup", "a", "report"]
+    assert __names(2, estimates) == ["setup", "b", "c", "d", "e", "test3.11", "test3.12", "report"]
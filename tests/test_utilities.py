@@ -1,5 +1,5 @@
 """Tests for various methods in the utility library."""
-from manage.utilities import replace_rich_markup
+from manage.utilities import compile_glob, parse_bytes, replace_rich_markup
 
 
 def test_replace_rich_markup():
@@ -24,3 +24,31 @@ def test_replace_rich_markup():
 #     ]
 #     for input_, expected in cases:
 #         assert expected == parse_dynamic_argument(input_)
+
+
+def test_parse_bytes():
+    """Test parsing of human-entered sizes."""
+    cases = (
+        (1536, 1536),
+        ("1536", 1536),
+        ("512K", 512 * 1024),
+        ("512M", 512 * 1024**2),
+        ("1.5 GB", int(1.5 * 1024**3)),
+        ("2gib", 2 * 1024**3),
+    )
+    for value, expected in cases:
+        assert parse_bytes(value) == expected
+
+
+def test_compile_glob():
+    """Test conversion of Path.glob-style patterns to regexes."""
+    cases = (
+        ("build", "build", True),
+        ("*.egg-info", "manage.egg-info", True),
+        ("*.egg-info", "src/manage.egg-info", False),
+        ("**/__pycache__", "__pycache__", True),
+        ("**/__pycache__", "manage/methods/__pycache__", True),
+        ("docs/?.md", "docs/a.md", True),
+    )
+    for pattern, path, expected in cases:
+        assert bool(compile_glob(pattern).fullmatch(path)) == expected
@@ -0,0 +1,60 @@
+"""Tests for our native version bumping engine."""
+import pytest
+
+from manage.version import bump_version, replace_pyproject_version
+
+
+def test_bump_version():
+    """Test bump rules against Poetry's semantics."""
+    # fmt: off
+    cases = (
+        # version      , rule        , expected
+        ("1.2.3"       , "patch"     , "1.2.4"),
+        ("1.2.3"       , "minor"     , "1.3.0"),
+        ("1.2.3"       , "major"     , "2.0.0"),
+        ("1.2.3"       , "prepatch"  , "1.2.4a0"),
+        ("1.2.3"       , "preminor"  , "1.3.0a0"),
+        ("1.2.3"       , "premajor"  , "2.0.0a0"),
+        ("1.2.3"       , "prerelease", "1.2.4a0"),
+        ("1.2.4a0"     , "prerelease", "1.2.4a1"),
+        ("1.2.4rc1"    , "prerelease", "1.2.4rc2"),
+        ("1.2.4a0"     , "patch"     , "1.2.4"),
+        ("1.3.0b1"     , "minor"     , "1.3.0"),
+        ("2.0.0a0"     , "major"     , "2.0.0"),
+        ("1.2.3a1"     , "minor"     , "1.3.0"),
+        ("1.2.3.post1" , "patch"     , "1.2.4"),
+        ("1.2"         , "patch"     , "1.2.1"),
+        ("1!1.2.3+local", "patch"    , "1!1.2.4"),
+        ("1.2.3-beta.2", "prerelease", "1.2.3b3"),
+    )
+    # fmt: on
+    for version, rule, expected in cases:
+        assert bump_version(version, rule) == expected, f"{version} {rule}"
+
+
+def test_bump_version_invalid():
+    """Test invalid versions and rules."""
+    with pytest.raises(ValueError):
+        bump_version("not.a.version", "patch")
+    with pytest.raises(ValueError):
+        bump_version("1.2.3", "sideways")
+
+
+def test_replace_pyproject_version():
+    """Test that only the [tool.poetry] version value changes."""
+    before = """[project]
+version = "9.9.9"
+
+[tool.poetry]
+name = "pkg"
+version   =  '1.2.3'   # The canonical version!
+description = "A version = '1.2.3' lookalike"
+
+[tool.poetry.dependencies]
+version = "1.2.3"
+"""
+    after = replace_pyproject_version(before, "1.2.4")
+    assert after == before.replace("version   =  '1.2.3'", "version   =  '1.2.4'")
+
+    with pytest.raises(ValueError):
+        replace_pyproject_version("[tool.other]\nversion = '1.0'\n", "1.0.1")